@@ -1,43 +1,589 @@
 import argparse
-import io
 import logging
+import os
 import sys
 
 import dotenv
 
-from auto_research_agent.src.chat_utils import send_to_google_chat
-from auto_research_agent.src.notion_utils import save_to_notion
-from auto_research_agent.tasks.garment_code_related import GarmentResearchTask
+from auto_research_agent.tasks.registry import available_tasks, load_task
 
 dotenv.load_dotenv()
 
-# Define available tasks
-TASKS = {
-    "garment_research": GarmentResearchTask,
-}
+
+def build_dedup(embedder_name, threshold, clients):
+    """Builds the NearDuplicateDetector selected on the command line."""
+    from auto_research_agent.src.dedup import EmbeddingCache, GeminiEmbedder, NearDuplicateDetector
+
+    if embedder_name == "gemini":
+        return NearDuplicateDetector(GeminiEmbedder(clients.genai, cache=EmbeddingCache()), threshold)
+    return NearDuplicateDetector(threshold=threshold)
+
+
+def backfill_main(argv):
+    """Researches many past windows per task and writes the digests to the local archive."""
+    task_choices = available_tasks()
+
+    parser = argparse.ArgumentParser(
+        prog="auto_research_agent.main backfill",
+        description="Backfill research history over past date windows.",
+    )
+    parser.add_argument(
+        "tasks",
+        nargs="*",
+        metavar="task",
+        help=f"Names of the tasks to backfill (default: garment_research). Available: {', '.join(task_choices)}",
+    )
+    parser.add_argument("--all", action="store_true", help="Backfill every registered task")
+    parser.add_argument(
+        "--weeks",
+        type=int,
+        default=52,
+        help="Number of windows to research, going back from --end (default: 52)",
+    )
+    parser.add_argument(
+        "--step-days",
+        type=int,
+        default=7,
+        help="Days between the ends of consecutive windows (default: 7)",
+    )
+    parser.add_argument(
+        "--window-days",
+        type=int,
+        default=None,
+        help="Length of each window in days (default: --step-days)",
+    )
+    parser.add_argument(
+        "--end",
+        default=None,
+        help="End date of the most recent window, YYYY-MM-DD (default: today)",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=4,
+        help="Maximum number of windows researched concurrently (default: 4)",
+    )
+    parser.add_argument(
+        "--fan-out",
+        action="store_true",
+        help="Run one concurrent sub-query per research domain and merge the results",
+    )
+    parser.add_argument(
+        "--batch",
+        action="store_true",
+        help="Send all windows as Gemini Batch API jobs (slower, half price, separate quota)",
+    )
+    parser.add_argument(
+        "--batch-poll-interval",
+        type=float,
+        default=30.0,
+        help="Initial seconds between batch job status checks (default: 30)",
+    )
+    parser.add_argument(
+        "--batch-timeout",
+        type=float,
+        default=5 * 3600,
+        help="Seconds to wait for a batch job before giving up on it (default: 5h, below the 6h workflow limit)",
+    )
+    parser.add_argument(
+        "--two-tier",
+        action="store_true",
+        help="Harvest candidates with a fast model and only analyse the ones that survive filtering with the main model",
+    )
+    parser.add_argument(
+        "--harvest-model",
+        default=None,
+        help="Fast model harvesting candidates in two-tier mode (default: gemini-2.5-flash)",
+    )
+    parser.add_argument(
+        "--no-context-cache",
+        action="store_true",
+        help="Send system instructions inline instead of through Gemini cached content",
+    )
+    parser.add_argument(
+        "--context-cache-ttl",
+        type=int,
+        default=3600,
+        help="Seconds a cached system instruction lives before it must be extended (default: 3600)",
+    )
+    parser.add_argument(
+        "--no-verify-links",
+        action="store_true",
+        help="Publish items without checking their links and dates against arXiv, GitHub, Crossref or the page",
+    )
+    parser.add_argument(
+        "--strict-links",
+        action="store_true",
+        help="Also drop items whose link could not be checked (timeouts, rate limits, server errors)",
+    )
+    parser.add_argument(
+        "--no-dedup",
+        action="store_true",
+        help="Keep near-duplicate items (e.g. a paper and its code repository) as separate entries",
+    )
+    parser.add_argument(
+        "--dedup-threshold",
+        type=float,
+        default=None,
+        help="Cosine similarity at which two items are merged (default: 0.5 for tfidf, 0.88 for gemini)",
+    )
+    parser.add_argument(
+        "--embedder",
+        choices=["tfidf", "gemini"],
+        default="tfidf",
+        help="Embeddings used to find near-duplicates: local TF-IDF (offline) or Gemini embeddings cached on disk",
+    )
+    parser.add_argument(
+        "--archive",
+        default=None,
+        help="SQLite archive the digests are stored in (default: .cache/archive/digests.sqlite)",
+    )
+    parser.add_argument(
+        "--checkpoint",
+        default=None,
+        help="File recording completed windows (default: .cache/backfill_checkpoint.json)",
+    )
+    parser.add_argument(
+        "--restart",
+        action="store_true",
+        help="Ignore the checkpoint and research every window again",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Bypass the on-disk Gemini response cache",
+    )
+    parser.add_argument(
+        "--deadline",
+        type=float,
+        default=900.0,
+        help="Seconds allowed for one Gemini call including retries (default: 900)",
+    )
+    parser.add_argument(
+        "--max-retries",
+        type=int,
+        default=3,
+        help="Retries of a Gemini call on rate limits, server errors and timeouts (default: 3)",
+    )
+    args = parser.parse_args(argv)
+
+    unknown_tasks = [name for name in args.tasks if name not in task_choices]
+    if unknown_tasks:
+        parser.error(
+            f"Task(s) {unknown_tasks} not found. Available tasks: {task_choices}"
+        )
+    if args.weeks < 1 or args.step_days < 1:
+        parser.error("--weeks and --step-days must be positive")
+
+    from datetime import datetime
+
+    try:
+        end = datetime.strptime(args.end, "%Y-%m-%d") if args.end else None
+    except ValueError:
+        parser.error(f"--end must be YYYY-MM-DD, got {args.end!r}")
+
+    import asyncio
+
+    from auto_research_agent.src.archive import DigestArchive
+    from auto_research_agent.src.backfill import BackfillCheckpoint, backfill_windows, run_backfill
+    from auto_research_agent.src.cache import ResponseCache
+    from auto_research_agent.src.clients import SharedClients
+    from auto_research_agent.src.context_cache import ContextCacheRegistry
+    from auto_research_agent.src.gemini_batch import GeminiBatcher
+    from auto_research_agent.src.gemini_caller import DEFAULT_HISTORY_PATH, LatencyHistory, ResilientCaller
+    from auto_research_agent.src.link_verifier import LinkCheckCache, LinkVerifier
+    from auto_research_agent.src.runner import format_summary
+
+    logger = logging.getLogger()
+    logger.setLevel(logging.INFO)
+    # httpx logs every request URL at INFO, and webhook URLs carry their credentials
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    if logger.handlers:
+        logger.handlers.clear()
+    console_handler = logging.StreamHandler(sys.stdout)
+    console_handler.setFormatter(
+        logging.Formatter("%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+    )
+    logger.addHandler(console_handler)
+
+    if args.all:
+        task_names = list(task_choices)
+    else:
+        task_names = list(dict.fromkeys(args.tasks or ["garment_research"]))
+
+    checkpoint = BackfillCheckpoint(args.checkpoint)
+    if args.restart:
+        checkpoint.completed.clear()
+        checkpoint.end = None
+    # Without --end, an interrupted backfill resumes with the windows it started with
+    end = end or checkpoint.resolve_end()
+    latency_history = LatencyHistory(
+        os.environ.get("RESEARCH_LATENCY_HISTORY", DEFAULT_HISTORY_PATH)
+    )
+    task_options = {
+        "fan_out": args.fan_out,
+        "two_tier": args.two_tier,
+        "harvest_model": args.harvest_model,
+        "cache": ResponseCache(enabled=not args.no_cache),
+        "caller": ResilientCaller(
+            latency_history, deadline=args.deadline, max_retries=args.max_retries
+        ),
+    }
+    clients = SharedClients()
+    if not args.no_dedup:
+        task_options["dedup"] = build_dedup(args.embedder, args.dedup_threshold, clients)
+    if args.batch:
+        task_options["batcher"] = GeminiBatcher(
+            clients.genai, poll_interval=args.batch_poll_interval, timeout=args.batch_timeout
+        )
+    elif not args.no_context_cache:
+        task_options["context_cache"] = ContextCacheRegistry(ttl_seconds=args.context_cache_ttl)
+    if not args.no_verify_links:
+        task_options["link_verifier"] = LinkVerifier(
+            clients.http, LinkCheckCache(), strict=args.strict_links
+        )
+
+    results = asyncio.run(
+        run_backfill(
+            {name: load_task(name) for name in task_names},
+            backfill_windows(args.weeks, args.step_days, end),
+            clients,
+            DigestArchive(args.archive),
+            checkpoint,
+            window_days=args.window_days or args.step_days,
+            workers=args.workers,
+            task_options=task_options,
+        )
+    )
+    latency_history.save()
+    if not args.end and all(result.ok for result in results):
+        checkpoint.finish()
+
+    if results:
+        print(format_summary(results))
+    else:
+        print("Nothing to backfill: every window is already in the checkpoint (use --restart to redo them)")
+
+
+def query_main(argv):
+    """Searches the local digest archive and prints the matching items."""
+    parser = argparse.ArgumentParser(
+        prog="auto_research_agent.main query",
+        description="Search archived research items offline.",
+    )
+    parser.add_argument(
+        "text",
+        nargs="*",
+        help="Words that must all appear in the title, summary, key innovation or relevance",
+    )
+    parser.add_argument("--domain", default=None, help='Primary domain, e.g. "Collision Handling"')
+    parser.add_argument(
+        "--since",
+        default=None,
+        help="Earliest publication date, YYYY[-MM[-DD]]",
+    )
+    parser.add_argument(
+        "--until",
+        default=None,
+        help="Latest publication date, inclusive, YYYY[-MM[-DD]]",
+    )
+    parser.add_argument("--year", default=None, help="Shorthand for --since YEAR --until YEAR")
+    parser.add_argument("--link", default=None, help="Source link of an item (normalized before lookup)")
+    parser.add_argument("--topic", default=None, help="Digest topic")
+    parser.add_argument(
+        "--limit",
+        type=int,
+        default=50,
+        help="Maximum number of items printed; 0 for no limit (default: 50)",
+    )
+    parser.add_argument(
+        "--all-occurrences",
+        action="store_true",
+        help="List an item once per digest it appeared in instead of once",
+    )
+    parser.add_argument("--json", action="store_true", help="Print one JSON object per item")
+    parser.add_argument(
+        "--archive",
+        default=None,
+        help="SQLite archive to search (default: .cache/archive/digests.sqlite)",
+    )
+    args = parser.parse_args(argv)
+
+    import json
+    import time
+
+    from auto_research_agent.src.archive import DigestArchive
+
+    archive = DigestArchive(args.archive)
+    if not os.path.exists(archive.path):
+        parser.error(f"No archive at {archive.path}; run the agent or a backfill first")
+
+    start = time.perf_counter()
+    items = archive.query(
+        text=" ".join(args.text) or None,
+        domain=args.domain,
+        since=args.since or args.year,
+        until=args.until or args.year,
+        link=args.link,
+        topic=args.topic,
+        limit=args.limit or None,
+        distinct=not args.all_occurrences,
+    )
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    archive.close()
+
+    for item in items:
+        if args.json:
+            print(json.dumps(item._asdict(), ensure_ascii=False))
+        else:
+            print(f"{item.publication_date}  {item.primary_domain:<26}  {item.title}\n{'':12}{item.source_link}")
+    if not args.json:
+        print(f"{len(items)} items in {elapsed_ms:.1f} ms")
 
 
 def main():
+    # Subcommands get their own parsers; the default command runs the weekly digest
+    if sys.argv[1:2] == ["backfill"]:
+        return backfill_main(sys.argv[2:])
+    if sys.argv[1:2] == ["query"]:
+        return query_main(sys.argv[2:])
+
+    # Built-in tasks plus one task per topic file; nothing is imported or parsed yet
+    task_choices = available_tasks()
+
     parser = argparse.ArgumentParser(description="Run research tasks.")
     parser.add_argument(
-        "task",
-        nargs="?",
-        default="garment_research",
-        choices=TASKS.keys(),
-        help="Name of the task to run (default: garment_research)",
+        "tasks",
+        nargs="*",
+        metavar="task",
+        help=f"Names of the tasks to run (default: garment_research). Available: {', '.join(task_choices)}",
+    )
+    parser.add_argument(
+        "--all",
+        action="store_true",
+        help="Run every registered task",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=4,
+        help="Maximum number of tasks running concurrently (default: 4)",
+    )
+    mode_group = parser.add_mutually_exclusive_group()
+    mode_group.add_argument(
+        "--fan-out",
+        action="store_true",
+        help="Run one concurrent sub-query per research domain and merge the results",
+    )
+    mode_group.add_argument(
+        "--stream",
+        action="store_true",
+        help="Stream the Gemini response and process items as soon as they are parsed",
+    )
+    parser.add_argument(
+        "--batch",
+        action="store_true",
+        help="Send all Gemini requests of the run as Batch API jobs (slower, half price, separate quota)",
+    )
+    parser.add_argument(
+        "--batch-poll-interval",
+        type=float,
+        default=30.0,
+        help="Initial seconds between batch job status checks (default: 30)",
+    )
+    parser.add_argument(
+        "--batch-timeout",
+        type=float,
+        default=5 * 3600,
+        help="Seconds to wait for a batch job before giving up on it (default: 5h, below the 6h workflow limit)",
+    )
+    parser.add_argument(
+        "--max-concurrency",
+        type=int,
+        default=3,
+        help="Maximum number of concurrent domain queries in fan-out mode (default: 3)",
+    )
+    parser.add_argument(
+        "--deadline",
+        type=float,
+        default=900.0,
+        help="Seconds allowed for one Gemini call including retries (default: 900)",
+    )
+    parser.add_argument(
+        "--max-retries",
+        type=int,
+        default=3,
+        help="Retries of a Gemini call on rate limits, server errors and timeouts (default: 3)",
+    )
+    parser.add_argument(
+        "--hedge",
+        action="store_true",
+        help="Send a second Gemini request when the first is slower than the recorded p95 latency",
+    )
+    parser.add_argument(
+        "--fallback-model",
+        default=None,
+        help="Faster model used when the deadline is near (e.g. gemini-2.5-flash)",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Bypass the on-disk Gemini response cache",
+    )
+    parser.add_argument(
+        "--refresh-cache",
+        action="store_true",
+        help="Ignore cached Gemini responses but store the fresh ones",
+    )
+    parser.add_argument(
+        "--cache-ttl",
+        type=float,
+        default=24.0,
+        help="Hours a cached Gemini response stays valid (default: 24)",
+    )
+    parser.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="Run without network clients: only cached Gemini responses are used and nothing is published",
+    )
+    parser.add_argument(
+        "--notion-timeout",
+        type=float,
+        default=120.0,
+        help="Seconds allowed for publishing a digest to Notion (default: 120)",
+    )
+    parser.add_argument(
+        "--chat-timeout",
+        type=float,
+        default=60.0,
+        help="Seconds allowed for posting a digest to every Google Chat space (default: 60)",
+    )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Update the existing Notion page of the same topic and report date instead of creating a new one",
+    )
+    parser.add_argument(
+        "--two-tier",
+        action="store_true",
+        help="Harvest candidates with a fast model and only analyse the ones that survive filtering with the main model",
+    )
+    parser.add_argument(
+        "--harvest-model",
+        default=None,
+        help="Fast model harvesting candidates in two-tier mode (default: gemini-2.5-flash)",
+    )
+    parser.add_argument(
+        "--no-context-cache",
+        action="store_true",
+        help="Send system instructions inline instead of through Gemini cached content",
+    )
+    parser.add_argument(
+        "--context-cache-ttl",
+        type=int,
+        default=3600,
+        help="Seconds a cached system instruction lives before it must be extended (default: 3600)",
+    )
+    parser.add_argument(
+        "--no-verify-links",
+        action="store_true",
+        help="Publish items without checking their links and dates against arXiv, GitHub, Crossref or the page",
+    )
+    parser.add_argument(
+        "--strict-links",
+        action="store_true",
+        help="Also drop items whose link could not be checked (timeouts, rate limits, server errors)",
+    )
+    parser.add_argument(
+        "--no-dedup",
+        action="store_true",
+        help="Keep near-duplicate items (e.g. a paper and its code repository) as separate entries",
+    )
+    parser.add_argument(
+        "--dedup-threshold",
+        type=float,
+        default=None,
+        help="Cosine similarity at which two items are merged (default: 0.5 for tfidf, 0.88 for gemini)",
+    )
+    parser.add_argument(
+        "--embedder",
+        choices=["tfidf", "gemini"],
+        default="tfidf",
+        help="Embeddings used to find near-duplicates: local TF-IDF (offline) or Gemini embeddings cached on disk",
+    )
+    parser.add_argument(
+        "--no-archive",
+        action="store_true",
+        help="Do not store digests in the local archive",
+    )
+    parser.add_argument(
+        "--log-max-kb",
+        type=int,
+        default=1024,
+        help="KB of log kept per task; the middle of longer logs is dropped (default: 1024)",
+    )
+    parser.add_argument(
+        "--log-block-budget",
+        type=int,
+        default=100,
+        help="Maximum number of 2000-character log blocks attached to a Notion page (default: 100)",
+    )
+    parser.add_argument(
+        "--metrics-path",
+        default=None,
+        help="JSONL file per-stage metrics are appended to (default: .cache/metrics.jsonl)",
+    )
+    parser.add_argument(
+        "--no-metrics",
+        action="store_true",
+        help="Do not write per-stage metrics",
+    )
+    parser.add_argument(
+        "--no-seen-index",
+        action="store_true",
+        help="Do not exclude or record previously published items",
     )
     args = parser.parse_args()
 
+    if args.batch and args.stream:
+        parser.error("--batch cannot be combined with --stream")
+    if args.two_tier and args.stream:
+        parser.error("--two-tier cannot be combined with --stream")
+
+    unknown_tasks = [name for name in args.tasks if name not in task_choices]
+    if unknown_tasks:
+        parser.error(
+            f"Task(s) {unknown_tasks} not found. Available tasks: {task_choices}"
+        )
+
+    # Imported after argument parsing so --help and usage errors stay fast
+    import asyncio
+
+    from auto_research_agent.src.archive import DigestArchive
+    from auto_research_agent.src.cache import ResponseCache
+    from auto_research_agent.src.clients import OfflineClients, SharedClients
+    from auto_research_agent.src.context_cache import ContextCacheRegistry
+    from auto_research_agent.src.gemini_batch import GeminiBatcher
+    from auto_research_agent.src.gemini_caller import DEFAULT_HISTORY_PATH, LatencyHistory, ResilientCaller
+    from auto_research_agent.src.link_verifier import LinkCheckCache, LinkVerifier
+    from auto_research_agent.src.metrics import MetricsRecorder
+    from auto_research_agent.src.notion_manifest import NotionManifest
+    from auto_research_agent.src.runner import format_summary, run_tasks
+    from auto_research_agent.src.seen_index import SeenItemsIndex
+    from auto_research_agent.src.task_logging import TaskLogCapture
+
     # Setup Logging
     logger = logging.getLogger()
     logger.setLevel(logging.INFO)
+    # httpx logs every request URL at INFO, and webhook URLs carry their credentials
+    logging.getLogger("httpx").setLevel(logging.WARNING)
 
     # Clear existing handlers if any to avoid duplicates
     if logger.handlers:
         logger.handlers.clear()
 
-    log_stream = io.StringIO()
-    capture_handler = logging.StreamHandler(log_stream)
+    # Each task's records are captured separately and attached to its Notion page
+    capture_handler = TaskLogCapture(max_bytes_per_task=args.log_max_kb * 1024)
     capture_handler.setFormatter(
         logging.Formatter("%(asctime)s - %(name)s - %(levelname)s - %(message)s")
     )
@@ -54,37 +600,78 @@ def main():
         "\n=================================================="
     )
 
-    task_class = TASKS.get(args.task)
-    if not task_class:
-        logger.error(
-            f"Task '{args.task}' not found. Available tasks: {list(TASKS.keys())}"
-        )
-        return
-
-    try:
-        logger.info(f"Initializing task: {args.task}")
-        task = task_class()
+    if args.all:
+        task_names = list(task_choices)
+    else:
+        task_names = list(dict.fromkeys(args.tasks or ["garment_research"]))
 
-        logger.info("Executing task...")
-        digest_data = task.run()
-
-        if digest_data:
-            logger.info("Task execution successful. Saving results...")
-
-            # Save to Notion with logs
-            log_contents = log_stream.getvalue()
-            save_to_notion(digest_data, logs=log_contents)
+    cache = ResponseCache(
+        ttl_seconds=args.cache_ttl * 3600,
+        enabled=not args.no_cache,
+        refresh=args.refresh_cache,
+    )
+    seen_index = None if args.no_seen_index else SeenItemsIndex()
+    latency_history = LatencyHistory(
+        os.environ.get("RESEARCH_LATENCY_HISTORY", DEFAULT_HISTORY_PATH)
+    )
+    caller = ResilientCaller(
+        latency_history,
+        deadline=args.deadline,
+        max_retries=args.max_retries,
+        hedge=args.hedge,
+        fallback_model=args.fallback_model,
+    )
+    task_options = {
+        "fan_out": args.fan_out,
+        "stream": args.stream,
+        "two_tier": args.two_tier,
+        "harvest_model": args.harvest_model,
+        "max_concurrency": args.max_concurrency,
+        "cache": cache,
+        "caller": caller,
+    }
+    clients = OfflineClients() if args.dry_run else SharedClients()
+    if not args.no_dedup:
+        # Dry runs have no Gemini client, so they always use the local embedder
+        task_options["dedup"] = build_dedup(
+            "tfidf" if args.dry_run else args.embedder, args.dedup_threshold, clients
+        )
+    archive = None if args.no_archive else DigestArchive()
+    if args.batch:
+        task_options["batcher"] = GeminiBatcher(
+            clients.genai, poll_interval=args.batch_poll_interval, timeout=args.batch_timeout
+        )
+    elif not (args.no_context_cache or args.dry_run):
+        # Batch jobs can outlive a cached content, so they keep their prefixes inline
+        task_options["context_cache"] = ContextCacheRegistry(ttl_seconds=args.context_cache_ttl)
+    if not (args.no_verify_links or args.dry_run):
+        task_options["link_verifier"] = LinkVerifier(
+            clients.http, LinkCheckCache(), strict=args.strict_links
+        )
 
-            # Send to Google Chat
-            send_to_google_chat(digest_data)
+    results = asyncio.run(
+        run_tasks(
+            {name: load_task(name) for name in task_names},
+            clients,
+            capture_handler,
+            workers=args.workers,
+            task_options=task_options,
+            seen_index=seen_index,
+            dry_run=args.dry_run,
+            sink_timeouts={"notion": args.notion_timeout, "chat": args.chat_timeout},
+            recorder=MetricsRecorder(args.metrics_path, enabled=not args.no_metrics),
+            max_log_blocks=args.log_block_budget,
+            notion_manifest=NotionManifest() if args.incremental else None,
+            archive=archive,
+        )
+    )
+    if archive is not None:
+        archive.close()
 
-            logger.info("All operations completed successfully.")
-        else:
-            logger.warning("Task executed but returned no data.")
+    # Past latencies drive the hedge delay and fallback decisions of later runs
+    latency_history.save()
 
-    except Exception as e:
-        logger.error(f"Task failed with error: {e}")
-        # Could implement error notification here
+    print(format_summary(results))
 
 
 if __name__ == "__main__":
@@ -0,0 +1,38 @@
+def build_harvest_directive(max_candidates):
+    """Appended to a task's research query when a fast model only harvests candidates."""
+    return f"""
+## Candidate Harvesting
+This step only collects candidates; a later step reads and analyses the ones that are kept.
+*   List up to **{max_candidates} distinct candidate items** matching the directive above, ordered by relevance (most impactful first). This replaces the quantity limit above.
+*   For each candidate give only its **title**, **source link**, exact **publication date** (YYYY-MM-DD, as stated by the source) and **primary domain**.
+*   Do not write explanations or summaries.
+"""
+
+
+def build_analysis_query(topic, items):
+    """Asks for the long-form fields of already selected items.
+
+    items is a list of (number, row) pairs, row having title, source_link,
+    publication_date and primary_domain attributes.
+    """
+    listing = "\n".join(
+        f"{number}. **{row.title}** ({row.publication_date}, "
+        f"{getattr(row.primary_domain, 'value', row.primary_domain)})\n    {row.source_link}"
+        for number, row in items
+    )
+    return f"""
+# Analysis Directive: {topic}
+
+**Objective:** The research items below have already been selected for the digest. Read each source and analyse it.
+
+## 1. Items
+{listing}
+
+## 2. Deliverable Requirements
+For every item, return one analysis with the item's number as its id:
+*   **Relevance:** How it impacts its research domain and why.
+*   **Key Innovation:** What specific problem does it solve?
+*   **Summary:** A concise summary of its content.
+
+Do not add, drop or reorder items.
+"""
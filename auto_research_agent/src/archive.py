@@ -0,0 +1,248 @@
+import logging
+import os
+import sqlite3
+from datetime import datetime
+from typing import Any, NamedTuple
+
+from auto_research_agent.src.item_store import CompactDigest
+from auto_research_agent.src.seen_index import normalize_link
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_ARCHIVE_PATH = os.path.join(".cache", "archive", "digests.sqlite")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS digests (
+    id INTEGER PRIMARY KEY,
+    task TEXT NOT NULL,
+    topic TEXT NOT NULL,
+    report_date TEXT NOT NULL,
+    window_end TEXT NOT NULL,
+    window_days INTEGER,
+    archived_at TEXT NOT NULL,
+    UNIQUE (task, window_end)
+);
+CREATE TABLE IF NOT EXISTS items (
+    id INTEGER PRIMARY KEY,
+    digest_id INTEGER NOT NULL REFERENCES digests (id),
+    title TEXT NOT NULL,
+    source_link TEXT NOT NULL,
+    link_key TEXT NOT NULL,
+    publication_date TEXT NOT NULL,
+    primary_domain TEXT NOT NULL COLLATE NOCASE,
+    relevance_explanation TEXT NOT NULL,
+    key_innovation TEXT NOT NULL,
+    summary TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS items_domain_date ON items (primary_domain, publication_date);
+CREATE INDEX IF NOT EXISTS items_date ON items (publication_date);
+CREATE INDEX IF NOT EXISTS items_link ON items (link_key);
+CREATE INDEX IF NOT EXISTS items_digest ON items (digest_id);
+"""
+
+# External-content index over the items table; rows are added and removed explicitly
+_FTS_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS items_fts USING fts5 (
+    title, summary, key_innovation, relevance_explanation,
+    content='items', content_rowid='id', tokenize='porter unicode61'
+);
+"""
+
+_FTS_COLUMNS = "title, summary, key_innovation, relevance_explanation"
+
+
+class ArchivedItem(NamedTuple):
+    """One item read back from the archive, with the digest it came from."""
+
+    title: str
+    source_link: str
+    publication_date: str
+    primary_domain: str
+    relevance_explanation: str
+    key_innovation: str
+    summary: str
+    topic: str
+    task: str
+    report_date: str
+
+
+def _fts_query(text: str) -> str:
+    """Quotes every word so user input is matched literally (all words must appear)."""
+    return " ".join('"{}"'.format(word.replace('"', '""')) for word in text.split())
+
+
+class DigestArchive:
+    """Local SQLite archive of every digest, searchable without the network.
+
+    Items are indexed by domain and publication date, by normalized source link
+    and, when SQLite has FTS5, by the words of their title and texts. Archiving
+    the same task and window again replaces the earlier digest, so reruns do not
+    duplicate items.
+    """
+
+    def __init__(self, path: str | None = None):
+        self.path = path or os.environ.get("RESEARCH_ARCHIVE", DEFAULT_ARCHIVE_PATH)
+        self._conn = None
+        self.fts = True
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        if self._conn is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._conn = sqlite3.connect(self.path)
+            # Lets queries read while a backfill is writing
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.executescript(_SCHEMA)
+            try:
+                self._conn.executescript(_FTS_SCHEMA)
+            except sqlite3.OperationalError as e:
+                logger.warning(f"SQLite without FTS5 ({e}); text search falls back to LIKE scans")
+                self.fts = False
+        return self._conn
+
+    def close(self):
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    def add(
+        self, task_name: str, digest_data, window_end: datetime | None = None, window_days: int | None = None
+    ):
+        """Stores a filtered digest (CompactDigest or WeeklyResearchDigest) in one transaction."""
+        window = (window_end or datetime.now()).date().isoformat()
+        if not isinstance(digest_data, CompactDigest):
+            digest_data = CompactDigest.from_model(digest_data)
+        items = digest_data.items
+        links = items.column("source_link")
+        rows = list(
+            zip(
+                items.column("title"),
+                links,
+                map(normalize_link, links),
+                items.column("publication_date"),
+                [getattr(domain, "value", domain) for domain in items.column("primary_domain")],
+                items.column("relevance_explanation"),
+                items.column("key_innovation"),
+                items.column("summary"),
+            )
+        )
+        conn = self.conn
+        with conn:
+            previous = conn.execute(
+                "SELECT id FROM digests WHERE task = ? AND window_end = ?", (task_name, window)
+            ).fetchone()
+            if previous is not None:
+                self._delete_digest(previous[0])
+            digest_id = conn.execute(
+                "INSERT INTO digests (task, topic, report_date, window_end, window_days, archived_at)"
+                " VALUES (?, ?, ?, ?, ?, ?)",
+                (
+                    task_name,
+                    digest_data.topic,
+                    digest_data.report_date,
+                    window,
+                    window_days,
+                    datetime.now().isoformat(timespec="seconds"),
+                ),
+            ).lastrowid
+            conn.executemany(
+                "INSERT INTO items (digest_id, title, source_link, link_key, publication_date,"
+                " primary_domain, relevance_explanation, key_innovation, summary)"
+                f" VALUES ({digest_id}, ?, ?, ?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+            if self.fts:
+                conn.execute(
+                    f"INSERT INTO items_fts (rowid, {_FTS_COLUMNS})"
+                    f" SELECT id, {_FTS_COLUMNS} FROM items WHERE digest_id = ?",
+                    (digest_id,),
+                )
+        logger.info(
+            f"Archived {len(rows)} items of {task_name} (window ending {window}) in {self.path}"
+        )
+
+    def _delete_digest(self, digest_id: int):
+        if self.fts:
+            self.conn.execute(
+                f"INSERT INTO items_fts (items_fts, rowid, {_FTS_COLUMNS})"
+                f" SELECT 'delete', id, {_FTS_COLUMNS} FROM items WHERE digest_id = ?",
+                (digest_id,),
+            )
+        self.conn.execute("DELETE FROM items WHERE digest_id = ?", (digest_id,))
+        self.conn.execute("DELETE FROM digests WHERE id = ?", (digest_id,))
+
+    def query(
+        self,
+        text: str | None = None,
+        domain: str | None = None,
+        since: str | None = None,
+        until: str | None = None,
+        link: str | None = None,
+        topic: str | None = None,
+        limit: int | None = 50,
+        distinct: bool = True,
+    ) -> list[ArchivedItem]:
+        """Returns archived items matching every given filter, newest publication first.
+
+        since and until are inclusive ISO dates or prefixes ("2025", "2025-06").
+        With distinct, an item archived by several digests is returned once, from
+        the most recent one.
+        """
+        conn = self.conn
+        conditions = []
+        params: list[Any] = []
+        if text:
+            if self.fts:
+                # As a subquery the full-text index is searched once, not once per candidate row
+                conditions.append("i.id IN (SELECT rowid FROM items_fts WHERE items_fts MATCH ?)")
+                params.append(_fts_query(text))
+            else:
+                for word in text.split():
+                    conditions.append(
+                        "(i.title LIKE ? OR i.summary LIKE ? OR i.key_innovation LIKE ?"
+                        " OR i.relevance_explanation LIKE ?)"
+                    )
+                    params.extend([f"%{word}%"] * 4)
+        if domain:
+            conditions.append("i.primary_domain = ?")
+            params.append(domain)
+        if since:
+            conditions.append("i.publication_date >= ?")
+            params.append(since)
+        if until:
+            # Everything starting with the prefix sorts below it plus U+FFFF
+            conditions.append("i.publication_date < ?")
+            params.append(until + "\uffff")
+        if link:
+            conditions.append("i.link_key = ?")
+            params.append(normalize_link(link))
+        if topic:
+            conditions.append("d.topic = ?")
+            params.append(topic)
+
+        sql = (
+            "SELECT i.title, i.source_link, i.publication_date, i.primary_domain,"
+            " i.relevance_explanation, i.key_innovation, i.summary, d.topic, d.task, d.report_date,"
+            " i.link_key FROM items i JOIN digests d ON d.id = i.digest_id"
+        )
+        if conditions:
+            sql += " WHERE " + " AND ".join(conditions)
+        sql += " ORDER BY i.publication_date DESC, d.window_end DESC"
+        if limit is not None and not distinct:
+            sql += f" LIMIT {int(limit)}"
+
+        results = []
+        seen = set()
+        # Rows are read lazily, so a distinct query stops as soon as it has enough
+        for row in conn.execute(sql, params):
+            link_key = row[-1]
+            if distinct and link_key:
+                if link_key in seen:
+                    continue
+                seen.add(link_key)
+            results.append(ArchivedItem._make(row[:-1]))
+            if limit is not None and len(results) >= limit:
+                break
+        return results
@@ -0,0 +1,163 @@
+import asyncio
+import json
+import logging
+import os
+import time
+from datetime import datetime, timedelta
+
+from auto_research_agent.src.metrics import current_recorder
+from auto_research_agent.src.runner import TaskResult
+from auto_research_agent.src.task_logging import current_task_name
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CHECKPOINT_PATH = os.path.join(".cache", "backfill_checkpoint.json")
+
+
+def backfill_windows(weeks: int, step_days: int = 7, end: datetime | None = None) -> list[datetime]:
+    """Returns the end dates of `weeks` consecutive windows, oldest first, the last ending at end."""
+    end = end or datetime.now()
+    return [end - timedelta(days=step_days * i) for i in reversed(range(weeks))]
+
+
+class BackfillCheckpoint:
+    """Remembers which (task, window) pairs of a backfill are done, in a JSON file.
+
+    Window ends default to "now", so the checkpoint also keeps the end of a
+    backfill in progress; resuming it on a later day yields the same windows.
+    """
+
+    def __init__(self, path: str | None = None):
+        self.path = path or os.environ.get("RESEARCH_BACKFILL_CHECKPOINT", DEFAULT_CHECKPOINT_PATH)
+        self.completed = set()
+        self.end = None
+        if os.path.exists(self.path):
+            try:
+                with open(self.path, encoding="utf-8") as f:
+                    data = json.load(f)
+                # Older checkpoints are a plain list of keys
+                if isinstance(data, list):
+                    data = {"completed": data}
+                self.completed = set(data.get("completed", []))
+                if data.get("end"):
+                    self.end = datetime.fromisoformat(data["end"])
+            except (OSError, ValueError) as e:
+                logger.warning(f"Ignoring unreadable backfill checkpoint {self.path}: {e}")
+
+    def resolve_end(self) -> datetime:
+        """Returns the end of the backfill in progress, or now for a new one, and remembers it."""
+        if self.end is None:
+            self.end = datetime.now()
+            self.save()
+        else:
+            logger.info(f"Resuming the backfill ending {self.end:%Y-%m-%d %H:%M} from {self.path}")
+        return self.end
+
+    def finish(self):
+        """Forgets the end of a completed backfill, so the next one ends now."""
+        self.end = None
+        self.save()
+
+    @staticmethod
+    def key(task_name: str, window_end: datetime, window_days: int) -> str:
+        return f"{task_name}|{window_end:%Y-%m-%d}|{window_days}"
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.completed
+
+    def mark_done(self, key: str):
+        self.completed.add(key)
+        self.save()
+
+    def save(self):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(
+                {"end": self.end.isoformat() if self.end else None, "completed": sorted(self.completed)}, f
+            )
+        os.replace(tmp_path, self.path)
+
+
+async def run_window(
+    name, task_class, window_end, window_days, clients, semaphore, archive, checkpoint, task_options=None
+) -> TaskResult:
+    """Researches one past window of one task and archives the filtered digest."""
+    label = f"{name}@{window_end:%Y-%m-%d}"
+    async with semaphore:
+        current_task_name.set(label)
+        start = time.perf_counter()
+        try:
+            task = task_class(
+                client=clients.genai,
+                window_end=window_end,
+                window_days=window_days,
+                **(task_options or {}),
+            )
+            digest_data = await task.arun()
+            archive.add(name, digest_data, window_end, window_days)
+            checkpoint.mark_done(BackfillCheckpoint.key(name, window_end, window_days))
+            return TaskResult(label, True, len(digest_data.items), time.perf_counter() - start)
+        except Exception as e:
+            logger.error(f"Backfill window {label} failed: {e}")
+            return TaskResult(label, False, seconds=time.perf_counter() - start, error=str(e))
+
+
+async def run_backfill(
+    task_classes,
+    windows,
+    clients,
+    archive,
+    checkpoint,
+    window_days=7,
+    workers=4,
+    task_options=None,
+    recorder=None,
+) -> list[TaskResult]:
+    """Runs every task over every window, at most `workers` at a time.
+
+    Windows already recorded in the checkpoint are skipped, so an interrupted
+    backfill resumes where it stopped. Failed windows are not recorded and are
+    retried by the next run.
+    """
+    jobs = [
+        (name, task_class, window_end)
+        for window_end in windows
+        for name, task_class in task_classes.items()
+        if BackfillCheckpoint.key(name, window_end, window_days) not in checkpoint
+    ]
+    skipped = len(windows) * len(task_classes) - len(jobs)
+    if skipped:
+        logger.info(f"Skipping {skipped} windows already completed according to {checkpoint.path}")
+    logger.info(f"Backfilling {len(jobs)} windows of {window_days} days with {workers} workers")
+
+    if task_options and task_options.get("batcher") is not None:
+        # Every window has to queue its requests before the batch job is submitted
+        workers = len(jobs)
+    semaphore = asyncio.Semaphore(max(1, workers))
+    if recorder is not None:
+        current_recorder.set(recorder)
+    try:
+        return await asyncio.gather(
+            *(
+                run_window(
+                    name,
+                    task_class,
+                    window_end,
+                    window_days,
+                    clients,
+                    semaphore,
+                    archive,
+                    checkpoint,
+                    task_options=task_options,
+                )
+                for name, task_class, window_end in jobs
+            )
+        )
+    finally:
+        await clients.aclose()
+        archive.close()
+        if recorder is not None:
+            recorder.write()
@@ -0,0 +1,132 @@
+import hashlib
+import json
+import logging
+import os
+import time
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_DIR = os.path.join(".cache", "gemini")
+DEFAULT_TTL_SECONDS = 24 * 60 * 60
+DEFAULT_MAX_BYTES = 50 * 1024 * 1024
+
+
+class ResponseCache:
+    """Content-addressed on-disk cache for Gemini response texts."""
+
+    def __init__(
+        self,
+        cache_dir: str | None = None,
+        ttl_seconds: float = DEFAULT_TTL_SECONDS,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        enabled: bool = True,
+        refresh: bool = False,
+    ):
+        """
+        Args:
+            cache_dir: Directory holding cache entries (default: $RESEARCH_CACHE_DIR or .cache/gemini).
+            ttl_seconds: Entries older than this are treated as misses and removed.
+            max_bytes: Total size above which least recently used entries are evicted.
+            enabled: When False, the cache is bypassed entirely (no reads, no writes).
+            refresh: When True, reads are skipped but fresh responses are still written.
+        """
+        self.cache_dir = cache_dir or os.environ.get("RESEARCH_CACHE_DIR", DEFAULT_CACHE_DIR)
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self.enabled = enabled
+        self.refresh = refresh
+
+    @staticmethod
+    def make_key(query: str, system_instruction: str, model: str, schema) -> str:
+        """Hashes everything that determines the shape and content of a response."""
+        payload = json.dumps(
+            {
+                "query": query,
+                "system_instruction": system_instruction,
+                "model": model,
+                "schema": schema.model_json_schema(),
+            },
+            sort_keys=True,
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    def get(self, key: str) -> str | None:
+        """Returns the cached response text, or None on a miss."""
+        if not self.enabled or self.refresh:
+            return None
+
+        path = self._path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                entry = json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            logger.warning(f"Discarding unreadable cache entry {key}: {e}")
+            self._remove(path)
+            return None
+
+        if time.time() - entry.get("created_at", 0) > self.ttl_seconds:
+            logger.info(f"Cache entry {key[:12]} expired.")
+            self._remove(path)
+            return None
+
+        # Touch the entry so size-based eviction is least-recently-used
+        os.utime(path)
+        logger.info(f"Cache hit for {key[:12]}.")
+        return entry.get("text")
+
+    def set(self, key: str, text: str, model: str = ""):
+        """Stores a response text and evicts old entries if over the size budget."""
+        if not self.enabled or not text:
+            return
+
+        os.makedirs(self.cache_dir, exist_ok=True)
+        path = self._path(key)
+        tmp_path = f"{path}.tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({"created_at": time.time(), "model": model, "text": text}, f)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning(f"Failed to write cache entry {key}: {e}")
+            self._remove(tmp_path)
+            return
+
+        self._evict()
+
+    def _evict(self):
+        entries = []
+        total = 0
+        now = time.time()
+        for name in os.listdir(self.cache_dir):
+            if not name.endswith(".json"):
+                continue
+            path = os.path.join(self.cache_dir, name)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            if now - stat.st_mtime > self.ttl_seconds:
+                self._remove(path)
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+            total += stat.st_size
+
+        entries.sort()
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            logger.info(f"Evicting cache entry {os.path.basename(path)}")
+            self._remove(path)
+            total -= size
+
+    @staticmethod
+    def _remove(path: str):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
@@ -1,42 +1,281 @@
-import json
+import asyncio
+import contextlib
+import functools
 import logging
 import os
-from httplib2 import Http
-from auto_research_agent.src.schemas import WeeklyResearchDigest
+import re
+import time
+from dataclasses import dataclass
+from urllib.parse import urlsplit
+
+import httpx
+from auto_research_agent.src.item_store import CompactDigest
+from auto_research_agent.src.metrics import span
+from auto_research_agent.src.retry import retry_with_backoff
 
 logger = logging.getLogger(__name__)
 
-def send_to_google_chat(digest_data: WeeklyResearchDigest):
-    """Sends the digest data to Google Chat via Webhook."""
-    webhook_url = os.environ.get("GOOGLE_CHAT_WEBHOOK_URL") or os.environ.get("WEBHOOK_URL")
-    if not webhook_url:
+# Google Chat rejects messages whose text is longer than this
+MAX_MESSAGE_CHARS = 4096
+# Incoming webhooks accept about one message per second per space
+DEFAULT_MIN_INTERVAL = 1.0
+# Time budgeted per message, request included, when deciding whether a space still fits the deadline
+SECONDS_PER_POST = 2.0
+MESSAGE_HEADERS = {"Content-Type": "application/json; charset=UTF-8"}
+# Room left in each message for the " (k/n)" part counter
+_PART_COUNTER_CHARS = len(" (999/999)")
+_SPACE_RE = re.compile(r"/spaces/([^/]+)")
+
+
+def get_webhook_url() -> str | None:
+    return os.environ.get("GOOGLE_CHAT_WEBHOOK_URL") or os.environ.get("WEBHOOK_URL")
+
+
+def get_webhook_urls() -> list[str]:
+    """Webhooks to post to: GOOGLE_CHAT_WEBHOOK_URLS (comma or whitespace separated), else the single URL."""
+    urls = os.environ.get("GOOGLE_CHAT_WEBHOOK_URLS", "").replace(",", " ").split()
+    if not urls:
+        url = get_webhook_url()
+        urls = [url] if url else []
+    return list(dict.fromkeys(urls))
+
+
+def space_of(webhook_url: str) -> str:
+    """The Chat space a webhook posts to. Webhook URLs carry a key and token, so only this is logged."""
+    parts = urlsplit(webhook_url)
+    match = _SPACE_RE.search(parts.path)
+    return f"spaces/{match.group(1)}" if match else parts.netloc
+
+
+def _header(digest_data: CompactDigest) -> str:
+    return f"*{digest_data.topic} - {digest_data.report_date}*"
+
+
+def _item_texts(digest_data: CompactDigest) -> list[str]:
+    items = digest_data.items
+    rows = zip(
+        items.column("title"),
+        items.column("source_link"),
+        # Topic files define their domains as plain strings
+        [getattr(domain, "value", domain) for domain in items.column("primary_domain")],
+        items.column("key_innovation"),
+    )
+    return [
+        f"*{i}. {title}*\n<{source_link}|Source> | `Domain: {domain}`\n> {key_innovation}\n\n"
+        for i, (title, source_link, domain, key_innovation) in enumerate(rows, 1)
+    ]
+
+
+def build_chat_message(digest_data: CompactDigest) -> dict:
+    """Builds a single Google Chat message payload for a whole digest."""
+    return {"text": "".join([_header(digest_data), "\n\n", *_item_texts(digest_data)])}
+
+
+def build_chat_messages(digest_data: CompactDigest, max_chars: int = MAX_MESSAGE_CHARS) -> list[dict]:
+    """Splits a digest into Google Chat message payloads of at most max_chars, on item boundaries.
+
+    Every message repeats the header, numbered "(k/n)" when there are several.
+    An item too long for a message of its own is truncated.
+    """
+    header = _header(digest_data)
+    budget = max_chars - len(header) - _PART_COUNTER_CHARS - 2
+    if budget <= 0:
+        raise ValueError(f"max_chars={max_chars} leaves no room for items")
+
+    parts, current, size = [], [], 0
+    for text in _item_texts(digest_data):
+        if len(text) > budget:
+            text = text[: budget - 3] + "…\n\n"
+        if current and size + len(text) > budget:
+            parts.append(current)
+            current, size = [], 0
+        current.append(text)
+        size += len(text)
+    parts.append(current)
+
+    if len(parts) == 1:
+        return [{"text": "".join([header, "\n\n", *parts[0]])}]
+    return [
+        {"text": "".join([header, f" ({k}/{len(parts)})\n\n", *part])}
+        for k, part in enumerate(parts, 1)
+    ]
+
+
+class SpaceRateLimiter:
+    """Spaces out posts to the same Chat space, whichever webhook they go through.
+
+    Posts to one space are sent one at a time, at least min_interval seconds
+    apart; posts to different spaces do not wait for each other. sequence()
+    keeps the messages of one digest together in a space.
+    """
+
+    def __init__(self, min_interval: float = DEFAULT_MIN_INTERVAL):
+        self.min_interval = min_interval
+        self._locks = {}
+        self._sequences = {}
+        self._next_post = {}
+        self.waited = 0.0
+
+    def sequence(self, space: str) -> asyncio.Lock:
+        """Held while one digest's messages are posted to the space."""
+        return self._sequences.setdefault(space, asyncio.Lock())
+
+    @contextlib.asynccontextmanager
+    async def slot(self, space: str):
+        lock = self._locks.setdefault(space, asyncio.Lock())
+        async with lock:
+            delay = self._next_post.get(space, 0.0) - time.monotonic()
+            if delay > 0:
+                self.waited += delay
+                await asyncio.sleep(delay)
+            try:
+                yield
+            finally:
+                self._next_post[space] = time.monotonic() + self.min_interval
+
+
+@dataclass
+class ChatPostResult:
+    space: str
+    sent: int
+    total: int
+    status: int | None = None
+    seconds: float = 0.0
+    error: str = ""
+
+    @property
+    def ok(self) -> bool:
+        return self.sent == self.total
+
+
+def summarize_chat_results(results: list[ChatPostResult]) -> str:
+    delivered = sum(result.ok for result in results)
+    summary = f"{delivered}/{len(results)} spaces received every message"
+    failures = [f"{r.space} ({r.sent}/{r.total} sent, {r.error})" for r in results if not r.ok]
+    return f"{summary}; failed: {', '.join(failures)}" if failures else summary
+
+
+class ChatPostError(Exception):
+    """A failed webhook post that names the space only, never the URL with its key and token."""
+
+    def __init__(self, space: str, detail: str, status: int | None = None, retryable: bool = False):
+        super().__init__(detail)
+        self.space = space
+        self.detail = detail
+        self.status = status
+        self.retryable = retryable
+
+
+def _redact(text: str, webhook_url: str, space: str) -> str:
+    query = urlsplit(webhook_url).query
+    text = text.replace(webhook_url, space)
+    return text.replace(query, "<redacted>") if query else text
+
+
+def _is_retryable(error: Exception) -> bool:
+    # Only throttling and connections that never carried the request; anything else could post twice
+    return isinstance(error, ChatPostError) and error.retryable
+
+
+async def _post_to_space(
+    http_client: httpx.AsyncClient,
+    webhook_url: str,
+    messages: list[dict],
+    limiter: SpaceRateLimiter,
+    deadline: float | None = None,
+) -> ChatPostResult:
+    """Posts the messages in order to one webhook, stopping at the first that fails.
+
+    Once it is the digest's turn in the space, the space is skipped as a whole
+    if its messages are unlikely to be posted before deadline (a time.monotonic()
+    value), rather than being cut off after the first few.
+    """
+    space = space_of(webhook_url)
+    result = ChatPostResult(space, 0, len(messages))
+    start = time.perf_counter()
+
+    async def post(message: dict) -> httpx.Response:
+        async with limiter.slot(space):
+            with span("chat_post", space=space) as chat_span:
+                try:
+                    response = await http_client.post(webhook_url, headers=MESSAGE_HEADERS, json=message)
+                except httpx.HTTPError as e:
+                    detail = _redact(str(e) or type(e).__name__, webhook_url, space)
+                    retryable = isinstance(e, (httpx.ConnectError, httpx.ConnectTimeout))
+                    raise ChatPostError(space, detail, retryable=retryable) from None
+                chat_span.add_transfer(len(response.request.content), len(response.content))
+                if response.is_error:
+                    status = response.status_code
+                    raise ChatPostError(space, f"HTTP {status}", status, retryable=status == 429)
+        return response
+
+    async with limiter.sequence(space):
+        remaining = None if deadline is None else deadline - time.monotonic()
+        if remaining is not None and remaining < len(messages) * max(limiter.min_interval, SECONDS_PER_POST):
+            result.error = f"skipped, {remaining:.1f}s left for {len(messages)} message(s)"
+        else:
+            try:
+                for message in messages:
+                    response, _ = await retry_with_backoff(
+                        functools.partial(post, message),
+                        max_retries=3,
+                        base_delay=max(limiter.min_interval, 0.5),
+                        is_retryable=_is_retryable,
+                        description=f"Google Chat post to {space}",
+                        deadline=deadline,
+                    )
+                    result.sent += 1
+                    result.status = response.status_code
+            except ChatPostError as e:
+                result.status = e.status
+                result.error = e.detail
+    result.seconds = time.perf_counter() - start
+
+    if result.ok:
+        logger.info(f"Google Chat {space}: {result.sent} message(s) in {result.seconds:.2f}s")
+    else:
+        logger.error(f"Google Chat {space}: {result.sent}/{result.total} message(s) sent: {result.error}")
+    return result
+
+
+async def publish_to_google_chat(
+    digest_data: CompactDigest,
+    http_client: httpx.AsyncClient | None = None,
+    webhook_urls: list[str] | None = None,
+    rate_limiter: SpaceRateLimiter | None = None,
+    max_chars: int = MAX_MESSAGE_CHARS,
+    deadline: float | None = None,
+) -> list[ChatPostResult] | None:
+    """Posts the digest to every webhook concurrently and returns one result per webhook.
+
+    The digest is split into messages of at most max_chars; each webhook gets
+    them in order. Returns None if no webhook is configured. A shared
+    httpx.AsyncClient and SpaceRateLimiter can be passed in; failures are
+    reported in the results, not raised. Spaces whose messages no longer fit
+    before deadline (a time.monotonic() value) are skipped.
+    """
+    webhook_urls = get_webhook_urls() if webhook_urls is None else webhook_urls
+    if not webhook_urls:
         logger.warning("GOOGLE_CHAT_WEBHOOK_URL (or WEBHOOK_URL) not found. Skipping Google Chat notification.")
-        return
-
-    # Construct the message
-    header = f"*{digest_data.topic} - {digest_data.report_date}*\n\n"
-    
-    items_text = ""
-    for i, item in enumerate(digest_data.items, 1):
-        items_text += f"*{i}. {item.title}*\n"
-        items_text += f"<{item.source_link}|Source> | `Domain: {item.primary_domain.value}`\n"
-        items_text += f"> {item.key_innovation}\n\n"
-
-    message_text = header + items_text
-
-    # Basic text message with formatting
-    app_message = {"text": message_text}
-    
-    message_headers = {"Content-Type": "application/json; charset=UTF-8"}
-    
+        return None
+    if http_client is None:
+        async with httpx.AsyncClient() as client:
+            return await publish_to_google_chat(
+                digest_data, client, webhook_urls, rate_limiter, max_chars, deadline
+            )
+
+    messages = build_chat_messages(digest_data, max_chars)
+    limiter = rate_limiter or SpaceRateLimiter()
+    results = await asyncio.gather(
+        *(_post_to_space(http_client, url, messages, limiter, deadline) for url in webhook_urls)
+    )
+    logger.info(f"Google Chat: {len(messages)} message(s) per space, {summarize_chat_results(results)}")
+    return list(results)
+
+
+def send_to_google_chat(digest_data: CompactDigest):
+    """Sends the digest data to Google Chat via Webhook."""
     try:
-        http_obj = Http()
-        response, content = http_obj.request(
-            uri=webhook_url,
-            method="POST",
-            headers=message_headers,
-            body=json.dumps(app_message),
-        )
-        logger.info(f"Google Chat response: {response.status}")
+        asyncio.run(publish_to_google_chat(digest_data))
     except Exception as e:
         logger.error(f"Failed to send to Google Chat: {e}")
@@ -0,0 +1,113 @@
+import logging
+import os
+
+logger = logging.getLogger(__name__)
+
+
+def create_notion_client(token: str):
+    """Builds a notion_client.AsyncClient, honouring NOTION_BASE_URL (e.g. a local mock server)."""
+    from auto_research_agent.src.metrics import count_http_transfer
+    from auto_research_agent.src.notion_writer import RenderingNotionClient
+
+    options = {"auth": token}
+    base_url = os.environ.get("NOTION_BASE_URL")
+    if base_url:
+        options["base_url"] = base_url
+    # Request and response sizes are attributed to the open metrics span
+    return RenderingNotionClient(event_hooks={"response": [count_http_transfer]}, **options)
+
+
+class SharedClients:
+    """Lazily created API clients shared by every task in a run.
+
+    Each client, and the SDK behind it, is imported and built on first use, so a
+    run that never reaches a sink never pays for it. The async clients must be
+    used from the event loop that first touched them.
+    """
+
+    def __init__(self, max_connections: int = 20):
+        self.max_connections = max_connections
+        self._genai = None
+        self._notion = None
+        self._http = None
+        self._chat_rate_limiter = None
+
+    @property
+    def genai(self):
+        if self._genai is None:
+            from google import genai
+
+            try:
+                api_key = os.environ["GEMINI_API_KEY"]
+            except KeyError:
+                logger.error("GEMINI_API_KEY not available!")
+                raise ValueError("GEMINI_API_KEY not available!")
+            self._genai = genai.Client(api_key=api_key)
+        return self._genai
+
+    @property
+    def notion(self):
+        """Shared notion_client.AsyncClient, or None if NOTION_API_KEY is not set."""
+        if self._notion is None:
+            notion_token = os.environ.get("NOTION_API_KEY")
+            if not notion_token:
+                return None
+            self._notion = create_notion_client(notion_token)
+        return self._notion
+
+    @property
+    def http(self):
+        """Pooled httpx.AsyncClient for webhooks and other plain HTTP calls."""
+        if self._http is None:
+            import httpx
+
+            self._http = httpx.AsyncClient(
+                limits=httpx.Limits(max_connections=self.max_connections),
+                timeout=30.0,
+            )
+        return self._http
+
+    @property
+    def chat_rate_limiter(self):
+        """Paces Google Chat posts per space across every task of the run."""
+        if self._chat_rate_limiter is None:
+            from auto_research_agent.src.chat_utils import DEFAULT_MIN_INTERVAL, SpaceRateLimiter
+
+            min_interval = float(os.environ.get("RESEARCH_CHAT_MIN_INTERVAL", DEFAULT_MIN_INTERVAL))
+            self._chat_rate_limiter = SpaceRateLimiter(min_interval)
+        return self._chat_rate_limiter
+
+    async def aclose(self):
+        if self._notion is not None:
+            await self._notion.aclose()
+        if self._http is not None:
+            await self._http.aclose()
+        if self._genai is not None:
+            self._genai.close()
+
+
+class OfflineClient:
+    """Stand-in for genai.Client that refuses any network access."""
+
+    def __getattr__(self, name):
+        raise RuntimeError("Network access is disabled in dry-run mode.")
+
+
+class OfflineClients(SharedClients):
+    """Client set for --dry-run: Gemini calls fail fast and no sink client exists."""
+
+    @property
+    def genai(self):
+        return OfflineClient()
+
+    @property
+    def notion(self):
+        return None
+
+    @property
+    def http(self):
+        return None
+
+    @property
+    def chat_rate_limiter(self):
+        return None
@@ -0,0 +1,183 @@
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import time
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CONTEXT_CACHE_PATH = os.path.join(".cache", "context_caches.json")
+DEFAULT_TTL_SECONDS = 3600
+# Below ~1024 tokens no model accepts cached content, so shorter prefixes stay inline
+MIN_CACHE_CHARS = 4096
+# Models that rejected a prefix (e.g. too few tokens) are not asked again for a day
+REJECTED_RETRY_SECONDS = 24 * 3600
+STALE_CACHE_STATUSES = {400, 403, 404}
+
+
+def is_stale_cache_error(e: Exception) -> bool:
+    """A request naming a deleted, expired or foreign cached content fails with one of these."""
+    return getattr(e, "code", None) in STALE_CACHE_STATUSES
+
+
+def _tools_signature(tools) -> list:
+    return [
+        tool.model_dump(mode="json", exclude_none=True) if hasattr(tool, "model_dump") else repr(tool)
+        for tool in tools or ()
+    ]
+
+
+class ContextCacheRegistry:
+    """Gemini cached-content handles for static prompt prefixes.
+
+    A prefix is the system instruction plus the tools of a request. Each
+    (model, prefix) pair is uploaded once with caches.create and its handle is
+    recorded in a JSON file with its expiry time, so later calls and later runs
+    reuse it. Handles in the last part of their lifetime are extended with
+    caches.update when used, instead of being uploaded again once expired. Prefixes that are too short, or that the model
+    rejects, are left inline.
+    """
+
+    def __init__(
+        self,
+        path: str | None = None,
+        ttl_seconds: int = DEFAULT_TTL_SECONDS,
+        refresh_margin: float | None = None,
+        min_chars: int = MIN_CACHE_CHARS,
+        clock=time.time,
+    ):
+        """
+        Args:
+            path: JSON file of known handles (default: RESEARCH_CONTEXT_CACHE or
+                .cache/context_caches.json). None for the default; "" keeps them in memory.
+            ttl_seconds: Lifetime requested for new and extended handles.
+            refresh_margin: Seconds before expiry from which a used handle is extended
+                (default: half the TTL, so a handle used that often never expires).
+            min_chars: Shorter system instructions are never cached.
+            clock: Returns the current Unix time; replaceable in tests.
+        """
+        if path is None:
+            path = os.environ.get("RESEARCH_CONTEXT_CACHE", DEFAULT_CONTEXT_CACHE_PATH)
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.refresh_margin = ttl_seconds / 2 if refresh_margin is None else refresh_margin
+        self.min_chars = min_chars
+        self.clock = clock
+        self.entries = self._load()
+        self._locks = {}
+        self.uploads = 0
+        self.refreshes = 0
+
+    @staticmethod
+    def make_key(model: str, system_instruction: str, tools=None) -> str:
+        payload = json.dumps([model, system_instruction, _tools_signature(tools)], sort_keys=True)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _load(self) -> dict:
+        if not self.path or not os.path.exists(self.path):
+            return {}
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                entries = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable context cache registry {self.path}: {e}")
+            return {}
+        now = self.clock()
+        return {key: entry for key, entry in entries.items() if entry.get("expires_at", 0) > now}
+
+    def save(self):
+        if not self.path:
+            return
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.entries, f, indent=2)
+        os.replace(tmp_path, self.path)
+
+    async def acquire(self, client, model: str, system_instruction: str, tools=None) -> str | None:
+        """Returns the name of a live cached content holding the prefix, or None to send it inline."""
+        if not system_instruction or len(system_instruction) < self.min_chars:
+            return None
+        key = self.make_key(model, system_instruction, tools)
+        # One upload per prefix even when many calls ask for it at once
+        lock = self._locks.setdefault(key, asyncio.Lock())
+        async with lock:
+            entry = self.entries.get(key)
+            now = self.clock()
+            if entry is not None and entry["expires_at"] <= now:
+                entry = None
+            if entry is not None and entry.get("rejected"):
+                return None
+            if entry is not None:
+                if entry["expires_at"] - now > self.refresh_margin:
+                    return entry["name"]
+                if await self._refresh(client, key, entry):
+                    return entry["name"]
+            return await self._create(client, key, model, system_instruction, tools)
+
+    async def _create(self, client, key, model, system_instruction, tools) -> str | None:
+        try:
+            cached = await client.aio.caches.create(
+                model=model,
+                config={
+                    "system_instruction": system_instruction,
+                    "tools": tools,
+                    "ttl": f"{self.ttl_seconds}s",
+                    "display_name": f"auto-research-agent-{key[:12]}",
+                },
+            )
+        except Exception as e:
+            if getattr(e, "code", None) == 400:
+                # Usually too few tokens for this model; the prefix will not grow by itself
+                logger.info(f"{model} does not cache this system instruction, sending it inline: {e}")
+                self.entries[key] = {
+                    "rejected": True,
+                    "model": model,
+                    "expires_at": self.clock() + REJECTED_RETRY_SECONDS,
+                }
+                self.save()
+            else:
+                logger.warning(f"Could not create cached content for {model}, sending the prefix inline: {e}")
+            return None
+
+        self.uploads += 1
+        self.entries[key] = {
+            "name": cached.name,
+            "model": model,
+            "expires_at": self._expires_at(cached),
+        }
+        self.save()
+        logger.info(
+            f"Cached {len(system_instruction)} characters of system instruction for {model} as {cached.name}"
+        )
+        return cached.name
+
+    async def _refresh(self, client, key, entry) -> bool:
+        try:
+            cached = await client.aio.caches.update(
+                name=entry["name"], config={"ttl": f"{self.ttl_seconds}s"}
+            )
+        except Exception as e:
+            logger.info(f"Could not extend {entry['name']}, uploading it again: {e}")
+            del self.entries[key]
+            return False
+        self.refreshes += 1
+        entry["expires_at"] = self._expires_at(cached)
+        self.save()
+        return True
+
+    def _expires_at(self, cached) -> float:
+        expire_time = getattr(cached, "expire_time", None)
+        if expire_time is not None:
+            return expire_time.timestamp()
+        return self.clock() + self.ttl_seconds
+
+    def invalidate(self, name: str):
+        """Forgets a handle the API no longer accepts."""
+        for key, entry in list(self.entries.items()):
+            if entry.get("name") == name:
+                del self.entries[key]
+        self.save()
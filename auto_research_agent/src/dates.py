@@ -0,0 +1,231 @@
+import functools
+import re
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+
+# Matches "2025-10-03" and the date part of ISO timestamps ("2025-10-03T12:00:00Z")
+ISO_DATE = re.compile(r"(\d{4})-(\d{2})-(\d{2})(?:$|[T ])")
+
+# Fallback formats, tried in order, with the precision they carry
+FALLBACK_FORMATS = (
+    ("%Y-%m-%d", "day"),
+    ("%Y/%m/%d", "day"),
+    ("%Y.%m.%d", "day"),
+    ("%b %d, %Y", "day"),
+    ("%B %d, %Y", "day"),
+    ("%b %d %Y", "day"),
+    ("%B %d %Y", "day"),
+    ("%d %b %Y", "day"),
+    ("%d %B %Y", "day"),
+    ("%b. %d, %Y", "day"),
+    ("%Y-%m", "month"),
+    ("%Y/%m", "month"),
+    ("%b %Y", "month"),
+    ("%B %Y", "month"),
+    ("%Y", "year"),
+)
+
+# Minimum number of distinct date strings before the NumPy path is worth its setup cost
+NUMPY_MIN_DISTINCT = 512
+
+
+@dataclass(frozen=True)
+class ParsedDate:
+    start: date
+    end: date
+    precision: str  # "day", "month" or "year"
+
+    def isoformat(self) -> str:
+        if self.precision == "year":
+            return f"{self.start.year:04d}"
+        if self.precision == "month":
+            return f"{self.start.year:04d}-{self.start.month:02d}"
+        return self.start.isoformat()
+
+
+@dataclass(frozen=True)
+class DatePolicy:
+    """How publication dates are judged against the lookback window.
+
+    Attributes:
+        unparseable: "keep" or "drop" items whose date cannot be parsed.
+        partial: For month- or year-only dates, compare the "end" (lenient) or
+            the "start" (strict) of the period with the cutoff.
+        grace_days: Extra days added to the lookback window.
+        max_future_days: Drop items dated more than this many days ahead
+            (None disables the check).
+    """
+
+    unparseable: str = "keep"
+    partial: str = "end"
+    grace_days: int = 0
+    max_future_days: int | None = None
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "DatePolicy":
+        policy = cls(**data)
+        if policy.unparseable not in ("keep", "drop"):
+            raise ValueError(f"unparseable must be 'keep' or 'drop', not {policy.unparseable!r}")
+        if policy.partial not in ("start", "end"):
+            raise ValueError(f"partial must be 'start' or 'end', not {policy.partial!r}")
+        return policy
+
+
+def _month_end(year: int, month: int) -> date:
+    if month == 12:
+        return date(year, 12, 31)
+    return date(year, month + 1, 1) - timedelta(days=1)
+
+
+@functools.lru_cache(maxsize=4096)
+def parse_date(text: str) -> ParsedDate | None:
+    """Parses a publication date in any of the supported formats (memoized per string)."""
+    text = text.strip()
+    match = ISO_DATE.match(text)
+    if match:
+        try:
+            day = date(int(match[1]), int(match[2]), int(match[3]))
+            return ParsedDate(day, day, "day")
+        except ValueError:
+            return None
+
+    for fmt, precision in FALLBACK_FORMATS:
+        try:
+            parsed = datetime.strptime(text, fmt).date()
+        except ValueError:
+            continue
+        if precision == "month":
+            return ParsedDate(parsed, _month_end(parsed.year, parsed.month), precision)
+        if precision == "year":
+            return ParsedDate(parsed, date(parsed.year, 12, 31), precision)
+        return ParsedDate(parsed, parsed, precision)
+    return None
+
+
+def normalize_date(text: str) -> str:
+    """Returns the date as YYYY-MM-DD (or YYYY-MM / YYYY for partial dates), or the input if unparseable."""
+    parsed = parse_date(text)
+    return parsed.isoformat() if parsed is not None else text
+
+
+def _numpy():
+    try:
+        import numpy
+    except ImportError:
+        return None
+    return numpy
+
+
+class DateFilter:
+    """Decides which publication dates fall inside the lookback window.
+
+    "now" is taken once, at construction, so every item of a run is judged
+    against the same cutoff.
+    """
+
+    def __init__(self, days_lookback: int = 30, policy: DatePolicy | None = None, now: datetime | None = None):
+        self.policy = policy or DatePolicy()
+        self.now = now or datetime.now()
+        today = self.now.date()
+        self.cutoff = today - timedelta(days=days_lookback + self.policy.grace_days)
+        self.latest = (
+            today + timedelta(days=self.policy.max_future_days)
+            if self.policy.max_future_days is not None
+            else date.max
+        )
+
+    @property
+    def report_date(self) -> str:
+        return self.now.strftime("%Y-%m-%d")
+
+    def _comparable(self, parsed: ParsedDate) -> date:
+        return parsed.end if self.policy.partial == "end" else parsed.start
+
+    def keep(self, text: str) -> bool | None:
+        """True if the date is inside the window, False if not, None if it cannot be parsed."""
+        parsed = parse_date(text)
+        if parsed is None:
+            return None
+        day = self._comparable(parsed)
+        return self.cutoff <= day and parsed.start <= self.latest
+
+    def keep_unparseable(self) -> bool:
+        return self.policy.unparseable == "keep"
+
+    def mask(self, texts: list[str]) -> list[bool]:
+        """Vectorized keep() over many dates; unparseable ones follow the policy."""
+        return self.evaluate(texts)[0]
+
+    def evaluate(self, texts: list[str]) -> tuple[list[bool], list[str | None]]:
+        """Returns the keep mask and the normalized dates (None if unparseable) of texts.
+
+        Each distinct string is parsed once. With NumPy installed and at least
+        NUMPY_MIN_DISTINCT distinct strings, ISO dates are parsed and compared
+        as datetime64 arrays.
+        """
+        distinct = {}
+        codes = [distinct.setdefault(text, len(distinct)) for text in texts]
+        np = _numpy() if len(distinct) >= NUMPY_MIN_DISTINCT else None
+        if np is None:
+            default = self.keep_unparseable()
+            keep = []
+            normalized = []
+            for text in distinct:
+                parsed = parse_date(text)
+                if parsed is None:
+                    keep.append(default)
+                    normalized.append(None)
+                else:
+                    day = self._comparable(parsed)
+                    keep.append(self.cutoff <= day and parsed.start <= self.latest)
+                    normalized.append(parsed.isoformat())
+            return [keep[code] for code in codes], [normalized[code] for code in codes]
+
+        keep, normalized = self._evaluate_numpy(np, list(distinct))
+        return [keep[code] for code in codes], [normalized[code] for code in codes]
+
+    def _evaluate_numpy(self, np, distinct: list[str]) -> tuple[list[bool], list[str | None]]:
+        normalized = [None] * len(distinct)
+        nat = np.datetime64("NaT", "D")
+        compared = np.full(len(distinct), nat, dtype="datetime64[D]")
+        starts = np.full(len(distinct), nat, dtype="datetime64[D]")
+
+        # ISO dates and timestamps: the YYYY-MM-DD prefix is parsed by NumPy in one call
+        iso_index = []
+        iso_days = []
+        others = []
+        for i, text in enumerate(distinct):
+            stripped = text.strip()
+            if ISO_DATE.match(stripped):
+                iso_index.append(i)
+                iso_days.append(stripped[:10])
+            else:
+                others.append(i)
+        try:
+            days = np.array(iso_days, dtype="datetime64[D]")
+            valid_years = (days >= np.datetime64("0001-01-01")) & (days <= np.datetime64("9999-12-31"))
+            if not valid_years.all():
+                raise ValueError("year out of range")
+        except ValueError:
+            # An invalid ISO date (e.g. month 13) in the batch; parse these one by one
+            others.extend(iso_index)
+        else:
+            compared[iso_index] = days
+            starts[iso_index] = days
+            for i, day in zip(iso_index, iso_days):
+                normalized[i] = day
+
+        for i in others:
+            parsed = parse_date(distinct[i])
+            if parsed is not None:
+                compared[i] = np.datetime64(self._comparable(parsed), "D")
+                starts[i] = np.datetime64(parsed.start, "D")
+                normalized[i] = parsed.isoformat()
+
+        valid = ~np.isnat(compared)
+        keep = (compared >= np.datetime64(self.cutoff, "D")) & valid
+        if self.latest != date.max:
+            keep &= starts <= np.datetime64(self.latest, "D")
+        if self.keep_unparseable():
+            keep |= ~valid
+        return keep.tolist(), normalized
@@ -0,0 +1,327 @@
+import base64
+import hashlib
+import json
+import logging
+import math
+import os
+import re
+import threading
+import unicodedata
+from array import array
+
+from auto_research_agent.src.seen_index import normalize_link
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_EMBEDDING_CACHE_PATH = os.path.join(".cache", "embeddings.jsonl")
+DEFAULT_EMBEDDING_MODEL = "gemini-embedding-001"
+# NumPy takes ~80ms to import; below this many items the pure-Python pass is cheaper overall
+NUMPY_MIN_ITEMS = 256
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+_STOPWORDS = frozenset(
+    "a an and are as at be by for from in into is it its of on or that the this to via with "
+    "we our their using based new paper project page code official implementation repository "
+    "http https www com org io html abs pdf".split()
+)
+# Preferred representative of a cluster, by link: paper pages first, code last
+_LINK_RANKS = (
+    (re.compile(r"^arxiv:"), 0),
+    (re.compile(r"^(doi\.org|dl\.acm\.org|ieeexplore\.ieee\.org|openreview\.net|link\.springer\.com)/"), 1),
+    (re.compile(r"^(github\.com|gitlab\.com|huggingface\.co)/"), 3),
+)
+
+
+def _numpy():
+    try:
+        import numpy
+    except ImportError:
+        return None
+    return numpy
+
+
+def _tokens(text: str) -> list[str]:
+    text = unicodedata.normalize("NFKD", text).encode("ascii", "ignore").decode().lower()
+    return [t for t in _TOKEN_RE.findall(text) if t not in _STOPWORDS]
+
+
+def _link_rank(link_key: str) -> int:
+    for pattern, rank in _LINK_RANKS:
+        if pattern.match(link_key):
+            return rank
+    return 2
+
+
+class TfidfEmbedder:
+    """Offline embedder: TF-IDF over word unigrams and bigrams, fitted on each batch.
+
+    Vectors are sparse {feature: weight} dicts with unit norm. Features that
+    occur in a single text cannot make two texts similar, so they only count
+    towards the norm and are left out of the vectors.
+    """
+
+    name = "tfidf"
+    default_threshold = 0.5
+
+    def embed(self, texts: list[str]) -> list[dict]:
+        counts = []
+        document_frequency = {}
+        for text in texts:
+            words = _tokens(text)
+            features = {}
+            for feature in words + [f"{a} {b}" for a, b in zip(words, words[1:])]:
+                features[feature] = features.get(feature, 0) + 1
+            counts.append(features)
+            for feature in features:
+                document_frequency[feature] = document_frequency.get(feature, 0) + 1
+
+        n = len(texts)
+        vocabulary = {}
+        vectors = []
+        for features in counts:
+            vector = {}
+            norm = 0.0
+            for feature, count in features.items():
+                df = document_frequency[feature]
+                weight = (1.0 + math.log(count)) * (math.log((1 + n) / (1 + df)) + 1.0)
+                norm += weight * weight
+                if df > 1:
+                    index = vocabulary.setdefault(feature, len(vocabulary))
+                    vector[index] = weight
+            norm = math.sqrt(norm) or 1.0
+            vectors.append({index: weight / norm for index, weight in vector.items()})
+        return vectors
+
+
+class EmbeddingCache:
+    """Embeddings on disk, keyed by a hash of the model and the embedded text.
+
+    One JSON line per vector, stored as base64 float32. Lines are loaded into
+    a dict on first use and new vectors are appended by save().
+    """
+
+    def __init__(self, path: str | None = None):
+        self.path = path or os.environ.get("RESEARCH_EMBEDDING_CACHE", DEFAULT_EMBEDDING_CACHE_PATH)
+        self._vectors = None
+        self._pending = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(model: str, text: str) -> str:
+        return hashlib.blake2b(f"{model}\n{text}".encode("utf-8"), digest_size=16).hexdigest()
+
+    def _load(self) -> dict:
+        if self._vectors is None:
+            self._vectors = {}
+            try:
+                with open(self.path, encoding="utf-8") as f:
+                    for line in f:
+                        try:
+                            entry = json.loads(line)
+                        except ValueError:
+                            continue
+                        self._vectors[entry["key"]] = entry["vector"]
+            except FileNotFoundError:
+                pass
+        return self._vectors
+
+    def get(self, key: str) -> list[float] | None:
+        encoded = self._load().get(key)
+        if encoded is None:
+            return None
+        return array("f", base64.b64decode(encoded)).tolist()
+
+    def set(self, key: str, vector: list[float]):
+        encoded = base64.b64encode(array("f", vector).tobytes()).decode("ascii")
+        with self._lock:
+            self._load()[key] = encoded
+            self._pending[key] = encoded
+
+    def save(self):
+        with self._lock:
+            if not self._pending:
+                return
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with open(self.path, "a", encoding="utf-8") as f:
+                for key, encoded in self._pending.items():
+                    f.write(json.dumps({"key": key, "vector": encoded}) + "\n")
+            self._pending.clear()
+
+
+class GeminiEmbedder:
+    """Embeds texts with a Gemini embedding model, serving known texts from an EmbeddingCache."""
+
+    name = "gemini"
+    default_threshold = 0.88
+
+    def __init__(
+        self,
+        client,
+        model: str = DEFAULT_EMBEDDING_MODEL,
+        cache: EmbeddingCache | None = None,
+        dimensions: int = 768,
+        batch_size: int = 100,
+    ):
+        """
+        Args:
+            client: genai.Client used for embed_content calls.
+            model: Embedding model name.
+            cache: EmbeddingCache for vectors of texts embedded before (default: none).
+            dimensions: Requested output dimensionality.
+            batch_size: Texts sent per embed_content call.
+        """
+        self.client = client
+        self.model = model
+        self.cache = cache
+        self.dimensions = dimensions
+        self.batch_size = batch_size
+
+    def embed(self, texts: list[str]) -> list[list[float]]:
+        keys = [EmbeddingCache.make_key(f"{self.model}/{self.dimensions}", text) for text in texts]
+        vectors = [self.cache.get(key) if self.cache else None for key in keys]
+        missing = [i for i, vector in enumerate(vectors) if vector is None]
+        if missing:
+            logger.info(f"Embedding {len(missing)} texts with {self.model} ({len(texts) - len(missing)} cached)")
+        for start in range(0, len(missing), self.batch_size):
+            batch = missing[start : start + self.batch_size]
+            response = self.client.models.embed_content(
+                model=self.model,
+                contents=[texts[i] for i in batch],
+                config={"task_type": "SEMANTIC_SIMILARITY", "output_dimensionality": self.dimensions},
+            )
+            for i, embedding in zip(batch, response.embeddings):
+                values = list(embedding.values)
+                # Truncated outputs are not unit length
+                norm = math.sqrt(sum(v * v for v in values)) or 1.0
+                vectors[i] = [v / norm for v in values]
+                if self.cache:
+                    self.cache.set(keys[i], vectors[i])
+        if missing and self.cache:
+            self.cache.save()
+        return vectors
+
+
+def similar_pairs(vectors: list, threshold: float) -> list[tuple[int, int]]:
+    """Returns the index pairs (i < j) of unit vectors whose cosine similarity is >= threshold.
+
+    Vectors are either sparse {feature: weight} dicts or dense float lists.
+    """
+    n = len(vectors)
+    if n < 2:
+        return []
+    np = _numpy() if n >= NUMPY_MIN_ITEMS else None
+    if np is not None:
+        if isinstance(vectors[0], dict):
+            dim = 1 + max((max(v) for v in vectors if v), default=0)
+            matrix = np.zeros((n, dim), dtype=np.float32)
+            for row, vector in enumerate(vectors):
+                if vector:
+                    matrix[row, list(vector)] = list(vector.values())
+        else:
+            matrix = np.asarray(vectors, dtype=np.float32)
+        similarity = np.triu(matrix @ matrix.T, k=1)
+        rows, cols = np.nonzero(similarity >= threshold)
+        return list(zip(rows.tolist(), cols.tolist()))
+
+    pairs = []
+    if isinstance(vectors[0], dict):
+        # Inverted index: only texts sharing a feature are ever compared
+        postings = {}
+        for doc, vector in enumerate(vectors):
+            for feature, weight in vector.items():
+                postings.setdefault(feature, []).append((doc, weight))
+        for i, vector in enumerate(vectors):
+            scores = {}
+            for feature, weight in vector.items():
+                for j, other in postings[feature]:
+                    if j > i:
+                        scores[j] = scores.get(j, 0.0) + weight * other
+            pairs.extend((i, j) for j, score in scores.items() if score >= threshold)
+        return sorted(pairs)
+
+    for i in range(n):
+        a = vectors[i]
+        for j in range(i + 1, n):
+            if sum(x * y for x, y in zip(a, vectors[j])) >= threshold:
+                pairs.append((i, j))
+    return pairs
+
+
+class NearDuplicateDetector:
+    """Groups items that describe the same work and keeps one item per group.
+
+    Items with the same normalized link are always grouped. Otherwise, title
+    and summary are embedded and items whose cosine similarity reaches the
+    threshold are grouped, transitively. From each group the item with the
+    most canonical link (arXiv, then publisher pages, then other pages, then
+    code hosts) is kept, at the position of the group's first item.
+    """
+
+    def __init__(self, embedder=None, threshold: float | None = None):
+        """
+        Args:
+            embedder: TfidfEmbedder (default, offline) or GeminiEmbedder.
+            threshold: Cosine similarity at which two items are duplicates
+                (default: the embedder's default_threshold).
+        """
+        self.embedder = embedder or TfidfEmbedder()
+        self.threshold = self.embedder.default_threshold if threshold is None else threshold
+
+    @staticmethod
+    def _text(title: str, summary: str, link: str) -> str:
+        # Repository and project page links usually carry the method's name
+        return f"{title}\n{summary}\n{link}"
+
+    def clusters(self, titles, summaries, links) -> list[list[int]]:
+        """Returns the groups of item indices, each sorted, ordered by first item."""
+        n = len(titles)
+        parent = list(range(n))
+
+        def find(i):
+            while parent[i] != i:
+                parent[i] = parent[parent[i]]
+                i = parent[i]
+            return i
+
+        def union(i, j):
+            a, b = find(i), find(j)
+            if a != b:
+                parent[max(a, b)] = min(a, b)
+
+        first_by_link = {}
+        for i, link in enumerate(links):
+            key = normalize_link(link)
+            if key:
+                union(first_by_link.setdefault(key, i), i)
+        vectors = self.embedder.embed([self._text(*fields) for fields in zip(titles, summaries, links)])
+        for i, j in similar_pairs(vectors, self.threshold):
+            union(i, j)
+
+        groups = {}
+        for i in range(n):
+            groups.setdefault(find(i), []).append(i)
+        return list(groups.values())
+
+    def dedup(self, digest_data):
+        """Drops near-duplicate items from a CompactDigest, in place, and returns it."""
+        store = digest_data.items
+        if len(store) < 2:
+            return digest_data
+        titles = store.column("title")
+        links = store.column("source_link")
+        groups = self.clusters(titles, store.column("summary"), links)
+        if len(groups) == len(store):
+            return digest_data
+
+        kept = []
+        for group in groups:
+            best = min(group, key=lambda i: (_link_rank(normalize_link(links[i])), i))
+            kept.append(best)
+            if len(group) > 1:
+                dropped = ", ".join(f"{titles[i]} <{links[i]}>" for i in group if i != best)
+                logger.info(f"Keeping {titles[best]} <{links[best]}> over near-duplicates: {dropped}")
+        digest_data.items = store.take(kept)
+        logger.info(f"Merged near-duplicates: {len(store)} items -> {len(kept)}")
+        return digest_data
@@ -0,0 +1,155 @@
+import asyncio
+import logging
+import time
+
+from auto_research_agent.src.gemini_caller import is_retryable_gemini_error
+from auto_research_agent.src.retry import retry_with_backoff
+
+logger = logging.getLogger(__name__)
+
+# Batch requests are billed at half the interactive price
+BATCH_PRICE_FACTOR = 0.5
+SUCCEEDED_STATES = {"JOB_STATE_SUCCEEDED", "JOB_STATE_PARTIALLY_SUCCEEDED"}
+FAILED_STATES = {"JOB_STATE_FAILED", "JOB_STATE_CANCELLED", "JOB_STATE_EXPIRED"}
+
+
+def _state_name(job) -> str:
+    return str(getattr(job.state, "value", job.state))
+
+
+class GeminiBatcher:
+    """Collects generate_content requests from all running tasks into Batch API jobs.
+
+    generate() enqueues a request and waits for its response. Once no new
+    request has arrived for collect_window seconds, the queue is submitted as
+    one inline batch job per model (split at max_requests_per_job), and each
+    job is polled with exponential backoff until it finishes.
+    """
+
+    def __init__(
+        self,
+        client,
+        collect_window: float = 2.0,
+        poll_interval: float = 30.0,
+        max_poll_interval: float = 300.0,
+        timeout: float = 24 * 3600,
+        max_requests_per_job: int = 100,
+        display_name: str = "auto-research-agent",
+    ):
+        """
+        Args:
+            client: genai.Client (or a fake exposing aio.batches.create/get).
+            collect_window: Seconds without new requests before the queue is submitted.
+            poll_interval: Initial delay between job status checks.
+            max_poll_interval: Upper bound of the growing poll delay.
+            timeout: Seconds to wait for a job before giving up on it.
+            max_requests_per_job: Inline requests per batch job.
+            display_name: Prefix of the job display names.
+        """
+        self.client = client
+        self.collect_window = collect_window
+        self.poll_interval = poll_interval
+        self.max_poll_interval = max_poll_interval
+        self.timeout = timeout
+        self.max_requests_per_job = max(1, max_requests_per_job)
+        self.display_name = display_name
+        self.pending = []
+        self.jobs = set()
+        self._flush_handle = None
+        self._job_count = 0
+
+    async def generate(self, model: str, contents, config):
+        """Queues one request and returns its GenerateContentResponse once the batch is done."""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self.pending.append((model, contents, config, future))
+
+        # Every new request restarts the collection window
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+        self._flush_handle = loop.call_later(self.collect_window, self._flush)
+        return await future
+
+    def _flush(self):
+        self._flush_handle = None
+        queued, self.pending = self.pending, []
+
+        by_model = {}
+        for entry in queued:
+            by_model.setdefault(entry[0], []).append(entry)
+
+        for model, entries in by_model.items():
+            for i in range(0, len(entries), self.max_requests_per_job):
+                job = asyncio.ensure_future(
+                    self._run_job(model, entries[i : i + self.max_requests_per_job])
+                )
+                # Keep a reference so the job is not garbage collected mid-flight
+                self.jobs.add(job)
+                job.add_done_callback(self.jobs.discard)
+
+    async def _run_job(self, model: str, entries: list):
+        futures = [entry[3] for entry in entries]
+        try:
+            from google.genai import types
+
+            self._job_count += 1
+            requests = [
+                types.InlinedRequest(contents=contents, config=config)
+                for _, contents, config, _ in entries
+            ]
+            job, _ = await retry_with_backoff(
+                lambda: self.client.aio.batches.create(
+                    model=model,
+                    src=requests,
+                    config={"display_name": f"{self.display_name}-{self._job_count}"},
+                ),
+                is_retryable=is_retryable_gemini_error,
+                description="Batch job submission",
+            )
+            logger.info(f"Submitted batch job {job.name} with {len(requests)} requests for {model}")
+
+            job = await self._wait(job)
+            responses = list(job.dest.inlined_responses or []) if job.dest else []
+            if len(responses) != len(futures):
+                logger.warning(
+                    f"Batch job {job.name} returned {len(responses)} responses for {len(futures)} requests"
+                )
+
+            for future, response in zip(futures, responses):
+                if future.done():
+                    continue
+                if response.error is not None or response.response is None:
+                    future.set_exception(RuntimeError(f"Batch request failed: {response.error}"))
+                else:
+                    future.set_result(response.response)
+            error = RuntimeError(f"No response for request in batch job {job.name}")
+        except Exception as e:
+            logger.error(f"Batch job for {model} failed: {e}")
+            error = e
+
+        for future in futures:
+            if not future.done():
+                future.set_exception(error)
+
+    async def _wait(self, job):
+        """Polls the job with a growing delay until it reaches a terminal state."""
+        start = time.monotonic()
+        delay = self.poll_interval
+        while True:
+            state = _state_name(job)
+            if state in SUCCEEDED_STATES:
+                logger.info(f"Batch job {job.name} finished in {time.monotonic() - start:.0f}s ({state})")
+                return job
+            if state in FAILED_STATES:
+                raise RuntimeError(f"Batch job {job.name} ended in {state}: {job.error}")
+            if time.monotonic() - start + delay > self.timeout:
+                raise TimeoutError(f"Batch job {job.name} still {state} after {self.timeout:.0f}s")
+
+            logger.info(f"Batch job {job.name} is {state}; next check in {delay:.0f}s")
+            await asyncio.sleep(delay)
+            delay = min(self.max_poll_interval, delay * 1.5)
+            job, _ = await retry_with_backoff(
+                lambda: self.client.aio.batches.get(name=job.name),
+                is_retryable=is_retryable_gemini_error,
+                description=f"Batch job {job.name} status check",
+            )
@@ -0,0 +1,202 @@
+import asyncio
+import json
+import logging
+import os
+import time
+from dataclasses import dataclass
+
+from auto_research_agent.src.retry import retry_with_backoff
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_HISTORY_PATH = os.path.join(".cache", "gemini_latency.json")
+RETRYABLE_STATUSES = {408, 429, 500, 502, 503, 504}
+
+
+def is_retryable_gemini_error(e: Exception) -> bool:
+    """Rate limits, server errors, timeouts and dropped connections are retried."""
+    if isinstance(e, asyncio.TimeoutError):
+        return True
+    # google.genai.errors.APIError carries the HTTP status as .code
+    if getattr(e, "code", None) in RETRYABLE_STATUSES:
+        return True
+
+    import httpx
+
+    return isinstance(e, httpx.TransportError)
+
+
+class LatencyHistory:
+    """Recent successful call latencies per model, optionally persisted as JSON."""
+
+    def __init__(self, path: str | None = None, max_samples: int = 200):
+        """
+        Args:
+            path: JSON file the history is loaded from and saved to. None keeps it in memory.
+            max_samples: Latencies kept per model (oldest are dropped first).
+        """
+        self.path = path
+        self.max_samples = max_samples
+        self.samples = {}
+        if path and os.path.exists(path):
+            try:
+                with open(path, encoding="utf-8") as f:
+                    self.samples = json.load(f)
+            except (OSError, ValueError) as e:
+                logger.warning(f"Ignoring unreadable latency history {path}: {e}")
+
+    def record(self, model: str, seconds: float):
+        samples = self.samples.setdefault(model, [])
+        samples.append(round(seconds, 3))
+        del samples[: -self.max_samples]
+
+    def percentile(self, model: str, q: float = 0.95, min_samples: int = 5) -> float | None:
+        """Returns the q-quantile latency of the model, or None with too few samples."""
+        samples = self.samples.get(model, [])
+        if len(samples) < min_samples:
+            return None
+        ordered = sorted(samples)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+    def save(self):
+        if not self.path:
+            return
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.samples, f)
+        os.replace(tmp_path, self.path)
+
+
+@dataclass
+class CallReport:
+    model: str
+    attempts: int = 0
+    hedged: bool = False
+
+
+class ResilientCaller:
+    """Runs a Gemini request with retries, an overall deadline, hedging and a fallback model.
+
+    Failed attempts are retried with jittered exponential backoff as long as the
+    next one can start before the deadline. With hedging, a second identical
+    request is sent when the first has not answered after the model's p95
+    latency, and whichever answers first wins. Attempts with the primary model
+    stop fallback_margin seconds before the deadline; from then on (or once the
+    primary model's p95 exceeds the time left), fallback_model is used.
+    """
+
+    def __init__(
+        self,
+        history: LatencyHistory | None = None,
+        deadline: float = 900.0,
+        max_retries: int = 3,
+        base_delay: float = 2.0,
+        max_delay: float = 60.0,
+        hedge: bool = False,
+        hedge_delay: float = 90.0,
+        hedge_percentile: float = 0.95,
+        fallback_model: str | None = None,
+        fallback_margin: float = 120.0,
+    ):
+        """
+        Args:
+            history: LatencyHistory shared by all calls (default: in-memory only).
+            deadline: Seconds allowed for a call, including retries.
+            max_retries: Retries after the first attempt.
+            base_delay: Initial backoff delay in seconds.
+            max_delay: Maximum backoff delay in seconds.
+            hedge: Send a second request when the first is slower than usual.
+            hedge_delay: Hedge delay used until the model has enough latency samples.
+            hedge_percentile: Quantile of past latencies used as the hedge delay.
+            fallback_model: Faster or cheaper model used when the deadline is near.
+            fallback_margin: Seconds left before the deadline below which the fallback is used.
+        """
+        self.history = history or LatencyHistory()
+        self.deadline = deadline
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.hedge = hedge
+        self.hedge_delay = hedge_delay
+        self.hedge_percentile = hedge_percentile
+        self.fallback_model = fallback_model
+        self.fallback_margin = fallback_margin
+
+    def hedge_delay_for(self, model: str) -> float:
+        p = self.history.percentile(model, self.hedge_percentile)
+        return max(1.0, p if p is not None else self.hedge_delay)
+
+    def _choose_model(self, model: str, remaining: float) -> str:
+        if not self.fallback_model or self.fallback_model == model:
+            return model
+        p95 = self.history.percentile(model)
+        if remaining < self.fallback_margin or (p95 is not None and p95 > remaining):
+            logger.warning(
+                f"{remaining:.0f}s left before the deadline; falling back to {self.fallback_model}"
+            )
+            return self.fallback_model
+        return model
+
+    async def _timed(self, request, model: str):
+        start = time.perf_counter()
+        response = await request(model)
+        self.history.record(model, time.perf_counter() - start)
+        return response
+
+    async def _hedged(self, request, model: str, report: CallReport):
+        if not self.hedge:
+            return await self._timed(request, model)
+
+        delay = self.hedge_delay_for(model)
+        tasks = [asyncio.ensure_future(self._timed(request, model))]
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=delay)
+            if not done:
+                logger.info(f"No response from {model} after {delay:.0f}s; sending a hedged request")
+                report.hedged = True
+                tasks.append(asyncio.ensure_future(self._timed(request, model)))
+
+            pending = set(tasks)
+            error = None
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def call(self, request, model: str):
+        """Awaits request(model_name) resiliently. Returns (response, CallReport)."""
+        deadline = time.monotonic() + self.deadline
+        report = CallReport(model)
+
+        async def attempt():
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise asyncio.TimeoutError("Gemini call deadline exceeded")
+            report.model = self._choose_model(model, remaining)
+            timeout = remaining
+            if self.fallback_model and report.model != self.fallback_model:
+                # Leave time for the fallback model if the primary does not answer
+                timeout = remaining - self.fallback_margin
+            return await asyncio.wait_for(
+                self._hedged(request, report.model, report), timeout=timeout
+            )
+
+        response, report.attempts = await retry_with_backoff(
+            attempt,
+            max_retries=self.max_retries,
+            base_delay=self.base_delay,
+            max_delay=self.max_delay,
+            is_retryable=is_retryable_gemini_error,
+            description=f"Gemini call ({model})",
+            deadline=deadline,
+        )
+        return response, report
@@ -0,0 +1,189 @@
+import functools
+from array import array
+from dataclasses import dataclass
+from typing import Any, NamedTuple
+
+
+class ItemRow(NamedTuple):
+    """One item read back from an ItemStore; same attributes as ResearchItem."""
+
+    title: str
+    source_link: str
+    publication_date: str
+    primary_domain: Any
+    relevance_explanation: str
+    key_innovation: str
+    summary: str
+
+
+# ItemRow field -> (codes attribute, table attribute) of the dictionary-encoded columns
+_ENCODED_COLUMNS = {
+    "source_link": ("link_codes", "links"),
+    "publication_date": ("date_codes", "dates"),
+    "primary_domain": ("domain_codes", "domains"),
+}
+# ItemRow(*fields) goes through a Python-level __new__; this builds rows in C
+_new_row = functools.partial(tuple.__new__, ItemRow)
+# ItemRow field -> list attribute of the free-text columns
+_TEXT_COLUMNS = {
+    "title": "titles",
+    "relevance_explanation": "relevance_explanations",
+    "key_innovation": "key_innovations",
+    "summary": "summaries",
+}
+
+
+class _Dictionary:
+    """Encodes repeated values as small integer codes into a table of distinct values."""
+
+    __slots__ = ("values", "index")
+
+    def __init__(self):
+        self.values = []
+        self.index = {}
+
+    def encode(self, value) -> int:
+        code = self.index.get(value)
+        if code is None:
+            code = self.index[value] = len(self.values)
+            self.values.append(value)
+        return code
+
+
+class ItemStore:
+    """Columnar storage for validated research items.
+
+    Free text is kept in one list per field. Source links, publication dates and
+    domains are dictionary-encoded: each distinct value is stored once and items
+    hold an integer code into it, so an item costs a few list slots and array
+    entries instead of a pydantic model with its own __dict__. Iterating yields
+    ItemRow tuples, which sinks read like ResearchItem objects.
+    """
+
+    __slots__ = (
+        "titles",
+        "link_codes",
+        "links",
+        "date_codes",
+        "dates",
+        "domain_codes",
+        "domains",
+        "relevance_explanations",
+        "key_innovations",
+        "summaries",
+    )
+
+    def __init__(self):
+        self.titles = []
+        self.link_codes = array("I")
+        self.links = _Dictionary()
+        self.date_codes = array("I")
+        self.dates = _Dictionary()
+        self.domain_codes = array("H")
+        self.domains = _Dictionary()
+        self.relevance_explanations = []
+        self.key_innovations = []
+        self.summaries = []
+
+    @classmethod
+    def from_items(cls, items) -> "ItemStore":
+        """Builds a store from ResearchItem models (or anything with the same attributes)."""
+        store = cls()
+        for item in items:
+            store.append(item)
+        return store
+
+    def append(self, item):
+        self.titles.append(item.title)
+        self.link_codes.append(self.links.encode(item.source_link))
+        self.date_codes.append(self.dates.encode(item.publication_date))
+        # Domains are enum members, so the table holds one shared object per domain
+        self.domain_codes.append(self.domains.encode(item.primary_domain))
+        self.relevance_explanations.append(item.relevance_explanation)
+        self.key_innovations.append(item.key_innovation)
+        self.summaries.append(item.summary)
+
+    def __len__(self) -> int:
+        return len(self.titles)
+
+    def __bool__(self) -> bool:
+        return bool(self.titles)
+
+    def __getitem__(self, index: int) -> ItemRow:
+        return ItemRow(
+            self.titles[index],
+            self.links.values[self.link_codes[index]],
+            self.dates.values[self.date_codes[index]],
+            self.domains.values[self.domain_codes[index]],
+            self.relevance_explanations[index],
+            self.key_innovations[index],
+            self.summaries[index],
+        )
+
+    def __iter__(self):
+        # The text lists are zipped as they are, not copied, and rows are built in C
+        return map(
+            _new_row,
+            zip(
+                self.titles,
+                map(self.links.values.__getitem__, self.link_codes),
+                map(self.dates.values.__getitem__, self.date_codes),
+                map(self.domains.values.__getitem__, self.domain_codes),
+                self.relevance_explanations,
+                self.key_innovations,
+                self.summaries,
+            ),
+        )
+
+    def column(self, name: str) -> list:
+        """Returns one field of every item, decoded, as a new list.
+
+        Cheaper than building rows, even when every field is read.
+        """
+        encoded = _ENCODED_COLUMNS.get(name)
+        if encoded is not None:
+            codes_attr, table_attr = encoded
+            values = getattr(self, table_attr).values
+            return [values[code] for code in getattr(self, codes_attr)]
+        return list(getattr(self, _TEXT_COLUMNS[name]))
+
+    def take(self, indices) -> "ItemStore":
+        """Returns a new store with the items at indices, in that order."""
+        store = ItemStore()
+        store.titles = [self.titles[i] for i in indices]
+        store.relevance_explanations = [self.relevance_explanations[i] for i in indices]
+        store.key_innovations = [self.key_innovations[i] for i in indices]
+        store.summaries = [self.summaries[i] for i in indices]
+        for codes, table, new_codes, new_table in (
+            (self.link_codes, self.links, store.link_codes, store.links),
+            (self.date_codes, self.dates, store.date_codes, store.dates),
+            (self.domain_codes, self.domains, store.domain_codes, store.domains),
+        ):
+            # Re-encode so the new tables only hold values that are still used
+            values = table.values
+            new_codes.extend(new_table.encode(values[codes[i]]) for i in indices)
+        return store
+
+    def map_dates(self, mapping: list):
+        """Replaces each distinct publication date by mapping[code], where that is not None."""
+        old_values = self.dates.values
+        self.dates = _Dictionary()
+        recode = [
+            self.dates.encode(new if new is not None else old)
+            for old, new in zip(old_values, mapping)
+        ]
+        self.date_codes = array("I", (recode[code] for code in self.date_codes))
+
+
+@dataclass(slots=True)
+class CompactDigest:
+    """A validated digest whose items live in an ItemStore."""
+
+    topic: str
+    report_date: str
+    items: ItemStore
+
+    @classmethod
+    def from_model(cls, digest) -> "CompactDigest":
+        """Converts a validated WeeklyResearchDigest, once, after the Gemini boundary."""
+        return cls(digest.topic, digest.report_date, ItemStore.from_items(digest.items))
@@ -0,0 +1,384 @@
+import asyncio
+import json
+import logging
+import os
+import re
+import time
+from typing import NamedTuple
+from urllib.parse import quote, urlsplit
+
+from auto_research_agent.src.item_store import CompactDigest, ItemStore
+from auto_research_agent.src.seen_index import normalize_link
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_LINK_CACHE_PATH = os.path.join(".cache", "link_checks.json")
+ARXIV_API_URL = "https://export.arxiv.org/api/query"
+GITHUB_API_URL = "https://api.github.com"
+CROSSREF_API_URL = "https://api.crossref.org"
+USER_AGENT = "auto-research-agent (link verification)"
+
+DEAD_STATUSES = {404, 410}
+# Servers that refuse HEAD are asked again with GET
+HEAD_REFUSED_STATUSES = {403, 405, 501}
+# IDs per arXiv API request
+ARXIV_BATCH_SIZE = 50
+
+_ATOM = "{http://www.w3.org/2005/Atom}"
+_DOI_RE = re.compile(r"(10\.\d{4,9}/[^\s?#]+)")
+_DOI_HOSTS = {"doi.org", "dx.doi.org", "dl.acm.org"}
+_GITHUB_RESERVED = {"orgs", "topics", "features", "sponsors", "marketplace", "settings"}
+
+
+class LinkCheck(NamedTuple):
+    """Outcome of verifying one link.
+
+    verdict is "ok" (the work exists), "dead" (404/410 or unknown ID) or
+    "error" (timeout, rate limit, server error: nothing is known). date is the
+    publication date found in the metadata, if any.
+    """
+
+    verdict: str
+    source: str
+    status: int | None = None
+    date: str | None = None
+    detail: str = ""
+
+
+class LinkCheckCache:
+    """Link checks on disk, keyed by the URL that was fetched.
+
+    Entries keep the check and the response's ETag and Last-Modified, so a
+    stale entry is revalidated with a conditional request and a 304 reuses
+    the stored check. Errors are never stored.
+    """
+
+    def __init__(self, path: str | None = None, max_age: float = 24 * 3600):
+        """
+        Args:
+            path: JSON file (default: RESEARCH_LINK_CACHE or .cache/link_checks.json).
+                "" keeps the entries in memory.
+            max_age: Seconds an entry is used without asking the server again.
+        """
+        if path is None:
+            path = os.environ.get("RESEARCH_LINK_CACHE", DEFAULT_LINK_CACHE_PATH)
+        self.path = path
+        self.max_age = max_age
+        self.entries = {}
+        if path and os.path.exists(path):
+            try:
+                with open(path, encoding="utf-8") as f:
+                    self.entries = json.load(f)
+            except (OSError, ValueError) as e:
+                logger.warning(f"Ignoring unreadable link cache {path}: {e}")
+
+    def fresh(self, url: str) -> LinkCheck | None:
+        entry = self.entries.get(url)
+        if entry is None or time.time() - entry["checked_at"] > self.max_age:
+            return None
+        return LinkCheck(*entry["check"])
+
+    def validators(self, url: str) -> dict:
+        """Conditional request headers for a stored entry."""
+        entry = self.entries.get(url) or {}
+        headers = {}
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def revalidated(self, url: str) -> LinkCheck:
+        """Marks a stored entry as confirmed by a 304 and returns its check."""
+        entry = self.entries[url]
+        entry["checked_at"] = time.time()
+        return LinkCheck(*entry["check"])
+
+    def set(self, url: str, check: LinkCheck, response=None):
+        if check.verdict == "error":
+            return
+        headers = response.headers if response is not None else {}
+        self.entries[url] = {
+            "check": list(check),
+            "etag": headers.get("etag"),
+            "last_modified": headers.get("last-modified"),
+            "checked_at": time.time(),
+        }
+
+    def save(self):
+        if not self.path:
+            return
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.entries, f)
+        os.replace(tmp_path, self.path)
+
+
+def _date_parts(parts) -> str | None:
+    """Formats Crossref date-parts ([[2025, 3, 14]], possibly without day or month)."""
+    if not parts or not parts[0] or parts[0][0] is None:
+        return None
+    widths = (4, 2, 2)
+    return "-".join(f"{value:0{width}d}" for value, width in zip(parts[0], widths))
+
+
+class LinkVerifier:
+    """Checks that item links resolve and reads their real publication dates.
+
+    arXiv links are looked up in batches through the arXiv API, GitHub
+    repositories through the GitHub API and DOIs through Crossref; every other
+    link just has to answer a HEAD (or GET) request without an error status.
+    All checks of a digest run concurrently over one pooled httpx client, at
+    most per_host at a time against each host. API base URLs can be pointed
+    at local servers with RESEARCH_ARXIV_API_URL, RESEARCH_GITHUB_API_URL and
+    RESEARCH_CROSSREF_API_URL.
+    """
+
+    def __init__(
+        self,
+        http_client,
+        cache: LinkCheckCache | None = None,
+        per_host: int = 4,
+        timeout: float = 15.0,
+        strict: bool = False,
+    ):
+        """
+        Args:
+            http_client: httpx.AsyncClient shared with the other HTTP calls of the run.
+            cache: LinkCheckCache (default: an in-memory cache).
+            per_host: Maximum number of concurrent requests to one host.
+            timeout: Seconds allowed per request.
+            strict: Also drop items whose link could not be checked (timeouts,
+                rate limits, server errors) instead of keeping them.
+        """
+        self.http = http_client
+        self.cache = cache or LinkCheckCache("")
+        self.per_host = max(1, per_host)
+        self.timeout = timeout
+        self.strict = strict
+        self.arxiv_api_url = os.environ.get("RESEARCH_ARXIV_API_URL", ARXIV_API_URL)
+        self.github_api_url = os.environ.get("RESEARCH_GITHUB_API_URL", GITHUB_API_URL).rstrip("/")
+        self.crossref_api_url = os.environ.get("RESEARCH_CROSSREF_API_URL", CROSSREF_API_URL).rstrip("/")
+        self.github_token = os.environ.get("GITHUB_TOKEN")
+        self._host_limits = {}
+
+    async def _fetch(self, url: str, headers=None, method: str = "GET", body: bool = True):
+        """Sends a request under the host's limit; returns the response, with its body read if body."""
+        host = urlsplit(url).netloc
+        semaphore = self._host_limits.setdefault(host, asyncio.Semaphore(self.per_host))
+        async with semaphore:
+            request = self.http.build_request(
+                method,
+                url,
+                headers={"User-Agent": USER_AGENT, **(headers or {})},
+                timeout=self.timeout,
+            )
+            response = await self.http.send(request, stream=True, follow_redirects=True)
+            try:
+                if body:
+                    await response.aread()
+            finally:
+                await response.aclose()
+            return response
+
+    async def _cached_fetch(self, url: str, source: str, parse, headers=None) -> LinkCheck:
+        """GETs url with conditional headers and turns the response into a LinkCheck with parse."""
+        check = self.cache.fresh(url)
+        if check is not None:
+            return check
+        try:
+            response = await self._fetch(url, {**(headers or {}), **self.cache.validators(url)})
+        except Exception as e:
+            return LinkCheck("error", source, detail=f"{type(e).__name__}: {e}")
+        if response.status_code == 304 and url in self.cache.entries:
+            return self.cache.revalidated(url)
+        if response.status_code in DEAD_STATUSES:
+            check = LinkCheck("dead", source, response.status_code)
+        elif response.status_code >= 400:
+            return LinkCheck("error", source, response.status_code)
+        else:
+            try:
+                check = parse(response)
+            except (ValueError, KeyError, TypeError) as e:
+                return LinkCheck("error", source, response.status_code, detail=f"Unreadable metadata: {e}")
+        self.cache.set(url, check, response)
+        return check
+
+    async def _check_arxiv(self, ids: list[str]) -> dict[str, LinkCheck]:
+        """Looks up arXiv IDs, ARXIV_BATCH_SIZE per request; IDs the API does not know are dead."""
+        from xml.etree import ElementTree
+
+        checks = {}
+        missing = []
+        for arxiv_id in ids:
+            check = self.cache.fresh(f"arxiv:{arxiv_id}")
+            if check is not None:
+                checks[arxiv_id] = check
+            else:
+                missing.append(arxiv_id)
+
+        async def lookup(batch):
+            url = f"{self.arxiv_api_url}?id_list={','.join(batch)}&max_results={len(batch)}"
+            try:
+                response = await self._fetch(url)
+                response.raise_for_status()
+                feed = ElementTree.fromstring(response.content)
+            except Exception as e:
+                for arxiv_id in batch:
+                    checks[arxiv_id] = LinkCheck("error", "arxiv", detail=f"{type(e).__name__}: {e}")
+                return
+            published = {}
+            for entry in feed.iter(f"{_ATOM}entry"):
+                entry_id = entry.findtext(f"{_ATOM}id") or ""
+                date = entry.findtext(f"{_ATOM}published")
+                match = re.search(r"abs/(\d{4}\.\d{4,5})", entry_id)
+                if match and date:
+                    published[match.group(1)] = date[:10]
+            for arxiv_id in batch:
+                if arxiv_id in published:
+                    check = LinkCheck("ok", "arxiv", response.status_code, published[arxiv_id])
+                else:
+                    check = LinkCheck("dead", "arxiv", response.status_code, detail="Unknown arXiv ID")
+                checks[arxiv_id] = check
+                self.cache.set(f"arxiv:{arxiv_id}", check)
+
+        await asyncio.gather(
+            *(lookup(missing[i : i + ARXIV_BATCH_SIZE]) for i in range(0, len(missing), ARXIV_BATCH_SIZE))
+        )
+        return checks
+
+    async def _check_github(self, owner: str, repo: str) -> LinkCheck:
+        headers = {"Accept": "application/vnd.github+json"}
+        if self.github_token:
+            headers["Authorization"] = f"Bearer {self.github_token}"
+
+        def parse(response):
+            return LinkCheck("ok", "github", response.status_code, response.json()["created_at"][:10])
+
+        return await self._cached_fetch(
+            f"{self.github_api_url}/repos/{owner}/{repo}", "github", parse, headers
+        )
+
+    async def _check_doi(self, doi: str, link: str) -> LinkCheck:
+        def parse(response):
+            message = response.json()["message"]
+            for field in ("published", "published-online", "published-print", "issued"):
+                date = _date_parts((message.get(field) or {}).get("date-parts"))
+                if date:
+                    return LinkCheck("ok", "crossref", response.status_code, date)
+            return LinkCheck("ok", "crossref", response.status_code)
+
+        check = await self._cached_fetch(
+            f"{self.crossref_api_url}/works/{quote(doi, safe='/')}", "crossref", parse
+        )
+        if check.verdict == "dead":
+            # DataCite and other registrars are unknown to Crossref; the DOI may still resolve
+            return await self._check_page(link)
+        return check
+
+    async def _check_page(self, url: str) -> LinkCheck:
+        check = self.cache.fresh(url)
+        if check is not None:
+            return check
+        headers = self.cache.validators(url)
+        try:
+            response = await self._fetch(url, headers, method="HEAD", body=False)
+            if response.status_code in HEAD_REFUSED_STATUSES:
+                response = await self._fetch(url, headers, body=False)
+        except Exception as e:
+            return LinkCheck("error", "page", detail=f"{type(e).__name__}: {e}")
+        if response.status_code == 304 and url in self.cache.entries:
+            return self.cache.revalidated(url)
+        if response.status_code in DEAD_STATUSES:
+            check = LinkCheck("dead", "page", response.status_code)
+        elif response.status_code >= 400:
+            return LinkCheck("error", "page", response.status_code)
+        else:
+            check = LinkCheck("ok", "page", response.status_code)
+        self.cache.set(url, check, response)
+        return check
+
+    async def check_links(self, links: list[str]) -> list[LinkCheck]:
+        """Checks every link concurrently; returns one LinkCheck per link, in order."""
+        arxiv_ids = {}
+        other = {}
+        for link in dict.fromkeys(links):
+            key = normalize_link(link)
+            if key.startswith("arxiv:"):
+                arxiv_ids[link] = key.removeprefix("arxiv:")
+                continue
+            host, _, path = key.partition("/")
+            parts = [p for p in path.split("/") if p]
+            doi = _DOI_RE.search(path)
+            if host == "github.com" and len(parts) >= 2 and parts[0] not in _GITHUB_RESERVED:
+                other[link] = self._check_github(parts[0], parts[1].removesuffix(".git"))
+            elif host in _DOI_HOSTS and doi:
+                other[link] = self._check_doi(doi.group(1), link)
+            elif not link.startswith(("http://", "https://")):
+                other[link] = self._check_page(f"https://{link}")
+            else:
+                other[link] = self._check_page(link)
+
+        arxiv_checks, *other_checks = await asyncio.gather(
+            self._check_arxiv(list(dict.fromkeys(arxiv_ids.values()))), *other.values()
+        )
+        by_link = dict(zip(other, other_checks))
+        by_link.update((link, arxiv_checks[arxiv_id]) for link, arxiv_id in arxiv_ids.items())
+        return [by_link[link] for link in links]
+
+    async def verify_digest(self, digest_data: CompactDigest, date_filter) -> CompactDigest:
+        """Drops items with dead links, corrects dates from metadata and re-applies date_filter."""
+        store = digest_data.items
+        if not store:
+            return digest_data
+        checks = await self.check_links(store.column("source_link"))
+        self.cache.save()
+
+        kept = ItemStore()
+        counts = {"dead": 0, "error": 0, "redated": 0, "out_of_window": 0}
+        for item, check in zip(store, checks):
+            if check.verdict == "dead":
+                counts["dead"] += 1
+                logger.info(
+                    f"Dropping item with dead link: {item.title} <{item.source_link}> "
+                    f"({check.status or check.detail})"
+                )
+                continue
+            if check.verdict == "error":
+                counts["error"] += 1
+                if self.strict:
+                    logger.info(
+                        f"Dropping unverified item: {item.title} <{item.source_link}> "
+                        f"({check.status or check.detail})"
+                    )
+                    continue
+                logger.warning(
+                    f"Could not verify {item.source_link} ({check.status or check.detail}); keeping it."
+                )
+            # Crossref dates may lack the day; a matching prefix confirms the item's date
+            if check.date and not item.publication_date.startswith(check.date):
+                if date_filter.keep(check.date) is False:
+                    counts["out_of_window"] += 1
+                    logger.info(
+                        f"Dropping item published {check.date} according to {check.source}, "
+                        f"not {item.publication_date}: {item.title}"
+                    )
+                    continue
+                counts["redated"] += 1
+                logger.info(
+                    f"Correcting date of {item.title}: {item.publication_date} -> {check.date} "
+                    f"({check.source})"
+                )
+                item = item._replace(publication_date=check.date)
+            kept.append(item)
+
+        logger.info(
+            f"Verified {len(store)} links: {len(kept)} items kept, {counts['dead']} dead, "
+            f"{counts['out_of_window']} outside the window by their real date, "
+            f"{counts['redated']} re-dated, {counts['error']} unverifiable"
+        )
+        digest_data.items = kept
+        return digest_data
@@ -0,0 +1,215 @@
+import contextlib
+import contextvars
+import json
+import logging
+import os
+import time
+import uuid
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timezone
+
+from auto_research_agent.src.task_logging import current_task_name
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_METRICS_PATH = os.path.join(".cache", "metrics.jsonl")
+
+# USD per million (input, output) tokens at list price; thinking tokens are
+# billed as output. Models missing here get no cost estimate.
+MODEL_PRICES_PER_MILLION = {
+    "gemini-3-pro-preview": (2.00, 12.00),
+    "gemini-2.5-pro": (1.25, 10.00),
+    "gemini-2.5-flash": (0.30, 2.50),
+    "gemini-2.5-flash-lite": (0.10, 0.40),
+}
+# Input tokens read from a cached content cost a tenth of the input price
+# (the hourly storage charge of the cache is not included)
+CACHED_INPUT_PRICE_FACTOR = 0.1
+
+# Recorder of the current run and the innermost open span. Both are copied
+# into asyncio tasks and asyncio.to_thread, like current_task_name.
+current_recorder = contextvars.ContextVar("current_recorder", default=None)
+current_span = contextvars.ContextVar("current_span", default=None)
+
+USAGE_FIELDS = (
+    "prompt_token_count",
+    "candidates_token_count",
+    "thoughts_token_count",
+    "tool_use_prompt_token_count",
+    "cached_content_token_count",
+    "total_token_count",
+)
+
+
+@dataclass
+class Span:
+    stage: str
+    task: str | None = None
+    run_id: str = ""
+    started_at: str = ""
+    seconds: float = 0.0
+    ok: bool = True
+    error: str = ""
+    bytes_sent: int = 0
+    bytes_received: int = 0
+    tokens: dict = field(default_factory=dict)
+    cost_usd: float | None = None
+    attrs: dict = field(default_factory=dict)
+
+    def add_transfer(self, sent: int = 0, received: int = 0):
+        self.bytes_sent += sent
+        self.bytes_received += received
+
+    def add_usage(self, usage_metadata, model: str | None = None):
+        """Adds the token counts of a Gemini usage_metadata (and their estimated cost)."""
+        if usage_metadata is None:
+            return
+        for name in USAGE_FIELDS:
+            count = getattr(usage_metadata, name, None)
+            if count:
+                key = name.removesuffix("_token_count")
+                self.tokens[key] = self.tokens.get(key, 0) + count
+
+        prices = MODEL_PRICES_PER_MILLION.get(model)
+        if prices is not None:
+            # prompt_token_count includes the cached tokens
+            cached_tokens = self.tokens.get("cached_content", 0)
+            input_tokens = self.tokens.get("prompt", 0) + self.tokens.get("tool_use_prompt", 0) - cached_tokens
+            output_tokens = self.tokens.get("candidates", 0) + self.tokens.get("thoughts", 0)
+            self.cost_usd = (
+                (input_tokens + cached_tokens * CACHED_INPUT_PRICE_FACTOR) * prices[0]
+                + output_tokens * prices[1]
+            ) / 1_000_000
+
+
+class MetricsRecorder:
+    """Collects the spans of one run and appends them to a JSONL file."""
+
+    def __init__(self, path: str | None = None, enabled: bool = True):
+        """
+        Args:
+            path: JSONL file the spans are appended to (default: RESEARCH_METRICS_PATH
+                or .cache/metrics.jsonl).
+            enabled: If False, spans are still timed but never written.
+        """
+        self.path = path or os.environ.get("RESEARCH_METRICS_PATH", DEFAULT_METRICS_PATH)
+        self.enabled = enabled
+        self.run_id = uuid.uuid4().hex[:12]
+        self.spans = []
+
+    def spans_for(self, task: str | None) -> list[Span]:
+        return [s for s in self.spans if s.task == task]
+
+    def write(self):
+        """Appends every recorded span as one JSON line."""
+        if not self.enabled or not self.spans:
+            return
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(self.path, "a", encoding="utf-8") as f:
+            for recorded in self.spans:
+                f.write(json.dumps(asdict(recorded), ensure_ascii=False) + "\n")
+        logger.info(f"Wrote {len(self.spans)} spans to {self.path}")
+
+
+@contextlib.contextmanager
+def span(stage: str, **attrs):
+    """Times a pipeline stage and records it with the current run's recorder.
+
+    Yields the Span so the caller can add bytes and token counts. Spans opened
+    without an active recorder are timed but discarded.
+    """
+    recorder = current_recorder.get()
+    current = Span(
+        stage,
+        task=current_task_name.get(),
+        run_id=recorder.run_id if recorder else "",
+        started_at=datetime.now(timezone.utc).isoformat(timespec="milliseconds"),
+        attrs=attrs,
+    )
+    token = current_span.set(current)
+    start = time.perf_counter()
+    try:
+        yield current
+    except BaseException as e:
+        current.ok = False
+        current.error = str(e) or type(e).__name__
+        raise
+    finally:
+        current.seconds = time.perf_counter() - start
+        current_span.reset(token)
+        if recorder is not None:
+            recorder.spans.append(current)
+
+
+def record_transfer(sent: int = 0, received: int = 0):
+    """Adds transferred bytes to the innermost open span, if any."""
+    current = current_span.get()
+    if current is not None:
+        current.add_transfer(sent, received)
+
+
+async def count_http_transfer(response):
+    """httpx response hook attributing request and response sizes to the current span."""
+    content = getattr(response.request, "content", b"") or b""
+    received = int(response.headers.get("Content-Length") or 0)
+    record_transfer(len(content), received)
+
+
+def build_metrics_blocks(spans) -> list:
+    """Renders spans as a compact Notion table (one row per stage, repeated stages summed)."""
+    if not spans:
+        return []
+
+    stages = {}
+    for s in spans:
+        row = stages.setdefault(s.stage, {"calls": 0, "seconds": 0.0, "bytes": 0, "tokens": 0, "cost": None})
+        row["calls"] += 1
+        row["seconds"] += s.seconds
+        row["bytes"] += s.bytes_sent + s.bytes_received
+        row["tokens"] += s.tokens.get("total", 0)
+        if s.cost_usd is not None:
+            row["cost"] = (row["cost"] or 0.0) + s.cost_usd
+
+    def cell(text):
+        return [{"type": "text", "text": {"content": text}}]
+
+    header = ("Stage", "Calls", "Seconds", "KB", "Tokens", "Est. cost")
+    rows = [header]
+    for stage, row in stages.items():
+        rows.append(
+            (
+                stage,
+                str(row["calls"]),
+                f"{row['seconds']:.2f}",
+                f"{row['bytes'] / 1024:.1f}",
+                str(row["tokens"]) if row["tokens"] else "-",
+                f"${row['cost']:.4f}" if row["cost"] is not None else "-",
+            )
+        )
+
+    return [
+        {
+            "object": "block",
+            "type": "heading_3",
+            "heading_3": {"rich_text": cell("Run Metrics")},
+        },
+        {
+            "object": "block",
+            "type": "table",
+            "table": {
+                "table_width": len(header),
+                "has_column_header": True,
+                "has_row_header": False,
+                "children": [
+                    {
+                        "object": "block",
+                        "type": "table_row",
+                        "table_row": {"cells": [cell(value) for value in values]},
+                    }
+                    for values in rows
+                ],
+            },
+        },
+    ]
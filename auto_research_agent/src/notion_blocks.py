@@ -0,0 +1,135 @@
+import functools
+import json
+import re
+
+# Separators match what httpx sends, so fragments and dicts serialize alike
+_encoder = json.JSONEncoder(ensure_ascii=False, separators=(",", ":"))
+_encode_string = json.encoder.encode_basestring
+_SLOT_RE = re.compile(r'"\\u0000(\w+)\\u0000"')
+
+
+class JsonBlock(str):
+    """A Notion block that is already serialized as JSON text.
+
+    Payloads are assembled by joining these fragments; to_dict() parses one
+    back for the few places (block updates, content hashes) that need a dict.
+    """
+
+    __slots__ = ()
+
+    def to_dict(self) -> dict:
+        return json.loads(self)
+
+
+def slot(name: str) -> str:
+    """Marks a string field of a BlockTemplate prototype."""
+    return f"\x00{name}\x00"
+
+
+class BlockTemplate:
+    """A Notion block compiled once into JSON text with holes for its string fields.
+
+    The prototype is a block dict whose variable strings are slot() markers.
+    It is serialized once; render() then only JSON-escapes the field values
+    and splices them in, instead of building and serializing nested dicts.
+    """
+
+    def __init__(self, prototype: dict):
+        text = _encoder.encode(prototype)
+        pieces = _SLOT_RE.split(text)
+        self.fields = tuple(pieces[1::2])
+        literals = [piece.replace("{", "{{").replace("}", "}}") for piece in pieces[::2]]
+        self._format = "{}".join(literals).format
+
+    def render(self, *values: str) -> JsonBlock:
+        """Fills the slots, in prototype order, with the given strings."""
+        return JsonBlock(self._format(*map(_encode_string, values)))
+
+
+def _rich_text(content: str, **extra) -> dict:
+    return {"type": "text", "text": {"content": content}, **extra}
+
+
+HEADING = BlockTemplate(
+    {
+        "object": "block",
+        "type": "heading_2",
+        "heading_2": {
+            "rich_text": [
+                _rich_text(slot("number")),
+                {"type": "text", "text": {"content": slot("title"), "link": {"url": slot("link")}}},
+            ]
+        },
+    }
+)
+DOMAIN_CALLOUT = BlockTemplate(
+    {
+        "object": "block",
+        "type": "callout",
+        "callout": {"rich_text": [_rich_text(slot("domain"))], "icon": {"emoji": "🏷️"}},
+    }
+)
+
+
+def _labelled_paragraph(label: str) -> BlockTemplate:
+    return BlockTemplate(
+        {
+            "object": "block",
+            "type": "paragraph",
+            "paragraph": {
+                "rich_text": [
+                    _rich_text(label, annotations={"bold": True}),
+                    _rich_text(slot("text")),
+                ]
+            },
+        }
+    )
+
+
+RELEVANCE = _labelled_paragraph("Relevance: ")
+INNOVATION = _labelled_paragraph("Key Innovation: ")
+SUMMARY = BlockTemplate(
+    {"object": "block", "type": "quote", "quote": {"rich_text": [_rich_text(slot("summary"))]}}
+)
+INTRO = BlockTemplate(
+    {
+        "object": "block",
+        "type": "paragraph",
+        "paragraph": {"rich_text": [_rich_text(slot("text"), annotations={"italic": True})]},
+    }
+)
+CODE = BlockTemplate(
+    {
+        "object": "block",
+        "type": "code",
+        "code": {"rich_text": [_rich_text(slot("text"))], "language": "plain text"},
+    }
+)
+# Static blocks are serialized once and shared by every page
+DIVIDER = JsonBlock(_encoder.encode({"object": "block", "type": "divider", "divider": {}}))
+
+
+@functools.lru_cache(maxsize=4096)
+def render_item(
+    index: int, title: str, link: str, domain: str, relevance: str, innovation: str, summary: str
+) -> tuple[JsonBlock, ...]:
+    """The six blocks of one research item; repeated renders (reruns, updates) hit the cache."""
+    return (
+        HEADING.render(f"{index}. ", title, link),
+        DOMAIN_CALLOUT.render(f"Domain: {domain}"),
+        RELEVANCE.render(relevance),
+        INNOVATION.render(innovation),
+        SUMMARY.render(summary),
+        DIVIDER,
+    )
+
+
+def as_dict(block) -> dict:
+    return block.to_dict() if isinstance(block, JsonBlock) else block
+
+
+def serialize_body(body: dict, children: list) -> str:
+    """Serializes a request body plus its children in one pass, reusing serialized blocks."""
+    blocks = ",".join(block if isinstance(block, JsonBlock) else _encoder.encode(block) for block in children)
+    prefix = _encoder.encode(body)[:-1]
+    return f'{prefix}{"," if body else ""}"children":[{blocks}]}}'
@@ -0,0 +1,71 @@
+import hashlib
+import json
+import logging
+import os
+
+from auto_research_agent.src.seen_index import normalize_link, title_fingerprint
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MANIFEST_PATH = os.path.join(".cache", "notion_manifest.json")
+
+
+def item_fingerprint(source_link: str, title: str) -> str:
+    """Identifies an item across reruns by its normalized link (or its title without one)."""
+    return normalize_link(source_link) or f"title:{title_fingerprint(title)}"
+
+
+def block_hash(block) -> str:
+    """Hashes a block's content so unchanged blocks can be left alone on updates.
+
+    block is a dict or a serialized JsonBlock; both hash alike.
+    """
+    if isinstance(block, str):
+        block = json.loads(block)
+    data = json.dumps(block, sort_keys=True, ensure_ascii=False).encode("utf-8")
+    return hashlib.blake2b(data, digest_size=8).hexdigest()
+
+
+class NotionManifest:
+    """Local record of the Notion pages written per (task, report_date).
+
+    Pages are keyed by the task's registry name rather than the digest topic,
+    which the model writes and may word differently on a rerun.
+
+    For each page it keeps the page ID, the ID of the last item block (new
+    items are inserted after it) and, per item fingerprint, the item's number
+    on the page and the ID and content hash of each of its blocks. The file is
+    plain JSON, rewritten atomically on save().
+    """
+
+    def __init__(self, path: str | None = None):
+        self.path = path or os.environ.get("RESEARCH_NOTION_MANIFEST", DEFAULT_MANIFEST_PATH)
+        self.pages = {}
+        if os.path.exists(self.path):
+            try:
+                with open(self.path, encoding="utf-8") as f:
+                    self.pages = json.load(f)
+            except (OSError, ValueError) as e:
+                logger.warning(f"Ignoring unreadable Notion manifest {self.path}: {e}")
+
+    @staticmethod
+    def _key(page_key: str, report_date: str) -> str:
+        return f"{page_key}|{report_date}"
+
+    def get(self, page_key: str, report_date: str) -> dict | None:
+        return self.pages.get(self._key(page_key, report_date))
+
+    def set(self, page_key: str, report_date: str, entry: dict):
+        self.pages[self._key(page_key, report_date)] = entry
+
+    def remove(self, page_key: str, report_date: str):
+        self.pages.pop(self._key(page_key, report_date), None)
+
+    def save(self):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.pages, f)
+        os.replace(tmp_path, self.path)
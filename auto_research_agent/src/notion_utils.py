@@ -1,212 +1,305 @@
+import asyncio
+import collections
 import logging
 import os
-from notion_client import Client
-from auto_research_agent.src.schemas import WeeklyResearchDigest
+from notion_client import AsyncClient
+from notion_client.errors import HTTPResponseError
+from auto_research_agent.src.clients import create_notion_client
+from auto_research_agent.src.item_store import CompactDigest, ItemRow, ItemStore
+from auto_research_agent.src.metrics import span
+from auto_research_agent.src.notion_blocks import CODE, DIVIDER, INTRO, JsonBlock, render_item
+from auto_research_agent.src.notion_manifest import NotionManifest, block_hash, item_fingerprint
+from auto_research_agent.src.notion_writer import NotionWriter
+from auto_research_agent.src.task_logging import NOTION_CHUNK_SIZE
 
 logger = logging.getLogger(__name__)
 
-def save_to_notion(digest_data: WeeklyResearchDigest, logs: str = ""):
-    """Saves the digest data to a Notion Page (creating a sub-page)."""
-    try:
-        notion_token = os.environ.get("NOTION_API_KEY")
-        # Use NOTION_PAGE_ID if set, otherwise fallback to NOTION_DATABASE_ID but treat it as a page parent
-        parent_page_id = os.environ.get("NOTION_PAGE_ID") or os.environ.get(
-            "NOTION_DATABASE_ID"
+# Maximum number of log code blocks attached to a page
+DEFAULT_LOG_BLOCK_BUDGET = 100
+
+def build_item_blocks(index: int, item: ItemRow) -> list:
+    """Builds the Notion blocks for a single research item, as serialized JsonBlocks."""
+    return list(
+        render_item(
+            index,
+            item.title,
+            item.source_link,
+            getattr(item.primary_domain, "value", item.primary_domain),
+            item.relevance_explanation,
+            item.key_innovation,
+            item.summary,
         )
+    )
+
 
-        if not notion_token or not parent_page_id:
-            logger.warning(
-                "Notion credentials (NOTION_API_KEY or NOTION_PAGE_ID) not found. Skipping Notion save."
+def _item_fields(items):
+    """Yields (title, link, domain, relevance, innovation, summary) per item, in render_item's order.
+
+    An ItemStore is read column by column, which is cheaper than building its rows.
+    """
+    if not isinstance(items, ItemStore):
+        return (
+            (
+                item.title,
+                item.source_link,
+                getattr(item.primary_domain, "value", item.primary_domain),
+                item.relevance_explanation,
+                item.key_innovation,
+                item.summary,
             )
-            print("Skipping Notion save (credentials missing).")
-            return
-
-        notion = Client(auth=notion_token)
-
-        # Create blocks for the page content
-        children_blocks = []
-
-        # Add Intro/Metadata
-        children_blocks.append(
-            {
-                "object": "block",
-                "type": "paragraph",
-                "paragraph": {
-                    "rich_text": [
-                        {
-                            "type": "text",
-                            "text": {
-                                "content": f"Generated on {digest_data.report_date}"
-                            },
-                            "annotations": {"italic": True},
-                        }
-                    ]
-                },
-            }
+            for item in items
         )
+    return zip(
+        items.column("title"),
+        items.column("source_link"),
+        [getattr(domain, "value", domain) for domain in items.column("primary_domain")],
+        items.column("relevance_explanation"),
+        items.column("key_innovation"),
+        items.column("summary"),
+    )
 
-        children_blocks.append({"object": "block", "type": "divider", "divider": {}})
-
-        # Add Items
-        for i, item in enumerate(digest_data.items, 1):
-            # Heading with Link
-            children_blocks.append(
-                {
-                    "object": "block",
-                    "type": "heading_2",
-                    "heading_2": {
-                        "rich_text": [
-                            {
-                                "type": "text",
-                                "text": {"content": f"{i}. "},
-                            },
-                            {
-                                "type": "text",
-                                "text": {"content": item.title},
-                                "text": {
-                                    "content": item.title,
-                                    "link": {"url": item.source_link},
-                                },
-                            },
-                        ]
-                    },
-                }
-            )
 
-            # Domain Tag
-            children_blocks.append(
-                {
-                    "object": "block",
-                    "type": "callout",
-                    "callout": {
-                        "rich_text": [
-                            {
-                                "type": "text",
-                                "text": {
-                                    "content": f"Domain: {item.primary_domain.value}"
-                                },
-                            }
-                        ],
-                        "icon": {"emoji": "🏷️"},
-                    },
-                }
-            )
+def build_items_blocks(items) -> list[list]:
+    """Builds the blocks of every item, one list per item."""
+    return [list(render_item(i, *fields)) for i, fields in enumerate(_item_fields(items), 1)]
 
-            # Details: Relevance
-            children_blocks.append(
-                {
-                    "object": "block",
-                    "type": "paragraph",
-                    "paragraph": {
-                        "rich_text": [
-                            {
-                                "type": "text",
-                                "text": {"content": "Relevance: "},
-                                "annotations": {"bold": True},
-                            },
-                            {
-                                "type": "text",
-                                "text": {"content": item.relevance_explanation},
-                            },
-                        ]
-                    },
-                }
-            )
 
-            # Details: Innovation
-            children_blocks.append(
-                {
-                    "object": "block",
-                    "type": "paragraph",
-                    "paragraph": {
-                        "rich_text": [
-                            {
-                                "type": "text",
-                                "text": {"content": "Key Innovation: "},
-                                "annotations": {"bold": True},
-                            },
-                            {"type": "text", "text": {"content": item.key_innovation}},
-                        ]
-                    },
-                }
-            )
+def _code_block(text: str) -> JsonBlock:
+    return CODE.render(text)
 
-            # Summary
-            children_blocks.append(
-                {
-                    "object": "block",
-                    "type": "quote",
-                    "quote": {
-                        "rich_text": [
-                            {"type": "text", "text": {"content": item.summary}}
-                        ]
-                    },
-                }
-            )
 
-            # Spacer
-            children_blocks.append(
-                {"object": "block", "type": "divider", "divider": {}}
-            )
+def build_log_blocks(logs, max_blocks: int = DEFAULT_LOG_BLOCK_BUDGET) -> list:
+    """Turns logs into code blocks of at most 2000 characters (Notion's rich text limit).
 
-        # Add Logs if present (split into multiple blocks if needed)
-        if logs:
-            # Split logs into chunks of 2000 characters (Notion block limit)
-            chunk_size = 2000
-            log_chunks = [
-                logs[i : i + chunk_size] for i in range(0, len(logs), chunk_size)
-            ]
-
-            log_children_blocks = []
-            for chunk in log_chunks:
-                log_children_blocks.append(
-                    {
-                        "object": "block",
-                        "type": "code",
-                        "code": {
-                            "rich_text": [
-                                {
-                                    "type": "text",
-                                    "text": {"content": chunk},
-                                }
-                            ],
-                            "language": "plain text",
-                        },
-                    }
-                )
-
-            children_blocks.append(
-                {
-                    "object": "block",
-                    "type": "toggle",
-                    "toggle": {
-                        "rich_text": [
-                            {"type": "text", "text": {"content": "Execution Logs"}}
-                        ],
-                        "children": log_children_blocks,
-                    },
-                }
-            )
+    logs is either a string or an iterable of pre-chunked segments (e.g.
+    TaskLogCapture.iter_chunks), consumed lazily. Past max_blocks, the first and
+    last chunks are kept and the middle is replaced by a note.
+    """
+    if isinstance(logs, str):
+        text = logs
+        logs = (text[i : i + NOTION_CHUNK_SIZE] for i in range(0, len(text), NOTION_CHUNK_SIZE))
 
-        # Create the page
-        # Note: When creating a page under a parent PAGE, properties only contains 'title'.
-        logger.info(f"Creating child page under parent ID: {parent_page_id}")
-        notion.pages.create(
-            parent={"page_id": parent_page_id},
-            properties={
-                "title": [
-                    {
-                        "text": {
-                            "content": f"{digest_data.topic} - {digest_data.report_date}"
-                        }
-                    }
-                ]
-            },
-            children=children_blocks,
+    max_blocks = max(3, max_blocks)
+    head_count = max_blocks // 2
+    head = []
+    tail = collections.deque(maxlen=max_blocks - head_count - 1)
+    total = 0
+    for chunk in logs:
+        total += 1
+        if len(head) < head_count:
+            head.append(_code_block(chunk))
+        else:
+            tail.append(chunk)
+
+    omitted = total - len(head) - len(tail)
+    if omitted:
+        head.append(_code_block(f"... {omitted} log blocks omitted (block budget: {max_blocks}) ..."))
+    head.extend(_code_block(chunk) for chunk in tail)
+    return head
+
+
+def build_page_blocks(digest_data: CompactDigest, item_blocks: list | None = None) -> list:
+    """Builds the intro and item blocks of a digest page."""
+    children_blocks = [INTRO.render(f"Generated on {digest_data.report_date}"), DIVIDER]
+
+    # Add Items
+    if item_blocks is None:
+        item_blocks = [block for blocks in build_items_blocks(digest_data.items) for block in blocks]
+    children_blocks.extend(item_blocks)
+
+    return children_blocks
+
+
+async def publish_to_notion(
+    digest_data: CompactDigest,
+    logs="",
+    item_blocks: list | None = None,
+    notion: AsyncClient | None = None,
+    metrics_blocks: list | None = None,
+    max_log_blocks: int = DEFAULT_LOG_BLOCK_BUDGET,
+    manifest: NotionManifest | None = None,
+    page_key: str | None = None,
+) -> str | None:
+    """Creates the digest page and returns its ID, or None if credentials are missing.
+
+    item_blocks may hold blocks already rendered with build_item_blocks (e.g. while
+    a streamed response was still arriving); otherwise they are built here.
+    metrics_blocks are placed after the items. logs may be a string or an iterable
+    of 2000-character chunks and is capped at max_log_blocks code blocks. A shared
+    notion_client.AsyncClient can be passed in; errors are raised.
+
+    With a NotionManifest, a page already written for the same page_key and
+    report date is updated in place instead (see _update_page), and the block
+    IDs of new pages are recorded in the manifest. page_key should be the task
+    name: the default, the digest topic, is written by the model and may change
+    between reruns.
+    """
+    notion_token = os.environ.get("NOTION_API_KEY")
+    # Use NOTION_PAGE_ID if set, otherwise fallback to NOTION_DATABASE_ID but treat it as a page parent
+    parent_page_id = os.environ.get("NOTION_PAGE_ID") or os.environ.get(
+        "NOTION_DATABASE_ID"
+    )
+
+    if not notion_token or not parent_page_id:
+        logger.warning(
+            "Notion credentials (NOTION_API_KEY or NOTION_PAGE_ID) not found. Skipping Notion save."
         )
+        return None
 
-        logger.info("Successfully saved report to Notion!")
-        print("Successfully saved report to Notion!")
+    page_key = page_key or digest_data.topic
+    if notion is not None:
+        return await _publish(
+            notion, parent_page_id, digest_data, logs, item_blocks, metrics_blocks, max_log_blocks,
+            manifest, page_key,
+        )
+    async with create_notion_client(notion_token) as notion:
+        return await _publish(
+            notion, parent_page_id, digest_data, logs, item_blocks, metrics_blocks, max_log_blocks,
+            manifest, page_key,
+        )
+
+
+async def _publish(
+    notion, parent_page_id, digest_data, logs, item_blocks, metrics_blocks, max_log_blocks, manifest, page_key
+) -> str:
+    entry = manifest.get(page_key, digest_data.report_date) if manifest else None
+    if entry is not None:
+        try:
+            with span("notion_update") as update_span:
+                page_id = await _update_page(notion, entry, digest_data.items, update_span)
+            manifest.save()
+            logger.info("Successfully updated the existing Notion report!")
+            return page_id
+        except HTTPResponseError as e:
+            if e.status != 404:
+                raise
+            # The page (or one of its blocks) was deleted in Notion; start over
+            logger.warning(f"Notion page {entry['page_id']} not found ({e}); creating a new one.")
+            manifest.remove(page_key, digest_data.report_date)
+
+    with span("notion_blocks") as blocks_span:
+        if manifest is not None:
+            # Item boundaries are needed for the manifest, so blocks are rendered per item
+            rendered = build_items_blocks(digest_data.items)
+            item_blocks = [block for blocks in rendered for block in blocks]
+        children_blocks = build_page_blocks(digest_data, item_blocks)
+        if metrics_blocks:
+            children_blocks.extend(metrics_blocks)
+        log_blocks = build_log_blocks(logs, max_log_blocks) if logs else []
+        blocks_span.attrs.update(blocks=len(children_blocks), log_blocks=len(log_blocks))
+    title = f"{digest_data.topic} - {digest_data.report_date}"
+
+    # Create the page with a small first payload, then append the rest in batches
+    with span("notion_upload"):
+        writer = NotionWriter(notion)
+        page_id = await writer.write_page(
+            parent_page_id,
+            title,
+            children_blocks,
+            log_title="Execution Logs",
+            log_blocks=log_blocks,
+            track_blocks=manifest is not None,
+        )
+
+    if manifest is not None:
+        manifest.set(
+            page_key,
+            digest_data.report_date,
+            _manifest_entry(page_id, digest_data, rendered, writer.block_ids),
+        )
+        manifest.save()
+
+    logger.info("Successfully saved report to Notion!")
+    return page_id
+
+
+def _manifest_entry(page_id: str, digest_data, rendered: list, block_ids: list) -> dict:
+    """Maps each item's fingerprint to its number and the IDs and hashes of its blocks."""
+    # Items follow the intro blocks built by build_page_blocks
+    position = len(build_page_blocks(digest_data, item_blocks=[]))
+    anchor = block_ids[position - 1]
+    items = {}
+    for index, (fields, blocks) in enumerate(zip(_item_fields(digest_data.items), rendered), 1):
+        ids = block_ids[position : position + len(blocks)]
+        position += len(blocks)
+        anchor = ids[-1]
+        items.setdefault(
+            item_fingerprint(fields[1], fields[0]),
+            {"index": index, "blocks": [[i, block_hash(b)] for i, b in zip(ids, blocks)]},
+        )
+    return {"page_id": page_id, "anchor": anchor, "next_index": len(rendered) + 1, "items": items}
+
+
+async def _update_page(notion, entry: dict, items, update_span) -> str:
+    """Writes only the difference between the digest and the page recorded in entry.
+
+    Blocks of known items whose content changed are updated in place, new items
+    are inserted after the last item, and everything else (including the logs
+    and metrics of the first run) is left alone. entry is updated to match.
+    """
+    updates = []
+    changed_hashes = []
+    new_items = []
+    next_index = entry["next_index"]
+    fingerprints = set()
+    for fields in _item_fields(items):
+        fingerprint = item_fingerprint(fields[1], fields[0])
+        if fingerprint in fingerprints:
+            # Same normalized link twice in one digest: only the first is on the page
+            continue
+        fingerprints.add(fingerprint)
+        known = entry["items"].get(fingerprint)
+        if known is None:
+            new_items.append((fingerprint, next_index, list(render_item(next_index, *fields))))
+            next_index += 1
+            continue
+        for recorded, block in zip(known["blocks"], render_item(known["index"], *fields)):
+            digest = block_hash(block)
+            if digest != recorded[1]:
+                updates.append((recorded[0], block))
+                changed_hashes.append((recorded, digest))
+
+    writer = NotionWriter(notion)
+    if updates:
+        await writer.update_blocks(updates)
+        for recorded, digest in changed_hashes:
+            recorded[1] = digest
+
+    if new_items:
+        new_blocks = [block for _, _, blocks in new_items for block in blocks]
+        ids = await writer.append_blocks(entry["page_id"], new_blocks, after=entry["anchor"])
+        position = 0
+        for fingerprint, index, blocks in new_items:
+            block_ids = ids[position : position + len(blocks)]
+            position += len(blocks)
+            entry["items"].setdefault(
+                fingerprint,
+                {"index": index, "blocks": [[i, block_hash(b)] for i, b in zip(block_ids, blocks)]},
+            )
+        entry["anchor"] = ids[-1]
+        entry["next_index"] = next_index
+
+    update_span.attrs.update(updated_blocks=len(updates), new_items=len(new_items))
+    logger.info(
+        f"Notion page {entry['page_id']}: {len(updates)} changed blocks updated, "
+        f"{len(new_items)} new items appended, "
+        f"{len(fingerprints) - len(new_items)} items already on the page"
+    )
+    return entry["page_id"]
+
+
+def save_to_notion(
+    digest_data: CompactDigest, logs: str = "", item_blocks: list | None = None
+):
+    """Saves the digest data to a Notion Page (creating a sub-page)."""
+    try:
+        page_id = asyncio.run(
+            publish_to_notion(digest_data, logs=logs, item_blocks=item_blocks)
+        )
+        if page_id is None:
+            print("Skipping Notion save (credentials missing).")
+        else:
+            print("Successfully saved report to Notion!")
 
     except Exception as e:
         logger.error(f"Failed to save to Notion: {e}")
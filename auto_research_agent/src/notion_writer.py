@@ -0,0 +1,319 @@
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+
+import httpx
+from notion_client import AsyncClient
+from notion_client.errors import HTTPResponseError, RequestTimeoutError
+
+from auto_research_agent.src.notion_blocks import as_dict, serialize_body
+from auto_research_agent.src.retry import retry_with_backoff
+
+logger = logging.getLogger(__name__)
+
+# Notion rejects requests with more than 100 children per parent
+MAX_CHILDREN_PER_REQUEST = 100
+RETRYABLE_STATUSES = {409, 429, 500, 502, 503, 504}
+# Errors after which a page creation or append was certainly not applied
+RESENDABLE_STATUSES = {429}
+
+
+@dataclass
+class BatchReport:
+    parent: str
+    index: int
+    blocks: int
+    seconds: float
+    attempts: int
+    ok: bool
+
+
+def is_retryable_notion_error(e: Exception) -> bool:
+    if isinstance(e, HTTPResponseError):
+        return e.status in RETRYABLE_STATUSES
+    return isinstance(e, (RequestTimeoutError, httpx.TransportError))
+
+
+def is_resendable_notion_write(e: Exception) -> bool:
+    """For writes that are not idempotent (page creation, appends).
+
+    A 5xx, 409 or read timeout may come after Notion applied the write, and
+    resending it would duplicate the page or the blocks. Only rate limiting and
+    connections that never carried the request are retried.
+    """
+    if isinstance(e, HTTPResponseError):
+        return e.status in RESENDABLE_STATUSES
+    return isinstance(e, (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout))
+
+
+def chunk_blocks(blocks: list, size: int = MAX_CHILDREN_PER_REQUEST) -> list[list]:
+    return [blocks[i : i + size] for i in range(0, len(blocks), size)]
+
+
+class RenderedBody(dict):
+    """A request body whose JSON has already been serialized, passed through the SDK as is."""
+
+    def __init__(self, content: str):
+        super().__init__()
+        self.content = content
+
+
+class _RenderingHttpClient(httpx.AsyncClient):
+    """Sends a RenderedBody as its serialized content instead of encoding it again."""
+
+    def build_request(self, method, url, *, json=None, headers=None, **kwargs) -> httpx.Request:
+        if not isinstance(json, RenderedBody):
+            return super().build_request(method, url, json=json, headers=headers, **kwargs)
+        headers = httpx.Headers(headers)
+        headers["Content-Type"] = "application/json"
+        return super().build_request(
+            method, url, content=json.content.encode("utf-8"), headers=headers, **kwargs
+        )
+
+
+class RenderingNotionClient(AsyncClient):
+    """notion_client.AsyncClient whose request() also accepts a RenderedBody.
+
+    Only the SDK's public request() and httpx's public build_request() are
+    involved, so responses, errors and retries stay the SDK's own.
+    """
+
+    def __init__(self, event_hooks=None, **options):
+        super().__init__(client=_RenderingHttpClient(event_hooks=event_hooks), **options)
+
+    # The SDK would open a second, plain httpx.AsyncClient here, dropping the
+    # body handling and hooks; the one built in __init__ is opened and closed instead
+    async def __aenter__(self) -> "RenderingNotionClient":
+        await self.client.__aenter__()
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.client.__aexit__(exc_type, exc_value, traceback)
+
+
+class NotionWriter:
+    """Writes a page in small, retried batches instead of one large request.
+
+    The page is created with a small first payload (plus an empty log toggle at
+    the end). The remaining content blocks and the log blocks are then appended
+    in batches of at most 100 children. Batches for the same parent are sent in
+    order; the content and log pipelines run concurrently, bounded by
+    max_concurrency.
+    """
+
+    def __init__(
+        self,
+        client,
+        max_concurrency: int = 2,
+        first_payload_size: int = 10,
+        batch_size: int = MAX_CHILDREN_PER_REQUEST,
+        max_retries: int = 4,
+        base_delay: float = 1.0,
+    ):
+        """
+        Args:
+            client: A notion_client.AsyncClient.
+            max_concurrency: Maximum number of in-flight append requests.
+            first_payload_size: Number of content blocks sent with the page creation.
+            batch_size: Children per append request (capped at Notion's limit of 100).
+            max_retries: Retries per request. Listings and block updates are retried on
+                409/429/5xx and transport errors; page creation and appends, which
+                are not idempotent, only on 429 and failed connections.
+            base_delay: Initial backoff delay in seconds.
+        """
+        self.client = client
+        self.semaphore = asyncio.Semaphore(max(1, max_concurrency))
+        self.first_payload_size = max(1, min(first_payload_size, MAX_CHILDREN_PER_REQUEST - 1))
+        self.batch_size = min(batch_size, MAX_CHILDREN_PER_REQUEST)
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.reports = []
+
+    async def _send(
+        self, parent: str, index: int, blocks: list, request, is_retryable=is_retryable_notion_error
+    ):
+        """Runs one request under the concurrency limit, with retries and timing."""
+        async with self.semaphore:
+            start = time.perf_counter()
+            try:
+                result, attempts = await retry_with_backoff(
+                    request,
+                    max_retries=self.max_retries,
+                    base_delay=self.base_delay,
+                    is_retryable=is_retryable,
+                    description=f"Notion batch {parent}#{index}",
+                )
+            except Exception:
+                self.reports.append(
+                    BatchReport(parent, index, len(blocks), time.perf_counter() - start, 0, False)
+                )
+                raise
+
+            report = BatchReport(
+                parent, index, len(blocks), time.perf_counter() - start, attempts, True
+            )
+            self.reports.append(report)
+            logger.info(
+                f"Notion batch {parent}#{index}: {report.blocks} blocks in "
+                f"{report.seconds:.2f}s ({attempts} attempt(s))"
+            )
+            return result
+
+    async def _append_sequence(self, parent: str, block_id: str, batches: list, after=None) -> list:
+        """Appends batches to one parent in order, optionally inserting after a block.
+
+        Returns the IDs of the created blocks.
+        """
+        created_ids = []
+        for index, batch in enumerate(batches, 1):
+            body = {"after": after} if after else {}
+            result = await self._send(
+                parent,
+                index,
+                batch,
+                lambda body=body, batch=batch: self._request(
+                    "PATCH", f"blocks/{block_id}/children", body, batch
+                ),
+                is_retryable=is_resendable_notion_write,
+            )
+            created_ids.extend(block["id"] for block in result["results"])
+            if after:
+                after = created_ids[-1]
+        return created_ids
+
+    async def _request(self, method: str, path: str, body: dict, children: list):
+        """Sends body plus children through the SDK's request().
+
+        A RenderingNotionClient gets the body serialized in one pass from the
+        already rendered blocks; other clients (e.g. test doubles) get plain dicts.
+        """
+        if isinstance(self.client, RenderingNotionClient):
+            body = RenderedBody(serialize_body(body, children))
+        else:
+            body = {**body, "children": [as_dict(block) for block in children]}
+        return await self.client.request(path, method, body=body)
+
+    async def write_page(
+        self,
+        parent_page_id: str,
+        title: str,
+        blocks: list,
+        log_title: str = "",
+        log_blocks=None,
+        track_blocks: bool = False,
+    ) -> str:
+        """Creates the page and uploads all blocks. Returns the new page ID.
+
+        With track_blocks, the IDs of the created content blocks are left in
+        self.block_ids, in the order of blocks.
+        """
+        self.reports = []
+        self.block_ids = []
+        first_blocks = blocks[: self.first_payload_size]
+        remaining = blocks[self.first_payload_size :]
+
+        children = list(first_blocks)
+        if log_blocks:
+            children.append(
+                {
+                    "object": "block",
+                    "type": "toggle",
+                    "toggle": {"rich_text": [{"type": "text", "text": {"content": log_title}}]},
+                }
+            )
+
+        # Note: When creating a page under a parent PAGE, properties only contains 'title'.
+        logger.info(f"Creating child page under parent ID: {parent_page_id}")
+        page = await self._send(
+            "page",
+            0,
+            children,
+            lambda: self._request(
+                "POST",
+                "pages",
+                {
+                    "parent": {"page_id": parent_page_id},
+                    "properties": {"title": [{"text": {"content": title}}]},
+                },
+                children,
+            ),
+            is_retryable=is_resendable_notion_write,
+        )
+        page_id = page["id"]
+
+        anchor_id = None
+        toggle_id = None
+        if log_blocks or track_blocks:
+            # The toggle stays last, so remaining content is inserted before it
+            listing = await self._send(
+                "page",
+                1,
+                [],
+                lambda: self.client.blocks.children.list(page_id, page_size=MAX_CHILDREN_PER_REQUEST),
+            )
+            created = [block["id"] for block in listing["results"]]
+            if log_blocks:
+                toggle_id = created.pop()
+            self.block_ids = created
+            if remaining and log_blocks and created:
+                anchor_id = created[-1]
+
+        pipelines = []
+        if remaining:
+            pipelines.append(
+                self._append_sequence(
+                    "content", page_id, chunk_blocks(remaining, self.batch_size), after=anchor_id
+                )
+            )
+        if log_blocks:
+            pipelines.append(
+                self._append_sequence("logs", toggle_id, chunk_blocks(log_blocks, self.batch_size))
+            )
+
+        results = await asyncio.gather(*pipelines, return_exceptions=True)
+        errors = [r for r in results if isinstance(r, BaseException)]
+        if remaining and not errors:
+            self.block_ids.extend(results[0])
+
+        self._log_summary("upload")
+        if errors:
+            raise errors[0]
+        return page_id
+
+    async def append_blocks(self, parent_id: str, blocks: list, after: str | None = None) -> list:
+        """Appends blocks to an existing page or block, after the given block. Returns the new block IDs."""
+        self.reports = []
+        created_ids = await self._append_sequence(
+            "content", parent_id, chunk_blocks(blocks, self.batch_size), after=after
+        )
+        self._log_summary("append")
+        return created_ids
+
+    async def update_blocks(self, updates: list[tuple[str, dict]]):
+        """Replaces the content of existing blocks, given as (block_id, new block) pairs."""
+        self.reports = []
+
+        def request(block_id, block):
+            block = as_dict(block)
+            kind = block["type"]
+            return lambda: self.client.blocks.update(block_id, **{kind: block[kind]})
+
+        results = await asyncio.gather(
+            *(
+                self._send("update", index, [block], request(block_id, block))
+                for index, (block_id, block) in enumerate(updates, 1)
+            ),
+            return_exceptions=True,
+        )
+        self._log_summary("update")
+        errors = [r for r in results if isinstance(r, BaseException)]
+        if errors:
+            raise errors[0]
+
+    def _log_summary(self, operation: str):
+        total = sum(r.seconds for r in self.reports)
+        logger.info(
+            f"Notion {operation} finished: {len(self.reports)} requests, "
+            f"{sum(r.blocks for r in self.reports)} blocks, {total:.2f}s request time"
+        )
@@ -0,0 +1,39 @@
+import asyncio
+import logging
+import random
+import time
+
+logger = logging.getLogger(__name__)
+
+
+async def retry_with_backoff(
+    operation,
+    max_retries: int = 4,
+    base_delay: float = 1.0,
+    max_delay: float = 30.0,
+    is_retryable=lambda e: True,
+    description: str = "operation",
+    deadline: float | None = None,
+):
+    """Awaits operation() with jittered exponential backoff between failed attempts.
+
+    Returns a (result, attempts) tuple. The last exception is re-raised once
+    max_retries retries are exhausted, is_retryable(exc) returns False, or the
+    next attempt could not start before deadline (a time.monotonic() value).
+    """
+    attempt = 0
+    while True:
+        attempt += 1
+        try:
+            return await operation(), attempt
+        except Exception as e:
+            if attempt > max_retries or not is_retryable(e):
+                raise
+            delay = min(max_delay, base_delay * 2 ** (attempt - 1))
+            delay = random.uniform(delay / 2, delay)
+            if deadline is not None and time.monotonic() + delay >= deadline:
+                raise
+            logger.warning(
+                f"{description} failed (attempt {attempt}): {str(e) or type(e).__name__}. Retrying in {delay:.1f}s"
+            )
+            await asyncio.sleep(delay)
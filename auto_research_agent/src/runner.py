@@ -0,0 +1,216 @@
+import asyncio
+import logging
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+
+from auto_research_agent.src.metrics import build_metrics_blocks, current_recorder, span
+from auto_research_agent.src.task_logging import current_task_name
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class TaskResult:
+    name: str
+    ok: bool
+    items: int = 0
+    seconds: float = 0.0
+    error: str = ""
+    sinks: list = field(default_factory=list)
+
+
+def format_digest(digest_data) -> str:
+    """Renders a short plain-text listing of a digest, used instead of the sinks in dry runs."""
+    lines = [f"{digest_data.topic} - {digest_data.report_date}"]
+    for i, item in enumerate(digest_data.items, 1):
+        lines.append(f"  {i}. {item.title} ({item.publication_date}) <{item.source_link}>")
+    return "\n".join(lines)
+
+
+async def run_task(
+    name,
+    task_class,
+    clients,
+    log_capture,
+    semaphore,
+    task_options=None,
+    seen_index=None,
+    dry_run=False,
+    sink_timeouts=None,
+    max_log_blocks=100,
+    notion_manifest=None,
+    archive=None,
+) -> TaskResult:
+    """Runs one task and publishes its digest, capturing its logs separately."""
+    # Sinks pull in the Notion and HTTP SDKs, so they are imported on first use
+    from auto_research_agent.src.notion_utils import build_item_blocks
+    from auto_research_agent.src.sinks import PublishContext, build_sinks, publish_all
+
+    async with semaphore:
+        # Set inside this asyncio task, so only its own records are attributed to it
+        current_task_name.set(name)
+        start = time.perf_counter()
+        task_options = task_options or {}
+
+        try:
+            logger.info(f"Initializing task: {name}")
+            # Each task only skips what it published itself, and a rerun of the same
+            # report sees its items again, so the existing page is rebuilt
+            if seen_index is not None:
+                report_date = (task_options.get("window_end") or datetime.now()).strftime("%Y-%m-%d")
+                seen_index = seen_index.for_task(name, report_date)
+            task = task_class(client=clients.genai, seen_index=seen_index, **task_options)
+
+            # In streaming mode, render Notion blocks while the response is still arriving
+            item_blocks = [] if task_options.get("stream") else None
+            rendered = []
+
+            def render_item(item):
+                rendered.append((item.source_link, item.publication_date))
+                item_blocks.extend(build_item_blocks(len(rendered), item))
+
+            logger.info("Executing task...")
+            digest_data = await task.arun(
+                on_item=render_item if item_blocks is not None else None
+            )
+
+            if digest_data is None or not digest_data.items:
+                logger.warning("Task executed but returned no items; nothing is published.")
+                return TaskResult(name, True, seconds=time.perf_counter() - start)
+
+            if item_blocks is not None and rendered != list(
+                zip(digest_data.items.column("source_link"), digest_data.items.column("publication_date"))
+            ):
+                # Items were merged, dropped or re-dated after streaming; the sink renders the final ones
+                item_blocks = None
+
+            if dry_run:
+                logger.info(f"Dry run: skipping sinks.\n{format_digest(digest_data)}")
+                return TaskResult(
+                    name, True, len(digest_data.items), time.perf_counter() - start
+                )
+
+            logger.info("Task execution successful. Publishing results...")
+
+            # All sinks run concurrently, each under its own timeout
+            sinks = build_sinks(task.sinks, clients, sink_timeouts)
+            recorder = current_recorder.get()
+            context = PublishContext(
+                # Consumed lazily by the Notion sink, chunk by chunk
+                logs=log_capture.iter_chunks(name),
+                max_log_blocks=max_log_blocks,
+                item_blocks=item_blocks,
+                # Stages up to publication; the sinks' own spans go to the metrics file
+                metrics_blocks=build_metrics_blocks(recorder.spans_for(name)) if recorder else None,
+                notion_manifest=notion_manifest,
+                task_name=name,
+            )
+            sink_results = await publish_all(sinks, digest_data, context)
+
+            # Remember published items so later runs skip them, but only once every
+            # sink has them: a rerun after a failed sink must find the same items
+            published = all(r.ok for r in sink_results) and any(not r.skipped for r in sink_results)
+            if seen_index is not None and published:
+                seen_index.add_items(digest_data.items, digest_data.report_date)
+
+            # Kept locally whatever the sinks did, so past research stays queryable
+            if archive is not None:
+                try:
+                    with span("archive", items=len(digest_data.items)):
+                        archive.add(name, digest_data, task.window_end, task.days_lookback)
+                except Exception as e:
+                    logger.error(f"Archiving the digest failed: {e}")
+
+            failed = [r for r in sink_results if not r.ok]
+            if failed:
+                logger.warning(f"{len(failed)} of {len(sink_results)} sink(s) failed.")
+            else:
+                logger.info("All operations completed successfully.")
+            return TaskResult(
+                name,
+                not failed,
+                len(digest_data.items),
+                time.perf_counter() - start,
+                error="; ".join(f"{r.name}: {r.error}" for r in failed),
+                sinks=sink_results,
+            )
+
+        except Exception as e:
+            logger.error(f"Task failed with error: {e}")
+            return TaskResult(
+                name, False, seconds=time.perf_counter() - start, error=str(e)
+            )
+
+
+async def run_tasks(
+    task_classes,
+    clients,
+    log_capture,
+    workers=4,
+    task_options=None,
+    seen_index=None,
+    dry_run=False,
+    sink_timeouts=None,
+    recorder=None,
+    max_log_blocks=100,
+    notion_manifest=None,
+    archive=None,
+) -> list[TaskResult]:
+    """Runs several registered tasks concurrently in one event loop.
+
+    If a MetricsRecorder is given, every task's stage spans are collected in it
+    and written out once all tasks have finished. With a NotionManifest, reruns
+    update the existing Notion page of a task and report date. With a
+    DigestArchive, every digest is also stored locally.
+    """
+    if task_options and task_options.get("batcher") is not None:
+        # Every task has to queue its requests before the batch job is submitted
+        workers = len(task_classes)
+    semaphore = asyncio.Semaphore(max(1, workers))
+    if recorder is not None:
+        # Copied into every task created by gather below
+        current_recorder.set(recorder)
+    try:
+        return await asyncio.gather(
+            *(
+                run_task(
+                    name,
+                    task_class,
+                    clients,
+                    log_capture,
+                    semaphore,
+                    task_options=task_options,
+                    seen_index=seen_index,
+                    dry_run=dry_run,
+                    sink_timeouts=sink_timeouts,
+                    max_log_blocks=max_log_blocks,
+                    notion_manifest=notion_manifest,
+                    archive=archive,
+                )
+                for name, task_class in task_classes.items()
+            )
+        )
+    finally:
+        await clients.aclose()
+        if recorder is not None:
+            recorder.write()
+
+
+def format_summary(results) -> str:
+    """Renders a plain-text table of per-task status, latency and sink outcomes."""
+    name_width = max([len("Task")] + [len(r.name) for r in results])
+    lines = [
+        f"{'Task':<{name_width}}  {'Status':<6}  {'Items':>5}  {'Seconds':>8}  Sinks",
+        f"{'-' * name_width}  {'-' * 6}  {'-' * 5}  {'-' * 8}  {'-' * 5}",
+    ]
+    for r in results:
+        status = "ok" if r.ok else "FAILED"
+        sinks = ", ".join(
+            f"{s.name} {'skipped' if s.skipped else 'ok' if s.ok else 'FAILED'} ({s.seconds:.1f}s)"
+            for s in r.sinks
+        )
+        lines.append(
+            f"{r.name:<{name_width}}  {status:<6}  {r.items:>5}  {r.seconds:>8.2f}  {sinks or '-'}"
+        )
+    return "\n".join(lines)
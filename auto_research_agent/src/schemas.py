@@ -1,7 +1,8 @@
+import functools
 from enum import Enum
 from typing import List
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, create_model
 
 
 class ResearchDomain(str, Enum):
@@ -41,3 +42,45 @@ class WeeklyResearchDigest(BaseModel):
     items: List[ResearchItem] = Field(
         ..., description="List of max 10 curated research items, ordered by relevance."
     )
+
+
+# Fields the harvesting model fills in; the analysing model writes the rest
+CANDIDATE_FIELDS = ("title", "source_link", "publication_date", "primary_domain")
+
+
+class ItemAnalysis(BaseModel):
+    id: int = Field(..., description="Number of the analysed item in the list.")
+    relevance_explanation: str = Field(
+        ..., description="Explanation of why this item is relevant to the domain."
+    )
+    key_innovation: str = Field(
+        ..., description="The specific problem solved or the key innovation introduced."
+    )
+    summary: str = Field(..., description="A concise summary of the item's content.")
+
+
+class ItemAnalyses(BaseModel):
+    analyses: List[ItemAnalysis] = Field(..., description="One analysis per listed item.")
+
+
+@functools.lru_cache(maxsize=None)
+def build_candidate_schemas(item_schema, digest_schema):
+    """Builds (and memoizes) the candidate models for an item and digest model.
+
+    Candidates keep the item's CANDIDATE_FIELDS, including its domain enum.
+    """
+    fields = {
+        name: (item_schema.model_fields[name].annotation, item_schema.model_fields[name])
+        for name in CANDIDATE_FIELDS
+    }
+    candidate_model = create_model(f"{item_schema.__name__}Candidate", **fields)
+    candidates_model = create_model(
+        f"{digest_schema.__name__}Candidates",
+        topic=(str, digest_schema.model_fields["topic"]),
+        report_date=(str, digest_schema.model_fields["report_date"]),
+        items=(
+            List[candidate_model],
+            Field(..., description="List of candidate research items, ordered by relevance."),
+        ),
+    )
+    return candidate_model, candidates_model
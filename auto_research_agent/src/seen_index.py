@@ -0,0 +1,143 @@
+import hashlib
+import json
+import logging
+import os
+import re
+import unicodedata
+from urllib.parse import parse_qsl, urlencode, urlsplit
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_INDEX_PATH = os.path.join(".cache", "seen_items.jsonl")
+
+_ARXIV_ID_RE = re.compile(r"arxiv\.org/(?:abs|pdf|html)/(\d{4}\.\d{4,5})(?:v\d+)?")
+_TRACKING_PARAMS = {"ref", "source", "fbclid", "gclid"}
+_NON_ALNUM_RE = re.compile(r"[^a-z0-9]+")
+
+
+def normalize_link(url: str) -> str:
+    """Reduces a source link to a canonical form (no scheme, www, tracking params or arXiv version)."""
+    url = url.strip()
+    arxiv_match = _ARXIV_ID_RE.search(url.lower())
+    if arxiv_match:
+        return f"arxiv:{arxiv_match.group(1)}"
+
+    parts = urlsplit(url if "://" in url else f"//{url}")
+    host = parts.netloc.lower().removeprefix("www.")
+    path = parts.path.rstrip("/").removesuffix(".pdf")
+    query = urlencode(
+        sorted(
+            (k, v)
+            for k, v in parse_qsl(parts.query)
+            if not (k.lower().startswith("utm_") or k.lower() in _TRACKING_PARAMS)
+        )
+    )
+    return f"{host}{path}?{query}" if query else f"{host}{path}"
+
+
+def title_fingerprint(title: str) -> str:
+    """Hashes a title after stripping case, accents, punctuation and whitespace."""
+    normalized = unicodedata.normalize("NFKD", title).encode("ascii", "ignore").decode()
+    normalized = _NON_ALNUM_RE.sub("", normalized.lower())
+    return hashlib.blake2b(normalized.encode("utf-8"), digest_size=8).hexdigest()
+
+
+class SeenItemsIndex:
+    """Append-only index of every research item that has been published.
+
+    Each line of the backing JSONL file holds the normalized link, the title
+    fingerprint, the original title and the task that published it. The keys
+    are loaded into hash sets at startup so membership checks are O(1) per item.
+
+    An index opened for a task only sees that task's entries, so a work
+    published by one topic is not withheld from another. Entries without a
+    task, written before tasks were recorded, apply to every task. With a
+    report_date, the task's own entries for that report are left out too, so a
+    rerun of the report finds the same items again.
+    """
+
+    def __init__(self, path: str | None = None, task: str = "", report_date: str = ""):
+        self.path = path or os.environ.get("RESEARCH_SEEN_INDEX", DEFAULT_INDEX_PATH)
+        self.task = task
+        self.report_date = report_date
+        self.link_keys = set()
+        self.title_keys = set()
+        self.titles = []
+        # Entries of the report being rerun; not filtered on, but not written again either
+        self.rerun_keys = set()
+        self._load()
+
+    def _load(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        continue
+                    owner = entry.get("task")
+                    if self.task and owner and owner != self.task:
+                        continue
+                    if self.report_date and owner and entry.get("report_date") == self.report_date:
+                        self.rerun_keys.add((entry["link"], entry["title_key"]))
+                        continue
+                    self.link_keys.add(entry["link"])
+                    self.title_keys.add(entry["title_key"])
+                    self.titles.append(entry.get("title", ""))
+        except FileNotFoundError:
+            return
+
+        logger.info(f"Loaded {len(self.link_keys)} previously published items from {self.path}")
+
+    def __len__(self):
+        return len(self.titles)
+
+    def for_task(self, task: str, report_date: str = "") -> "SeenItemsIndex":
+        """Opens the same file as an index of the given task's entries, leaving out those of report_date."""
+        return SeenItemsIndex(self.path, task, report_date)
+
+    def contains(self, item) -> bool:
+        """Returns True if the item's link or title was published before."""
+        return (
+            normalize_link(item.source_link) in self.link_keys
+            or title_fingerprint(item.title) in self.title_keys
+        )
+
+    def add_items(self, items, report_date: str = ""):
+        """Appends newly published items to the index."""
+        lines = []
+        for item in items:
+            link_key = normalize_link(item.source_link)
+            title_key = title_fingerprint(item.title)
+            if link_key in self.link_keys and title_key in self.title_keys:
+                continue
+            if (link_key, title_key) in self.rerun_keys:
+                continue
+            self.link_keys.add(link_key)
+            self.title_keys.add(title_key)
+            self.titles.append(item.title)
+            lines.append(
+                json.dumps(
+                    {
+                        "link": link_key,
+                        "title_key": title_key,
+                        "title": item.title,
+                        "report_date": report_date,
+                        "task": self.task,
+                    }
+                )
+            )
+
+        if not lines:
+            return
+
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write("\n".join(lines) + "\n")
+        logger.info(f"Recorded {len(lines)} published items in {self.path}")
+
+    def exclusion_list(self, limit: int = 40) -> list[str]:
+        """Returns the titles of the most recently published items."""
+        return self.titles[-limit:] if limit > 0 else []
@@ -0,0 +1,184 @@
+import abc
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class SinkResult:
+    name: str
+    ok: bool
+    seconds: float = 0.0
+    skipped: bool = False
+    error: str = ""
+
+
+@dataclass
+class PublishContext:
+    """Extra inputs a sink may use besides the digest itself."""
+
+    # A string or an iterable of Notion-sized chunks
+    logs: object = ""
+    item_blocks: list | None = None
+    metrics_blocks: list | None = None
+    max_log_blocks: int = 100
+    # A NotionManifest enables in-place updates of an existing page
+    notion_manifest: object = None
+    # Registry name of the task; keys the manifest, since the digest topic is model-written
+    task_name: str = ""
+
+
+class Sink(abc.ABC):
+    """A destination a digest is published to.
+
+    Subclasses implement publish(); it returns False if the sink was skipped
+    (e.g. missing credentials) and raises on failure.
+    """
+
+    name = "sink"
+    default_timeout = 60.0
+
+    def __init__(self, timeout: float | None = None):
+        self.timeout = self.default_timeout if timeout is None else timeout
+
+    @classmethod
+    def from_clients(cls, clients, timeout: float | None = None) -> "Sink":
+        """Builds the sink from a SharedClients instance."""
+        return cls(timeout=timeout)
+
+    @abc.abstractmethod
+    async def publish(self, digest_data, context: PublishContext) -> bool:
+        """Publishes the digest; returns False if the sink was skipped."""
+
+
+class NotionSink(Sink):
+    name = "notion"
+    default_timeout = 120.0
+
+    def __init__(self, notion=None, timeout: float | None = None):
+        """
+        Args:
+            notion: A shared notion_client.AsyncClient, or None to open one per page.
+            timeout: Seconds allowed for the whole page upload.
+        """
+        super().__init__(timeout)
+        self.notion = notion
+
+    @classmethod
+    def from_clients(cls, clients, timeout: float | None = None) -> "NotionSink":
+        return cls(clients.notion, timeout=timeout)
+
+    async def publish(self, digest_data, context: PublishContext) -> bool:
+        from auto_research_agent.src.notion_utils import publish_to_notion
+
+        page_id = await publish_to_notion(
+            digest_data,
+            logs=context.logs,
+            item_blocks=context.item_blocks,
+            notion=self.notion,
+            metrics_blocks=context.metrics_blocks,
+            max_log_blocks=context.max_log_blocks,
+            manifest=context.notion_manifest,
+            page_key=context.task_name or None,
+        )
+        return page_id is not None
+
+
+class GoogleChatSink(Sink):
+    name = "chat"
+    # Covers every message to every space, paced by the rate limiter
+    default_timeout = 60.0
+
+    def __init__(self, http_client=None, rate_limiter=None, timeout: float | None = None):
+        """
+        Args:
+            http_client: A shared httpx.AsyncClient, or None to open one per digest.
+            rate_limiter: A SpaceRateLimiter shared by every post of the run, or None for one per digest.
+            timeout: Seconds allowed for posting to all webhooks.
+        """
+        super().__init__(timeout)
+        self.http_client = http_client
+        self.rate_limiter = rate_limiter
+
+    @classmethod
+    def from_clients(cls, clients, timeout: float | None = None) -> "GoogleChatSink":
+        return cls(clients.http, clients.chat_rate_limiter, timeout=timeout)
+
+    async def publish(self, digest_data, context: PublishContext) -> bool:
+        from auto_research_agent.src.chat_utils import publish_to_google_chat, summarize_chat_results
+
+        # Posts wait in the limiter behind other tasks' digests; a space that no
+        # longer fits in the timeout is skipped instead of being cut off midway
+        results = await publish_to_google_chat(
+            digest_data,
+            http_client=self.http_client,
+            rate_limiter=self.rate_limiter,
+            deadline=time.monotonic() + self.timeout,
+        )
+        if results is None:
+            return False
+        if not all(result.ok for result in results):
+            raise RuntimeError(summarize_chat_results(results))
+        return True
+
+
+# Sink names usable in a task's `sinks` and in topic files
+SINKS = {
+    NotionSink.name: NotionSink,
+    GoogleChatSink.name: GoogleChatSink,
+}
+
+
+def build_sinks(names, clients, timeouts=None) -> list[Sink]:
+    """Instantiates the named sinks with the shared clients.
+
+    timeouts maps sink names to seconds; sinks without an entry use their default.
+    """
+    timeouts = timeouts or {}
+    sinks = []
+    for name in names:
+        try:
+            sink_class = SINKS[name]
+        except KeyError:
+            raise ValueError(f"Unknown sink: {name}. Available sinks: {sorted(SINKS)}")
+        sinks.append(sink_class.from_clients(clients, timeout=timeouts.get(name)))
+    return sinks
+
+
+async def _publish_one(sink: Sink, digest_data, context: PublishContext) -> SinkResult:
+    start = time.perf_counter()
+    try:
+        published = await asyncio.wait_for(
+            sink.publish(digest_data, context), timeout=sink.timeout
+        )
+    except asyncio.TimeoutError:
+        error = f"timed out after {sink.timeout:g}s"
+    except Exception as e:
+        error = str(e) or type(e).__name__
+    else:
+        return SinkResult(
+            sink.name, True, time.perf_counter() - start, skipped=not published
+        )
+    return SinkResult(sink.name, False, time.perf_counter() - start, error=error)
+
+
+async def publish_all(sinks, digest_data, context: PublishContext | None = None) -> list[SinkResult]:
+    """Publishes to all sinks concurrently; a slow or failing sink never delays the others."""
+    context = context or PublishContext()
+    results = await asyncio.gather(
+        *(_publish_one(sink, digest_data, context) for sink in sinks)
+    )
+
+    for result in results:
+        if result.skipped:
+            logger.info(f"Sink {result.name}: skipped ({result.seconds:.2f}s)")
+        elif result.ok:
+            logger.info(f"Sink {result.name}: published in {result.seconds:.2f}s")
+        else:
+            logger.error(
+                f"Sink {result.name}: failed after {result.seconds:.2f}s: {result.error}"
+            )
+    return list(results)
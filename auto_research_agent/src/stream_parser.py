@@ -0,0 +1,119 @@
+import json
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class IncrementalDigestParser:
+    """Incrementally parses a streamed WeeklyResearchDigest JSON document.
+
+    Text chunks are fed as they arrive. Every object inside the top-level
+    ``items`` array is returned as a dict as soon as its closing brace is seen,
+    and top-level string fields (``topic``, ``report_date``) are collected in
+    ``fields``. Consumed text is discarded, so memory stays bounded by the size
+    of the largest single item rather than the whole response.
+    """
+
+    def __init__(self, items_key: str = "items"):
+        self.items_key = items_key
+        self.fields = {}
+        self.items_emitted = 0
+        self._buf = ""
+        self._pos = 0
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._string_start = None
+        self._last_key = None
+        self._pending_key = None
+        self._in_items = False
+        self._item_start = None
+        self._done = False
+
+    def feed(self, chunk: str) -> list[dict]:
+        """Consumes a chunk of text and returns the items completed by it."""
+        completed = []
+        self._buf += chunk
+        buf = self._buf
+        i = self._pos
+
+        while i < len(buf):
+            c = buf[i]
+
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif c == "\\":
+                    self._escape = True
+                elif c == '"':
+                    self._in_string = False
+                    if self._string_start is not None:
+                        self._on_top_level_string(json.loads(buf[self._string_start : i + 1]))
+                        self._string_start = None
+            elif c == '"':
+                self._in_string = True
+                if self._depth == 1:
+                    self._string_start = i
+            elif c == ":":
+                if self._depth == 1:
+                    self._pending_key = self._last_key
+            elif c in "{[":
+                if c == "[" and self._depth == 1 and self._pending_key == self.items_key:
+                    self._in_items = True
+                    self._pending_key = None
+                elif c == "{" and self._in_items and self._depth == 2:
+                    self._item_start = i
+                self._depth += 1
+            elif c in "}]":
+                self._depth -= 1
+                if c == "}" and self._item_start is not None and self._depth == 2:
+                    item = self._decode_item(buf[self._item_start : i + 1])
+                    if item is not None:
+                        completed.append(item)
+                    self._item_start = None
+                elif c == "]" and self._in_items and self._depth == 1:
+                    self._in_items = False
+                elif self._depth == 0:
+                    self._done = True
+            elif c == "," and self._depth == 1:
+                self._pending_key = None
+
+            i += 1
+
+        self._compact(i)
+        self.items_emitted += len(completed)
+        return completed
+
+    def _on_top_level_string(self, value: str):
+        if self._pending_key is not None:
+            self.fields[self._pending_key] = value
+            self._pending_key = None
+        else:
+            self._last_key = value
+
+    def _decode_item(self, text: str) -> dict | None:
+        try:
+            return json.loads(text)
+        except ValueError as e:
+            logger.warning(f"Skipping malformed streamed item: {e}")
+            return None
+
+    def _compact(self, pos: int):
+        """Drops text that no pending item or string still refers to."""
+        keep_from = pos
+        if self._item_start is not None:
+            keep_from = min(keep_from, self._item_start)
+        if self._string_start is not None:
+            keep_from = min(keep_from, self._string_start)
+
+        self._buf = self._buf[keep_from:]
+        self._pos = pos - keep_from
+        if self._item_start is not None:
+            self._item_start -= keep_from
+        if self._string_start is not None:
+            self._string_start -= keep_from
+
+    @property
+    def complete(self) -> bool:
+        """True once the closing brace of the top-level object has been seen."""
+        return self._done
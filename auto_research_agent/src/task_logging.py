@@ -0,0 +1,119 @@
+import collections
+import contextvars
+import logging
+import threading
+
+# Name of the task whose code is currently running. asyncio tasks and
+# asyncio.to_thread copy the context, so records logged anywhere inside a
+# task's call tree are attributed to it.
+current_task_name = contextvars.ContextVar("current_task_name", default=None)
+
+# Notion's limit on the length of a single rich text object
+NOTION_CHUNK_SIZE = 2000
+
+
+class BoundedLogBuffer:
+    """Keeps the first and the last lines of a log within a fixed size.
+
+    The first head_bytes of lines are kept as they arrive; after that, lines go
+    into a tail ring buffer holding at most the remaining budget, and the lines
+    it evicts are only counted. Sizes are measured in characters.
+    """
+
+    def __init__(self, max_bytes: int = 1024 * 1024, head_fraction: float = 0.25):
+        self.head_limit = int(max_bytes * head_fraction)
+        self.tail_limit = max_bytes - self.head_limit
+        self.head = []
+        self.head_size = 0
+        self.tail = collections.deque()
+        self.tail_size = 0
+        self.dropped_lines = 0
+        self.dropped_size = 0
+        self.lock = threading.Lock()
+
+    def append(self, line: str):
+        with self.lock:
+            if not self.tail and self.head_size + len(line) <= self.head_limit:
+                self.head.append(line)
+                self.head_size += len(line)
+                return
+
+            self.tail.append(line)
+            self.tail_size += len(line)
+            while self.tail_size > self.tail_limit and len(self.tail) > 1:
+                evicted = self.tail.popleft()
+                self.tail_size -= len(evicted)
+                self.dropped_lines += 1
+                self.dropped_size += len(evicted)
+
+    def lines(self):
+        """Yields the retained lines, with a marker where lines were dropped."""
+        with self.lock:
+            # Copies references only; the strings themselves are shared
+            head, tail = list(self.head), list(self.tail)
+            dropped_lines, dropped_size = self.dropped_lines, self.dropped_size
+
+        yield from head
+        if dropped_lines:
+            yield f"... {dropped_lines} log lines ({dropped_size / 1024:.0f} KB) omitted ...\n"
+        yield from tail
+
+    def chunks(self, chunk_size: int = NOTION_CHUNK_SIZE):
+        """Lazily yields the retained log as segments of at most chunk_size characters."""
+        pending = []
+        pending_size = 0
+        for line in self.lines():
+            while line:
+                take = line[: chunk_size - pending_size]
+                line = line[len(take):]
+                pending.append(take)
+                pending_size += len(take)
+                if pending_size == chunk_size:
+                    yield "".join(pending)
+                    pending, pending_size = [], 0
+        if pending:
+            yield "".join(pending)
+
+    def getvalue(self) -> str:
+        return "".join(self.lines())
+
+
+class TaskLogCapture(logging.Handler):
+    """Captures log records into a separate, size-bounded buffer per running task."""
+
+    def __init__(self, level=logging.NOTSET, max_bytes_per_task: int = 1024 * 1024, head_fraction: float = 0.25):
+        """
+        Args:
+            level: Minimum level of captured records.
+            max_bytes_per_task: Characters of log kept per task; beyond it, the
+                middle of the log is dropped.
+            head_fraction: Share of the budget reserved for the start of the log.
+        """
+        super().__init__(level)
+        self.max_bytes_per_task = max_bytes_per_task
+        self.head_fraction = head_fraction
+        self.buffers = {}
+
+    def emit(self, record):
+        task_name = current_task_name.get()
+        if task_name is None:
+            return
+        try:
+            buffer = self.buffers.get(task_name)
+            if buffer is None:
+                buffer = self.buffers.setdefault(
+                    task_name, BoundedLogBuffer(self.max_bytes_per_task, self.head_fraction)
+                )
+            buffer.append(self.format(record) + "\n")
+        except Exception:
+            self.handleError(record)
+
+    def getvalue(self, task_name: str) -> str:
+        buffer = self.buffers.get(task_name)
+        return buffer.getvalue() if buffer is not None else ""
+
+    def iter_chunks(self, task_name: str, chunk_size: int = NOTION_CHUNK_SIZE):
+        """Yields a task's captured log in Notion-sized segments without joining it first."""
+        buffer = self.buffers.get(task_name)
+        if buffer is not None:
+            yield from buffer.chunks(chunk_size)
@@ -0,0 +1,148 @@
+import functools
+import os
+import re
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from enum import Enum
+from string import Template
+from typing import List
+
+from pydantic import Field, create_model
+
+from auto_research_agent.src.dates import DatePolicy
+from auto_research_agent.src.schemas import ResearchItem, WeeklyResearchDigest
+from auto_research_agent.src.sinks import SINKS
+
+try:
+    import tomllib
+except ModuleNotFoundError:  # Python < 3.11
+    import tomli as tomllib
+
+OTHER_DOMAIN = "Other"
+VALID_SINKS = set(SINKS)
+
+
+@dataclass(frozen=True)
+class TopicDomain:
+    name: str
+    description: str = ""
+
+
+@dataclass(frozen=True)
+class TopicConfig:
+    """A research topic loaded from a TOML file.
+
+    query_template is a string.Template; it may use $topic, $start_date,
+    $today_date, $max_items and $domains (the rendered domain sections).
+    """
+
+    name: str
+    topic: str
+    query_template: str
+    domains: tuple[TopicDomain, ...]
+    days_lookback: int = 30
+    max_items: int = 10
+    items_per_domain: int = 3
+    model: str = "gemini-3-pro-preview"
+    system_instruction: str = "weekly_digest"
+    sinks: tuple[str, ...] = ("notion", "chat")
+    date_policy: DatePolicy = DatePolicy()
+
+    def render_query(self, domains=None, max_items=None, today=None, days_lookback=None) -> str:
+        """Fills the query template for the given domains (default: all of them).
+
+        The timeframe ends at today (default: now) and spans days_lookback days
+        (default: the topic's days_lookback).
+        """
+        domains = self.domains if domains is None else domains
+        today = today or datetime.now()
+        start = today - timedelta(days=days_lookback or self.days_lookback)
+
+        sections = "\n".join(
+            f"### {chr(ord('A') + i)}. {domain.name}\n{domain.description.strip()}\n"
+            for i, domain in enumerate(domains)
+        )
+        return Template(self.query_template).safe_substitute(
+            topic=self.topic,
+            start_date=start.strftime("%Y-%m-%d"),
+            today_date=today.strftime("%Y-%m-%d"),
+            max_items=max_items or self.max_items,
+            domains=sections,
+        )
+
+    def schemas(self):
+        """Returns the (item, digest) pydantic models for this topic's domains."""
+        return build_topic_schemas(
+            self.topic, tuple(d.name for d in self.domains), self.max_items
+        )
+
+
+def _class_prefix(text: str) -> str:
+    return "".join(part.capitalize() for part in re.split(r"[^A-Za-z0-9]+", text) if part)
+
+
+@functools.lru_cache(maxsize=None)
+def build_topic_schemas(topic: str, domain_names: tuple[str, ...], max_items: int = 10):
+    """Builds (and memoizes) the item and digest models for a set of domains."""
+    prefix = _class_prefix(topic) or "Topic"
+    members = [(f"DOMAIN_{i}", name) for i, name in enumerate(domain_names)]
+    if OTHER_DOMAIN not in domain_names:
+        members.append(("OTHER", OTHER_DOMAIN))
+    domain_enum = Enum(f"{prefix}Domain", members, type=str)
+
+    item_model = create_model(
+        f"{prefix}ResearchItem",
+        __base__=ResearchItem,
+        primary_domain=(
+            domain_enum,
+            Field(..., description="The primary research domain this item belongs to."),
+        ),
+    )
+    digest_model = create_model(
+        f"{prefix}WeeklyResearchDigest",
+        __base__=WeeklyResearchDigest,
+        items=(
+            List[item_model],
+            Field(
+                ...,
+                description=f"List of max {max_items} curated research items, ordered by relevance.",
+            ),
+        ),
+    )
+    return item_model, digest_model
+
+
+@functools.lru_cache(maxsize=None)
+def load_topic(path: str) -> TopicConfig:
+    """Parses a topic TOML file. Results are memoized per path."""
+    with open(path, "rb") as f:
+        data = tomllib.load(f)
+
+    missing = [key for key in ("topic", "query_template", "domains") if key not in data]
+    if missing:
+        raise ValueError(f"Topic file {path} is missing required keys: {missing}")
+
+    sinks = tuple(data.get("sinks", ("notion", "chat")))
+    unknown_sinks = set(sinks) - VALID_SINKS
+    if unknown_sinks:
+        raise ValueError(f"Topic file {path} has unknown sinks: {sorted(unknown_sinks)}")
+
+    domains = tuple(
+        TopicDomain(name=d["name"], description=d.get("description", ""))
+        for d in data["domains"]
+    )
+    name = data.get("name") or os.path.splitext(os.path.basename(path))[0]
+
+    return TopicConfig(
+        name=name,
+        topic=data["topic"],
+        query_template=data["query_template"],
+        domains=domains,
+        days_lookback=data.get("days_lookback", 30),
+        max_items=data.get("max_items", 10),
+        items_per_domain=data.get("items_per_domain", 3),
+        model=data.get("model", "gemini-3-pro-preview"),
+        system_instruction=data.get("system_instruction", "weekly_digest"),
+        sinks=sinks,
+        date_policy=DatePolicy.from_dict(data.get("date_policy", {})),
+    )
@@ -1,35 +1,92 @@
 import logging
-from datetime import datetime, timedelta
-from auto_research_agent.src.schemas import WeeklyResearchDigest
+from datetime import datetime
+from auto_research_agent.src.dates import DateFilter, DatePolicy, normalize_date
+from auto_research_agent.src.item_store import CompactDigest
 
 logger = logging.getLogger(__name__)
 
-def filter_digest_items(digest_data: WeeklyResearchDigest, days_lookback: int = 30) -> WeeklyResearchDigest:
-    """Filters digest items based on publication date."""
-    
-    # Force the report date to be today
-    digest_data.report_date = datetime.now().strftime("%Y-%m-%d")
-
-    cutoff_date = datetime.now() - timedelta(days=days_lookback)
-    filtered_items = []
-    
-    for item in digest_data.items:
-        try:
-            # Try to parse YYYY-MM-DD
-            pub_date = datetime.strptime(item.publication_date, "%Y-%m-%d")
-            if pub_date >= cutoff_date:
-                filtered_items.append(item)
-            else:
-                logger.info(
-                    f"Skipping old item: {item.title} ({item.publication_date})"
-                )
-        except ValueError:
+def should_keep_item(item, date_filter: DateFilter, seen_index=None) -> bool:
+    """Decides whether a single item passes the date window and the seen-items index.
+
+    The item's publication_date is normalized to ISO format if it can be parsed.
+    """
+    if seen_index is not None and seen_index.contains(item):
+        logger.info(f"Skipping previously published item: {item.title}")
+        return False
+
+    keep = date_filter.keep(item.publication_date)
+    if keep is None:
+        if date_filter.keep_unparseable():
             # If date format is wrong, keep it but warn
             logger.warning(
                 f"Invalid date format for item: {item.title} ({item.publication_date}). Keeping it."
             )
-            filtered_items.append(item)
+            return True
+        logger.info(f"Skipping item with invalid date: {item.title} ({item.publication_date})")
+        return False
+
+    if not keep:
+        logger.info(
+            f"Skipping out-of-window item: {item.title} ({item.publication_date})"
+        )
+        return False
+
+    item.publication_date = normalize_date(item.publication_date)
+    return True
+
+def filter_digest_items(
+    digest_data,
+    days_lookback: int = 30,
+    seen_index=None,
+    now: datetime | None = None,
+    policy: DatePolicy | None = None,
+) -> CompactDigest:
+    """Filters digest items based on publication date and, if given, a SeenItemsIndex.
+
+    A WeeklyResearchDigest is converted to a CompactDigest first. now defaults
+    to the current time and is read once; policy controls how partial and
+    unparseable dates are treated.
+    """
+    if not isinstance(digest_data, CompactDigest):
+        digest_data = CompactDigest.from_model(digest_data)
+    date_filter = DateFilter(days_lookback, policy, now=now)
+
+    # Force the report date to be today
+    digest_data.report_date = date_filter.report_date
 
-    digest_data.items = filtered_items
+    store = digest_data.items
+    indices = range(len(store))
+    if seen_index is not None:
+        indices = [i for i, item in enumerate(store) if not _is_seen(item, seen_index)]
+
+    # Dates are dictionary-encoded, so each distinct string is judged once
+    keep, normalized = date_filter.evaluate(store.dates.values)
+    date_codes = store.date_codes
+    kept = [i for i in indices if keep[date_codes[i]]]
+    dropped = len(indices) - len(kept)
+
+    if logger.isEnabledFor(logging.DEBUG):
+        for i in indices:
+            if not keep[date_codes[i]]:
+                item = store[i]
+                logger.debug(f"Skipping out-of-window item: {item.title} ({item.publication_date})")
+    for i in kept:
+        if normalized[date_codes[i]] is None:
+            item = store[i]
+            logger.warning(
+                f"Invalid date format for item: {item.title} ({item.publication_date}). Keeping it."
+            )
+
+    store.map_dates(normalized)
+    digest_data.items = store.take(kept) if len(kept) < len(store) else store
+
+    if dropped:
+        logger.info(f"Skipped {dropped} items outside the {days_lookback}-day window.")
     logger.info(f"Filtered {len(digest_data.items)} items for the report.")
     return digest_data
+
+def _is_seen(item, seen_index) -> bool:
+    if seen_index.contains(item):
+        logger.info(f"Skipping previously published item: {item.title}")
+        return True
+    return False
@@ -0,0 +1,628 @@
+import abc
+import asyncio
+import itertools
+import logging
+import os
+from typing import NamedTuple
+
+from pydantic import ValidationError
+
+from auto_research_agent.src.cache import ResponseCache
+from auto_research_agent.src.context_cache import is_stale_cache_error
+from auto_research_agent.src.dates import DateFilter, DatePolicy
+from auto_research_agent.src.gemini_batch import BATCH_PRICE_FACTOR
+from auto_research_agent.src.gemini_caller import CallReport, ResilientCaller
+from auto_research_agent.prompts.two_tier_prompts import build_analysis_query, build_harvest_directive
+from auto_research_agent.src.item_store import CompactDigest, ItemRow, ItemStore
+from auto_research_agent.src.metrics import span
+from auto_research_agent.src.schemas import (
+    ItemAnalyses,
+    ResearchItem,
+    WeeklyResearchDigest,
+    build_candidate_schemas,
+)
+from auto_research_agent.src.seen_index import normalize_link
+from auto_research_agent.src.stream_parser import IncrementalDigestParser
+from auto_research_agent.src.utils import filter_digest_items, should_keep_item
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MODEL = "gemini-3-pro-preview"
+DEFAULT_HARVEST_MODEL = "gemini-2.5-flash"
+
+
+class GeneratedText(NamedTuple):
+    """A response text and where it is cached once it has been validated."""
+
+    text: str
+    cache_key: str
+    model: str
+    cached: bool = False
+
+
+class ResearchTask(abc.ABC):
+    """Gemini research workflow shared by all tasks.
+
+    Subclasses supply the prompts through build_query(), build_domain_queries()
+    and system_instruction(), and may override the class attributes below.
+    """
+
+    topic_name = "Research Digest"
+    model = DEFAULT_MODEL
+    days_lookback = 30
+    item_schema = ResearchItem
+    digest_schema = WeeklyResearchDigest
+    sinks = ("notion", "chat")
+    date_policy = DatePolicy()
+    # Items in the digest; in two-tier mode harvest_factor times as many candidates are harvested
+    max_items = 10
+    harvest_model = DEFAULT_HARVEST_MODEL
+    harvest_factor = 2
+    # Items analysed per call of the main model in two-tier mode
+    analysis_group_size = 5
+
+    def __init__(
+        self,
+        fan_out=False,
+        stream=False,
+        max_concurrency=3,
+        domain_timeout=300,
+        cache=None,
+        seen_index=None,
+        max_exclusions=40,
+        caller=None,
+        batcher=None,
+        window_end=None,
+        window_days=None,
+        dedup=None,
+        two_tier=False,
+        harvest_model=None,
+        context_cache=None,
+        link_verifier=None,
+        client=None,
+    ):
+        """
+        Args:
+            fan_out: Split the query into one concurrent sub-query per research domain.
+            stream: Stream the response and emit each item as soon as it is parsed.
+            max_concurrency: Maximum number of in-flight domain calls in fan-out mode.
+            domain_timeout: Seconds to wait for a single domain call before dropping it.
+            cache: ResponseCache for Gemini responses (default: a disabled cache).
+            seen_index: SeenItemsIndex of already published items to exclude and filter out.
+            max_exclusions: Number of recently published titles listed in the prompt.
+            caller: ResilientCaller applying retries, deadline, hedging and fallback
+                to non-streaming calls (default: retries with a 15 minute deadline).
+            batcher: GeminiBatcher; if given, calls are sent through the Batch API
+                together with those of the other tasks instead of interactively.
+            window_end: datetime the research window ends at (default: now), e.g. a
+                past week in a backfill. Dates are filtered against it too.
+            window_days: Length of the research window in days (default: days_lookback).
+            dedup: NearDuplicateDetector that merges copies of the same work (arXiv,
+                repository, project page) after filtering (default: no merging).
+            two_tier: Harvest candidates with harvest_model, filter them locally, and
+                only have the main model analyse the survivors.
+            harvest_model: Fast model used for harvesting (default: the class attribute).
+            context_cache: ContextCacheRegistry; if given, interactive calls reference a
+                cached copy of the system instruction and tools instead of sending them.
+            link_verifier: LinkVerifier that drops items with dead links and corrects
+                dates from arXiv, GitHub and Crossref metadata after date filtering.
+            client: Shared genai.Client; one is created from GEMINI_API_KEY if omitted.
+        """
+        if fan_out and stream:
+            raise ValueError("Fan-out and streaming modes cannot be combined.")
+        if batcher is not None and stream:
+            raise ValueError("Batch and streaming modes cannot be combined.")
+        if two_tier and stream:
+            raise ValueError("Two-tier and streaming modes cannot be combined.")
+        self.fan_out = fan_out
+        self.stream = stream
+        self.max_concurrency = max(1, max_concurrency)
+        self.domain_timeout = domain_timeout
+        self.cache = cache or ResponseCache(enabled=False)
+        self.seen_index = seen_index
+        self.max_exclusions = max_exclusions
+        self.caller = caller or ResilientCaller()
+        self.batcher = batcher
+        self.window_end = window_end
+        self.dedup = dedup
+        self.two_tier = two_tier
+        self.context_cache = context_cache
+        self.link_verifier = link_verifier
+        if harvest_model:
+            self.harvest_model = harvest_model
+        if window_days is not None:
+            self.days_lookback = window_days
+
+        if client is not None:
+            self.client = client
+            return
+
+        try:
+            self.api_key = os.environ["GEMINI_API_KEY"]
+            # The SDK is imported lazily so cached and dry runs never load it
+            from google import genai
+
+            self.client = genai.Client(api_key=self.api_key)
+        except KeyError:
+            logger.error("GEMINI_API_KEY not available!")
+            raise ValueError("GEMINI_API_KEY not available!")
+
+    @abc.abstractmethod
+    def build_query(self) -> str:
+        """Returns the full research query."""
+
+    @abc.abstractmethod
+    def build_domain_queries(self) -> dict[str, str]:
+        """Returns one narrower query per research domain, keyed by domain name."""
+
+    @abc.abstractmethod
+    def system_instruction(self) -> str:
+        """Returns the system instruction sent with every query."""
+
+    def _build_config(self, system_instruction: str, schema=None):
+        from google.genai import types
+
+        return types.GenerateContentConfig(
+            system_instruction=system_instruction,
+            response_mime_type="application/json",
+            response_schema=schema or self.digest_schema,
+            tools=[types.Tool(google_search=types.GoogleSearch())],
+        )
+
+    def _parse_response(self, text, schema=None) -> WeeklyResearchDigest:
+        if not text:
+            logger.error("Empty response from Gemini.")
+            raise ValueError("Empty response from Gemini.")
+
+        with span("json_validation", bytes=len(text)):
+            return (schema or self.digest_schema).model_validate_json(text)
+
+    def _cache_key(
+        self, query: str, system_instruction: str, model: str | None = None, schema=None
+    ) -> str:
+        return ResponseCache.make_key(
+            query, system_instruction, model or self.model, schema or self.digest_schema
+        )
+
+    def _store_response(self, generated: GeneratedText):
+        """Caches a response text; only called once it has been validated."""
+        if not generated.cached:
+            self.cache.set(generated.cache_key, generated.text, model=generated.model)
+
+    async def _agenerate(
+        self, query: str, system_instruction: str, model: str | None = None, schema=None
+    ) -> GeneratedText:
+        """Calls Gemini through the resilient caller, serving the response text from the cache if possible.
+
+        model and schema default to the task's model and digest schema. The text
+        is not cached here: callers pass it to _store_response() once it validates,
+        so a malformed response is never replayed.
+        """
+        model = model or self.model
+        schema = schema or self.digest_schema
+        with span("gemini_call", model=model) as gemini_span:
+            key = self._cache_key(query, system_instruction, model, schema)
+            cached = self.cache.get(key)
+            if cached is not None:
+                gemini_span.attrs["cached"] = True
+                return GeneratedText(cached, key, model, cached=True)
+
+            config = self._build_config(system_instruction, schema)
+            if self.batcher is not None:
+                response = await self.batcher.generate(model, query, config)
+                report = CallReport(model, attempts=1)
+                gemini_span.attrs["batch"] = True
+            else:
+
+                async def request(model):
+                    call_config = await self._with_context_cache(model, config)
+                    try:
+                        response = await self.client.aio.models.generate_content(
+                            model=model,
+                            contents=query,
+                            config=call_config,
+                        )
+                    except Exception as e:
+                        if call_config is config or not is_stale_cache_error(e):
+                            raise
+                        logger.warning(
+                            f"Cached content {call_config.cached_content} was refused ({e}); "
+                            "sending the prefix inline"
+                        )
+                        self.context_cache.invalidate(call_config.cached_content)
+                        return await self.client.aio.models.generate_content(
+                            model=model,
+                            contents=query,
+                            config=config,
+                        )
+                    if call_config is not config:
+                        gemini_span.attrs["context_cache"] = call_config.cached_content
+                    return response
+
+                response, report = await self.caller.call(request, model)
+                gemini_span.attrs.update(attempts=report.attempts, hedged=report.hedged)
+
+            gemini_span.attrs["model"] = report.model
+            self._record_response(gemini_span, query, system_instruction, response, report.model)
+            if self.batcher is not None and gemini_span.cost_usd is not None:
+                gemini_span.cost_usd *= BATCH_PRICE_FACTOR
+
+            # A fallback model's answer is cached under that model's key
+            if report.model != model:
+                key = self._cache_key(query, system_instruction, report.model, schema)
+            return GeneratedText(response.text, key, report.model)
+
+    async def _with_context_cache(self, model: str, config):
+        """Moves the system instruction and tools of config into a cached content, if one is available.
+
+        Batch requests keep them inline: a job may wait longer than the handle lives.
+        """
+        if self.context_cache is None:
+            return config
+        name = await self.context_cache.acquire(
+            self.client, model, config.system_instruction, config.tools
+        )
+        if name is None:
+            return config
+        return config.model_copy(
+            update={"cached_content": name, "system_instruction": None, "tools": None}
+        )
+
+    def _record_response(self, gemini_span, query, system_instruction, response, model):
+        if gemini_span.attrs.get("context_cache"):
+            system_instruction = ""
+        gemini_span.add_transfer(
+            len(query.encode()) + len(system_instruction.encode()),
+            len((response.text or "").encode()),
+        )
+        gemini_span.add_usage(getattr(response, "usage_metadata", None), model)
+
+    def _with_exclusions(self, query: str) -> str:
+        """Appends the recently published titles so Gemini spends its slots on new work."""
+        if self.seen_index is None:
+            return query
+
+        titles = self.seen_index.exclusion_list(self.max_exclusions)
+        if not titles:
+            return query
+
+        exclusions = "\n".join(f"*   {title}" for title in titles)
+        return (
+            f"{query}\n## 4. Already Reported (Exclude)\n"
+            f"Do not return any of the following previously reported items:\n{exclusions}\n"
+        )
+
+    def _stream_text(self, query: str, system_instruction: str, chunks: list | None = None):
+        """Yields response text chunks, replaying a cached response as a single chunk.
+
+        Fresh chunks are also appended to chunks, if given, so the caller can cache
+        the response once it knows the stream was complete.
+        """
+        cached = self.cache.get(self._cache_key(query, system_instruction))
+        if cached is not None:
+            yield cached
+            return
+
+        # The span also covers the per-item work done between chunks
+        with span("gemini_stream", model=self.model) as gemini_span:
+            gemini_span.add_transfer(len(query.encode()) + len(system_instruction.encode()))
+
+            usage_metadata = None
+            for chunk in self.client.models.generate_content_stream(
+                model=self.model,
+                contents=query,
+                config=self._build_config(system_instruction),
+            ):
+                # The last chunk carries the totals for the whole response
+                usage_metadata = getattr(chunk, "usage_metadata", None) or usage_metadata
+                if not chunk.text:
+                    continue
+                gemini_span.add_transfer(received=len(chunk.text.encode()))
+                if chunks is not None:
+                    chunks.append(chunk.text)
+                yield chunk.text
+
+            gemini_span.add_usage(usage_metadata, self.model)
+
+    def run(self, on_item=None) -> CompactDigest:
+        """Executes the research task.
+
+        on_item, if given, is called with every item that survives filtering. In
+        streaming mode this happens while the rest of the response is still arriving.
+        The digest is validated by pydantic once, then returned as a CompactDigest.
+        """
+        return asyncio.run(self.arun(on_item))
+
+    async def arun(self, on_item=None) -> CompactDigest:
+        """Async variant of run() so several tasks can share one event loop."""
+        try:
+            if self.stream:
+                digest_data = await asyncio.to_thread(self._run_stream, on_item)
+                # Items were already emitted; the runner re-renders them if this changes any
+                return await self._verify_links(digest_data)
+
+            if self.two_tier:
+                digest_data = await self._run_two_tier()
+            elif self.fan_out:
+                # The merged domains can hold more than max_items; cut once filtering has made room
+                digest_data = self._top_items(await self._filter(await self._run_fan_out()))
+            else:
+                digest_data = await self._filter(await self._run_single())
+
+            if on_item:
+                for item in digest_data.items:
+                    on_item(item)
+
+            return digest_data
+
+        except Exception as e:
+            logger.error(f"Error executing {type(self).__name__}: {e}")
+            raise
+
+    async def _filter(self, digest_data) -> CompactDigest:
+        """Applies the date window, the seen-items index and near-duplicate merging."""
+        with span("filter_items", items=len(digest_data.items)):
+            digest_data = filter_digest_items(
+                digest_data,
+                days_lookback=self.days_lookback,
+                seen_index=self.seen_index,
+                now=self.window_end,
+                policy=self.date_policy,
+            )
+
+        # Dead links go first, so near-duplicate merging picks among working ones
+        digest_data = await self._verify_links(digest_data)
+        # The Gemini embedder makes blocking HTTP calls
+        return await asyncio.to_thread(self._merge_duplicates, digest_data)
+
+    def _top_items(self, digest_data: CompactDigest) -> CompactDigest:
+        """Keeps the first max_items of the filtered items."""
+        if len(digest_data.items) > self.max_items:
+            logger.info(f"Keeping the top {self.max_items} of {len(digest_data.items)} filtered items.")
+            digest_data.items = digest_data.items.take(range(self.max_items))
+        return digest_data
+
+    async def _verify_links(self, digest_data: CompactDigest) -> CompactDigest:
+        if self.link_verifier is None or not digest_data.items:
+            return digest_data
+        with span("verify_links", items=len(digest_data.items)):
+            date_filter = DateFilter(self.days_lookback, self.date_policy, now=self.window_end)
+            return await self.link_verifier.verify_digest(digest_data, date_filter)
+
+    async def _run_single(self, model=None, schema=None, directive="") -> WeeklyResearchDigest:
+        query = self._with_exclusions(self.build_query()) + directive
+        system_instruction = self.system_instruction()
+
+        logger.info(f"Running query: {query}")
+
+        generated = await self._agenerate(query, system_instruction, model, schema)
+
+        logger.info("Response received")
+
+        digest = self._parse_response(generated.text, schema)
+        self._store_response(generated)
+        return digest
+
+    async def _run_two_tier(self) -> CompactDigest:
+        """Harvests candidates with the fast model, filters them locally and has the
+        main model write the long-form fields of the survivors only.
+        """
+        _, candidates_schema = build_candidate_schemas(self.item_schema, self.digest_schema)
+        max_candidates = self.max_items * self.harvest_factor
+        directive = build_harvest_directive(max_candidates)
+        if self.fan_out:
+            harvested = await self._run_fan_out(self.harvest_model, candidates_schema, directive)
+        else:
+            harvested = await self._run_single(self.harvest_model, candidates_schema, directive)
+
+        rows = [
+            ItemRow(c.title, c.source_link, c.publication_date, c.primary_domain, "", "", "")
+            for c in harvested.items
+        ]
+        candidates = CompactDigest(harvested.topic, harvested.report_date, ItemStore.from_items(rows))
+        digest_data = await self._filter(candidates)
+
+        store = self._top_items(digest_data).items
+        logger.info(
+            f"Harvested {len(rows)} candidates with {self.harvest_model}; "
+            f"analysing {len(store)} with {self.model}"
+        )
+        if store:
+            digest_data.items = await self._analyse(digest_data.topic, store)
+        return digest_data
+
+    async def _analyse(self, topic: str, store: ItemStore) -> ItemStore:
+        """Fills in the long-form fields of the items in store, one main-model call per group.
+
+        Failed groups are tried once more. Returns the items that got an analysis;
+        the rest are dropped rather than published with empty fields.
+        """
+        n = len(store)
+        size = max(1, self.analysis_group_size)
+        groups = [range(start, min(start + size, n)) for start in range(0, n, size)]
+        semaphore = asyncio.Semaphore(
+            len(groups) if self.batcher is not None else self.max_concurrency
+        )
+
+        texts = {}
+        for attempt in (1, 2):
+            results = await asyncio.gather(
+                *(self._analyse_group(topic, store, group, semaphore) for group in groups),
+                return_exceptions=True,
+            )
+            failed = []
+            for group, result in zip(groups, results):
+                if isinstance(result, BaseException):
+                    logger.error(
+                        f"Analysis failed for items {group.start + 1}-{group.stop} "
+                        f"(attempt {attempt}): {result!r}"
+                    )
+                    failed.append(group)
+                else:
+                    texts.update(result)
+            groups = failed
+            if not groups:
+                break
+
+        for i, (relevance_explanation, key_innovation, summary) in texts.items():
+            store.relevance_explanations[i] = relevance_explanation
+            store.key_innovations[i] = key_innovation
+            store.summaries[i] = summary
+        if len(texts) == n:
+            return store
+        logger.warning(f"No analysis for {n - len(texts)} of {n} items; they are dropped.")
+        return store.take(sorted(texts))
+
+    async def _analyse_group(self, topic, store, group, semaphore) -> dict:
+        async with semaphore:
+            query = build_analysis_query(topic, [(number, store[i]) for number, i in enumerate(group, 1)])
+            generated = await asyncio.wait_for(
+                self._agenerate(query, self.system_instruction(), schema=ItemAnalyses),
+                timeout=None if self.batcher is not None else self.domain_timeout,
+            )
+            analyses = self._parse_response(generated.text, ItemAnalyses).analyses
+            self._store_response(generated)
+            return {
+                group[a.id - 1]: (a.relevance_explanation, a.key_innovation, a.summary)
+                for a in analyses
+                if 1 <= a.id <= len(group)
+            }
+
+    def _run_stream(self, on_item=None) -> CompactDigest:
+        """Streams the response, validating and filtering each item once it is complete."""
+        query = self._with_exclusions(self.build_query())
+        logger.info(f"Streaming query: {query}")
+
+        parser = IncrementalDigestParser()
+        date_filter = DateFilter(self.days_lookback, self.date_policy, now=self.window_end)
+        # Validated items go straight into the store; the models are not kept
+        items = ItemStore()
+        system_instruction = self.system_instruction()
+        # Only hold on to the full text when it is going to be cached
+        chunks = [] if self.cache.enabled else None
+
+        try:
+            for text in self._stream_text(query, system_instruction, chunks):
+                for raw_item in parser.feed(text):
+                    try:
+                        item = self.item_schema.model_validate(raw_item)
+                    except ValidationError as e:
+                        logger.warning(f"Skipping invalid streamed item: {e}")
+                        continue
+
+                    if not should_keep_item(item, date_filter, self.seen_index):
+                        continue
+
+                    if not items:
+                        logger.info("First item received")
+                    items.append(item)
+                    if on_item:
+                        on_item(item)
+        except Exception as e:
+            if not parser.items_emitted:
+                raise
+            logger.warning(f"Stream interrupted after {parser.items_emitted} items: {e}")
+
+        if not parser.complete:
+            if not parser.items_emitted:
+                logger.error("Empty or truncated response from Gemini.")
+                raise ValueError("Empty or truncated response from Gemini.")
+            logger.warning(
+                f"Truncated response; keeping {parser.items_emitted} fully parsed items."
+            )
+        elif chunks:
+            # Truncated streams are never cached, so a rerun asks again
+            self.cache.set(self._cache_key(query, system_instruction), "".join(chunks), model=self.model)
+
+        logger.info(f"Filtered {len(items)} items for the report.")
+        # Copies can only be told apart once all items are known, so items
+        # already passed to on_item may still be merged here
+        return self._merge_duplicates(
+            CompactDigest(
+                parser.fields.get("topic", self.topic_name),
+                date_filter.report_date,
+                items,
+            )
+        )
+
+    def _merge_duplicates(self, digest_data: CompactDigest) -> CompactDigest:
+        if self.dedup is None or len(digest_data.items) < 2:
+            return digest_data
+        with span("dedup_items", items=len(digest_data.items)):
+            return self.dedup.dedup(digest_data)
+
+    async def _research_domain(
+        self, domain, query, semaphore, model=None, schema=None
+    ) -> WeeklyResearchDigest:
+        async with semaphore:
+            logger.info(f"Running domain query: {domain}")
+            generated = await asyncio.wait_for(
+                self._agenerate(query, self.system_instruction(), model, schema),
+                # Batch jobs take minutes to hours; their own timeout applies
+                timeout=None if self.batcher is not None else self.domain_timeout,
+            )
+            logger.info(f"Response received for domain: {domain}")
+            digest = self._parse_response(generated.text, schema)
+            self._store_response(generated)
+            return digest
+
+    async def _run_fan_out(self, model=None, schema=None, directive="") -> WeeklyResearchDigest:
+        """Runs one sub-query per domain concurrently and merges the results."""
+        domain_queries = self.build_domain_queries()
+        domains = list(domain_queries)
+        # In batch mode all domain queries have to be queued for the same job
+        semaphore = asyncio.Semaphore(
+            max(1, len(domains)) if self.batcher is not None else self.max_concurrency
+        )
+
+        logger.info(
+            f"Fanning out {len(domains)} domain queries "
+            f"(max concurrency: {self.max_concurrency})"
+        )
+
+        results = await asyncio.gather(
+            *(
+                self._research_domain(
+                    domain, self._with_exclusions(query) + directive, semaphore, model, schema
+                )
+                for domain, query in domain_queries.items()
+            ),
+            return_exceptions=True,
+        )
+
+        digests = []
+        for domain, result in zip(domains, results):
+            if isinstance(result, BaseException):
+                # A failing or slow domain only loses its own items
+                logger.error(f"Domain query failed for {domain}: {result!r}")
+            else:
+                digests.append(result)
+
+        if not digests:
+            raise RuntimeError("All domain queries failed.")
+
+        return self._merge_digests(digests, schema)
+
+    def _merge_digests(self, digests, schema=None) -> WeeklyResearchDigest:
+        """Interleaves per-domain rankings and drops items sharing a normalized source link.
+
+        The result can hold more than max_items; it is cut after filtering.
+        """
+        merged_items = []
+        seen_links = set()
+        for ranked_items in itertools.zip_longest(*(d.items for d in digests)):
+            for item in ranked_items:
+                if item is None:
+                    continue
+                link_key = normalize_link(item.source_link)
+                if link_key in seen_links:
+                    continue
+                seen_links.add(link_key)
+                merged_items.append(item)
+
+        logger.info(f"Merged {len(merged_items)} items from {len(digests)} domains.")
+        return (schema or self.digest_schema)(
+            topic=digests[0].topic,
+            report_date=digests[0].report_date,
+            items=merged_items,
+        )
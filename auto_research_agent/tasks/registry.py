@@ -0,0 +1,57 @@
+import functools
+import importlib
+import logging
+import os
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TOPICS_DIR = "topics"
+
+# Built-in tasks are referenced by import path so their prompt modules are
+# only imported when the task actually runs.
+BUILTIN_TASKS = {
+    "garment_research": "auto_research_agent.tasks.garment_code_related:GarmentResearchTask",
+}
+
+
+def topics_dir() -> str:
+    return os.environ.get("RESEARCH_TOPICS_DIR", DEFAULT_TOPICS_DIR)
+
+
+def _topic_files() -> dict[str, str]:
+    """Maps topic names (file stems) to TOML paths without parsing the files."""
+    directory = topics_dir()
+    if not os.path.isdir(directory):
+        return {}
+    return {
+        os.path.splitext(name)[0]: os.path.join(directory, name)
+        for name in sorted(os.listdir(directory))
+        if name.endswith(".toml")
+    }
+
+
+def available_tasks() -> list[str]:
+    """Names of all built-in tasks and topic files."""
+    names = list(BUILTIN_TASKS)
+    for name in _topic_files():
+        if name in BUILTIN_TASKS:
+            logger.warning(f"Topic file '{name}' is shadowed by a built-in task.")
+            continue
+        names.append(name)
+    return names
+
+
+def load_task(name: str):
+    """Returns a factory for the named task, importing or parsing it on demand."""
+    if name in BUILTIN_TASKS:
+        module_name, class_name = BUILTIN_TASKS[name].split(":")
+        return getattr(importlib.import_module(module_name), class_name)
+
+    path = _topic_files().get(name)
+    if path is None:
+        raise KeyError(f"Task '{name}' not found. Available tasks: {available_tasks()}")
+
+    from auto_research_agent.src.topics import load_topic
+    from auto_research_agent.tasks.topic_research import TopicResearchTask
+
+    return functools.partial(TopicResearchTask, load_topic(path))
@@ -0,0 +1,40 @@
+from auto_research_agent.prompts import system_instruction_prompts
+from auto_research_agent.src.topics import TopicConfig
+from auto_research_agent.tasks.base import ResearchTask
+
+
+class TopicResearchTask(ResearchTask):
+    """Research task driven entirely by a declarative TopicConfig."""
+
+    def __init__(self, topic: TopicConfig, **kwargs):
+        self.topic = topic
+        self.topic_name = topic.topic
+        self.model = topic.model
+        self.days_lookback = topic.days_lookback
+        self.max_items = topic.max_items
+        self.sinks = topic.sinks
+        self.date_policy = topic.date_policy
+        self.item_schema, self.digest_schema = topic.schemas()
+        super().__init__(**kwargs)
+
+    def build_query(self) -> str:
+        return self.topic.render_query(today=self.window_end, days_lookback=self.days_lookback)
+
+    def build_domain_queries(self) -> dict[str, str]:
+        return {
+            domain.name: self.topic.render_query(
+                domains=[domain],
+                max_items=self.topic.items_per_domain,
+                today=self.window_end,
+                days_lookback=self.days_lookback,
+            )
+            for domain in self.topic.domains
+        }
+
+    def system_instruction(self) -> str:
+        """Resolves the named instruction from system_instruction_prompts, or uses it verbatim."""
+        return getattr(
+            system_instruction_prompts,
+            f"{self.topic.system_instruction}_system_instruction",
+            self.topic.system_instruction,
+        )
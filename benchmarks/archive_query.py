@@ -0,0 +1,113 @@
+"""Benchmark for lookups in the local SQLite digest archive.
+
+Fills a temporary archive with --years of weekly digests for --tasks tasks,
+--items items each (links repeat across weeks, as they do in real runs), then
+times typical queries: a domain over one year, full-text words, a single link
+and a date range.
+
+Usage:
+    python benchmarks/archive_query.py
+    python benchmarks/archive_query.py --years 5 --tasks 8 --items 40 --runs 20
+"""
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from auto_research_agent.src.archive import DigestArchive  # noqa: E402
+
+DOMAINS = [
+    "Physics-Based Modeling",
+    "Collision Handling",
+    "AI & Data-Driven Methods",
+    "Material Realism",
+]
+WORDS = [
+    "cloth", "solver", "collision", "friction", "neural", "garment", "shell", "contact",
+    "implicit", "projective", "sewing", "draping", "fabric", "barrier", "gpu", "diffusion",
+]
+
+
+def arxiv_link(n: int) -> str:
+    return f"https://arxiv.org/abs/25{1 + n // 100_000 % 12:02d}.{n % 100_000:05d}v1"
+
+
+def digest(task: int, week: int, window_end: datetime, n_items: int):
+    items = []
+    for i in range(n_items):
+        n = task * 100_000 + week * n_items + i
+        words = " ".join(random.Random(n).sample(WORDS, 3))
+        items.append(
+            SimpleNamespace(
+                title=f"Item {n}: {words}",
+                # Every third item is the same paper found again the next week
+                source_link=arxiv_link(n // 3 if i % 3 == 0 else n),
+                publication_date=(window_end - timedelta(days=i % 7)).strftime("%Y-%m-%d"),
+                primary_domain=DOMAINS[n % len(DOMAINS)],
+                relevance_explanation=f"Relevant because of its {words} formulation.",
+                key_innovation=f"A {words} method that scales to dense meshes.",
+                summary=f"Synthetic archived item {n} about {words} for the query benchmark.",
+            )
+        )
+    return SimpleNamespace(topic=f"Topic {task}", report_date=window_end.strftime("%Y-%m-%d"), items=items)
+
+
+def median_ms(fn, runs: int) -> tuple[float, int]:
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        result = fn()
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings) * 1000, len(result)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark archive queries.")
+    parser.add_argument("--years", type=int, default=3)
+    parser.add_argument("--tasks", type=int, default=4)
+    parser.add_argument("--items", type=int, default=30)
+    parser.add_argument("--runs", type=int, default=10)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        archive = DigestArchive(os.path.join(tmp, "digests.sqlite"))
+        end = datetime(2025, 12, 27)
+        weeks = args.years * 52
+        start = time.perf_counter()
+        for week in range(weeks):
+            window_end = end - timedelta(weeks=weeks - 1 - week)
+            for task in range(args.tasks):
+                archive.add(f"task_{task}", digest(task, week, window_end, args.items), window_end, 7)
+        fill_seconds = time.perf_counter() - start
+        total = weeks * args.tasks * args.items
+        size_mb = os.path.getsize(archive.path) / 2**20
+
+        print(f"{weeks * args.tasks} digests, {total} items archived in {fill_seconds:.1f}s "
+              f"({fill_seconds / (weeks * args.tasks) * 1000:.1f} ms/digest), {size_mb:.1f} MB, "
+              f"FTS5 {'on' if archive.fts else 'off'}")
+        queries = {
+            "domain in one year": lambda: archive.query(domain="Collision Handling", since="2025", until="2025", limit=None),
+            "domain, newest 50": lambda: archive.query(domain="Collision Handling"),
+            "text (2 words)": lambda: archive.query(text="friction barrier", limit=None),
+            "text + domain + year": lambda: archive.query(
+                text="cloth", domain="Material Realism", since="2024", until="2024", limit=None
+            ),
+            "single link": lambda: archive.query(link=arxiv_link(0).replace("v1", "v2"), limit=None),
+            "one month, all items": lambda: archive.query(since="2025-06", until="2025-06", limit=None),
+        }
+        for name, query in queries.items():
+            ms, count = median_ms(query, args.runs)
+            print(f"  {name:<22}: {ms:8.2f} ms  ({count} items)")
+        archive.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+"""Benchmark for posting a digest to several Google Chat spaces.
+
+Posts a digest of --items items to --webhooks webhooks on a MockChatServer
+that rejects messages over Chat's size limit with a 400 and answers a 429 to
+posts arriving less than --min-interval seconds apart in the same space. The
+last two webhooks post to the same space. Compared:
+
+  single message      the whole digest as one message, one webhook at a time
+                      (the former behaviour)
+  split, sequential   size-bounded messages, one webhook at a time
+  split, unpaced      size-bounded messages, all webhooks concurrently, without
+                      per-space pacing (429s are retried)
+  split, concurrent   size-bounded messages, all webhooks concurrently, paced
+                      per space by a shared SpaceRateLimiter
+
+Each row reports the time, the messages accepted, the 400s and 429s and how
+many webhooks got every message. The message builders are also timed on
+--build-items items: the former += concatenation and the join-based splitter.
+
+Usage:
+    python benchmarks/chat_fanout.py
+    python benchmarks/chat_fanout.py --items 300 --webhooks 8 --latency 0.1
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from mock_services import MockChatServer, synthetic_digest  # noqa: E402
+
+from auto_research_agent.src.chat_utils import (  # noqa: E402
+    MESSAGE_HEADERS,
+    SpaceRateLimiter,
+    build_chat_message,
+    build_chat_messages,
+    publish_to_google_chat,
+)
+from auto_research_agent.src.item_store import CompactDigest  # noqa: E402
+from auto_research_agent.src.schemas import WeeklyResearchDigest  # noqa: E402
+
+
+def make_digest(n: int) -> CompactDigest:
+    return CompactDigest.from_model(WeeklyResearchDigest.model_validate_json(synthetic_digest(n)))
+
+
+def concat_message(digest_data: CompactDigest) -> dict:
+    """Reference: the former builder, growing one string with +=."""
+    header = f"*{digest_data.topic} - {digest_data.report_date}*\n\n"
+    items = digest_data.items
+    rows = zip(
+        items.column("title"),
+        items.column("source_link"),
+        items.column("primary_domain"),
+        items.column("key_innovation"),
+    )
+    items_text = ""
+    for i, (title, source_link, domain, key_innovation) in enumerate(rows, 1):
+        items_text += f"*{i}. {title}*\n"
+        items_text += f"<{source_link}|Source> | `Domain: {domain.value}`\n"
+        items_text += f"> {key_innovation}\n\n"
+    return {"text": header + items_text}
+
+
+async def single_message(http, urls, digest_data, min_interval):
+    delivered = 0
+    for url in urls:
+        response = await http.post(url, headers=MESSAGE_HEADERS, json=build_chat_message(digest_data))
+        delivered += response.is_success
+    return delivered
+
+
+async def split_sequential(http, urls, digest_data, min_interval):
+    limiter = SpaceRateLimiter(min_interval)
+    delivered = 0
+    for url in urls:
+        results = await publish_to_google_chat(digest_data, http, [url], limiter)
+        delivered += results[0].ok
+    return delivered
+
+
+async def split_unpaced(http, urls, digest_data, min_interval):
+    results = await publish_to_google_chat(digest_data, http, urls, SpaceRateLimiter(0.0))
+    return sum(result.ok for result in results)
+
+
+async def split_concurrent(http, urls, digest_data, min_interval):
+    results = await publish_to_google_chat(digest_data, http, urls, SpaceRateLimiter(min_interval))
+    return sum(result.ok for result in results)
+
+
+async def run(mode, server, urls, digest_data, min_interval):
+    import httpx
+
+    async with httpx.AsyncClient(limits=httpx.Limits(max_connections=20)) as http:
+        start = time.perf_counter()
+        delivered = await mode(http, urls, digest_data, min_interval)
+        return delivered, time.perf_counter() - start
+
+
+def median_ms(fn, runs=5):
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark posting a digest to several Chat spaces.")
+    parser.add_argument("--items", type=int, default=100)
+    parser.add_argument("--webhooks", type=int, default=5)
+    parser.add_argument("--latency", type=float, default=0.05, help="Webhook latency per request in seconds")
+    parser.add_argument("--min-interval", type=float, default=0.25, help="Seconds between posts to one space")
+    parser.add_argument("--build-items", type=int, default=10_000)
+    args = parser.parse_args()
+    # Retries and failures are part of what is measured
+    logging.basicConfig(level=logging.CRITICAL)
+
+    digest_data = make_digest(args.items)
+    messages = build_chat_messages(digest_data)
+    print(f"{args.items} items: {len(build_chat_message(digest_data)['text'])} characters as one message, "
+          f"{len(messages)} messages of at most {max(len(m['text']) for m in messages)} when split")
+    print(f"{args.webhooks} webhooks, {args.latency * 1000:.0f} ms per post, "
+          f"{args.min_interval:g}s between posts to one space")
+    print(f"  {'mode':<20}  {'seconds':>7}  {'accepted':>8}  {'400s':>4}  {'429s':>4}  {'delivered':>9}")
+    modes = (
+        ("single message", single_message),
+        ("split, sequential", split_sequential),
+        ("split, unpaced", split_unpaced),
+        ("split, concurrent", split_concurrent),
+    )
+    for label, mode in modes:
+        with MockChatServer(args.latency, args.min_interval) as server:
+            spaces = [f"space{i}" for i in range(args.webhooks - 1)] + [f"space{args.webhooks - 2}"]
+            urls = [f"{server.url}/v1/spaces/{space}/messages?key=k{i}" for i, space in enumerate(spaces)]
+            delivered, seconds = asyncio.run(run(mode, server, urls, digest_data, args.min_interval))
+            rejected = server.requests - server.messages - server.throttled
+            print(f"  {label:<20}  {seconds:>7.2f}  {server.messages:>8}  {rejected:>4}  "
+                  f"{server.throttled:>4}  {delivered:>5}/{len(urls)}")
+
+    big = make_digest(args.build_items)
+    print(f"Building the messages of {args.build_items} items (median of 5)")
+    print(f"  += one message        : {median_ms(lambda: concat_message(big)):8.2f} ms")
+    print(f"  join, one message     : {median_ms(lambda: build_chat_message(big)):8.2f} ms")
+    print(f"  join, split messages  : {median_ms(lambda: build_chat_messages(big)):8.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+"""Benchmark for caching system instructions as Gemini cached content.
+
+Runs a fan-out task with the long deep-research system instruction for
+--windows consecutive windows (as a backfill does), once sending the
+instruction inline and once through a ContextCacheRegistry. The fake client
+keeps cached contents with their TTL on a simulated clock that advances
+--minutes-per-window between windows, bills cached input tokens at a tenth of
+the input price and spends --prefill-tps tokens per second on the uncached
+part of the prompt before the first token. Reports uploads, TTL extensions,
+input tokens, input cost and the mean simulated time to first token.
+
+Usage:
+    python benchmarks/context_cache.py
+    python benchmarks/context_cache.py --windows 12 --minutes-per-window 25
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from two_tier import SchemaAwareGenai  # noqa: E402
+
+from auto_research_agent.prompts.system_instruction_prompts import (  # noqa: E402
+    gemini_deep_research_system_instruction,
+)
+from auto_research_agent.src.context_cache import ContextCacheRegistry  # noqa: E402
+from auto_research_agent.src.metrics import (  # noqa: E402
+    CACHED_INPUT_PRICE_FACTOR,
+    MODEL_PRICES_PER_MILLION,
+    MetricsRecorder,
+    current_recorder,
+)
+from auto_research_agent.tasks.base import DEFAULT_MODEL  # noqa: E402
+from auto_research_agent.tasks.garment_code_related import GarmentResearchTask  # noqa: E402
+
+
+class SimClock:
+    def __init__(self):
+        self.now = datetime(2026, 1, 5, tzinfo=timezone.utc).timestamp()
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class NotFound(Exception):
+    code = 404
+
+
+class CachingGenai(SchemaAwareGenai):
+    """SchemaAwareGenai with a caches API and prompt-length dependent time to first token."""
+
+    def __init__(self, clock: SimClock, prefill_tps: float):
+        super().__init__(reject=0.0, tokens_per_second={DEFAULT_MODEL: 1e9}, time_scale=1.0)
+        self.clock = clock
+        self.prefill_tps = prefill_tps
+        self.contents = {}
+        self.ttft = []
+        self.aio.caches = SimpleNamespace(create=self._create, update=self._update)
+
+    def _handle(self, name):
+        expires_at = self.contents[name][1]
+        return SimpleNamespace(name=name, expire_time=datetime.fromtimestamp(expires_at, timezone.utc))
+
+    async def _create(self, model, config):
+        name = f"cachedContents/{len(self.contents)}"
+        self.contents[name] = [config["system_instruction"], self.clock() + int(config["ttl"][:-1])]
+        return self._handle(name)
+
+    async def _update(self, name, config):
+        if name not in self.contents or self.contents[name][1] <= self.clock():
+            raise NotFound(name)
+        self.contents[name][1] = self.clock() + int(config["ttl"][:-1])
+        return self._handle(name)
+
+    async def _generate(self, model, contents, config=None):
+        cached_tokens = 0
+        if config.cached_content:
+            entry = self.contents.get(config.cached_content)
+            if entry is None or entry[1] <= self.clock():
+                raise NotFound(config.cached_content)
+            cached_tokens = len(entry[0]) // 4
+        inline_tokens = (len(contents) + len(config.system_instruction or "")) // 4
+        self.ttft.append(inline_tokens / self.prefill_tps)
+        response = await super()._generate(model, contents, config)
+        usage = response.usage_metadata
+        usage.prompt_token_count = inline_tokens + cached_tokens
+        usage.cached_content_token_count = cached_tokens
+        return response
+
+
+class DeepResearchTask(GarmentResearchTask):
+    def system_instruction(self) -> str:
+        return gemini_deep_research_system_instruction
+
+
+async def run(use_registry: bool, args, registry_path: str):
+    clock = SimClock()
+    client = CachingGenai(clock, args.prefill_tps)
+    registry = ContextCacheRegistry(registry_path, clock=clock) if use_registry else None
+    recorder = MetricsRecorder(enabled=False)
+    current_recorder.set(recorder)
+    for window in range(args.windows):
+        window_end = datetime(2026, 1, 5) - timedelta(days=7 * window)
+        task = DeepResearchTask(
+            client=client, fan_out=True, context_cache=registry, window_end=window_end, window_days=7
+        )
+        await task.arun()
+        clock.now += args.minutes_per_window * 60
+    calls = [s for s in recorder.spans if s.stage == "gemini_call"]
+    prompt = sum(s.tokens.get("prompt", 0) for s in calls)
+    cached = sum(s.tokens.get("cached_content", 0) for s in calls)
+    input_price = MODEL_PRICES_PER_MILLION[DEFAULT_MODEL][0]
+    return SimpleNamespace(
+        calls=len(calls),
+        uploads=registry.uploads if registry else 0,
+        refreshes=registry.refreshes if registry else 0,
+        prompt=prompt,
+        cached=cached,
+        input_cost=(prompt - cached + cached * CACHED_INPUT_PRICE_FACTOR) * input_price / 1_000_000,
+        ttft=statistics.mean(client.ttft),
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare inline and cached system instructions.")
+    parser.add_argument("--windows", type=int, default=8)
+    parser.add_argument("--minutes-per-window", type=float, default=20.0)
+    parser.add_argument("--prefill-tps", type=float, default=4000.0, help="Prompt tokens processed per second")
+    args = parser.parse_args()
+
+    print(f"{len(gemini_deep_research_system_instruction)} character system instruction, "
+          f"{args.windows} windows {args.minutes_per_window:.0f} minutes apart")
+    print(f"{'Mode':<8}  {'Calls':>5}  {'Uploads':>7}  {'Extended':>8}  {'Prompt tok':>10}  "
+          f"{'Cached tok':>10}  {'Input $':>8}  {'TTFT s':>6}")
+    with tempfile.TemporaryDirectory() as directory:
+        for label, use_registry in (("inline", False), ("cached", True)):
+            r = asyncio.run(run(use_registry, args, os.path.join(directory, "registry.json")))
+            print(f"{label:<8}  {r.calls:>5}  {r.uploads:>7}  {r.refreshes:>8}  {r.prompt:>10}  "
+                  f"{r.cached:>10}  {r.input_cost:>8.4f}  {r.ttft:>6.2f}")
+
+
+if __name__ == "__main__":
+    main()
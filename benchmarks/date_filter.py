@@ -0,0 +1,136 @@
+"""Benchmark for filter_digest_items on large merged digests.
+
+Builds a digest with a mix of date formats Gemini returns (ISO dates, ISO
+timestamps, "2025-10", "Oct 3, 2025", garbage) spread over twice the lookback
+window, checks that the NumPy and pure-Python paths agree, and reports the
+median filtering time of each next to the previous strptime-per-item filter.
+--distinct-timestamps gives most items their own timestamp, the case the
+NumPy path is meant for.
+
+Usage:
+    python benchmarks/date_filter.py
+    python benchmarks/date_filter.py --items 20000 --runs 20
+    python benchmarks/date_filter.py --items 20000 --distinct-timestamps
+"""
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from auto_research_agent.src import dates  # noqa: E402
+from auto_research_agent.src.item_store import CompactDigest  # noqa: E402
+from auto_research_agent.src.schemas import ResearchItem, WeeklyResearchDigest  # noqa: E402
+from auto_research_agent.src.utils import filter_digest_items  # noqa: E402
+
+NOW = datetime(2025, 10, 17, 6, 0)
+
+
+def random_date_text(rng: random.Random, distinct_timestamps: bool = False) -> str:
+    day = NOW - timedelta(days=rng.randint(-2, 60), seconds=rng.randint(0, 86399) if distinct_timestamps else 0)
+    style = rng.random()
+    if style < 0.6:
+        return day.strftime("%Y-%m-%d")
+    if style < 0.75:
+        return day.strftime("%Y-%m-%dT%H:%M:%SZ")
+    if style < 0.85:
+        return day.strftime("%b %d, %Y")
+    if style < 0.95:
+        return day.strftime("%Y-%m")
+    return "Recently"
+
+
+def build_digest(texts: list[str]) -> WeeklyResearchDigest:
+    items = [
+        ResearchItem.model_construct(
+            title=f"Item {i}",
+            source_link=f"https://example.org/{i}",
+            publication_date=text,
+            primary_domain="Other",
+            relevance_explanation="",
+            key_innovation="",
+            summary="",
+        )
+        for i, text in enumerate(texts)
+    ]
+    return WeeklyResearchDigest.model_construct(topic="Bench", report_date="", items=items)
+
+
+def legacy_filter(digest_data, days_lookback=30):
+    """The previous implementation: datetime.now() twice and strptime per item."""
+    digest_data.report_date = datetime.now().strftime("%Y-%m-%d")
+    cutoff_date = NOW - timedelta(days=days_lookback)
+    kept = []
+    for item in digest_data.items:
+        try:
+            if datetime.strptime(item.publication_date, "%Y-%m-%d") >= cutoff_date:
+                kept.append(item)
+        except ValueError:
+            kept.append(item)
+    digest_data.items = kept
+    return digest_data
+
+
+def time_filter(texts, runs, filter_fn, compact=True) -> tuple[float, list[str]]:
+    timings = []
+    kept = []
+    for _ in range(runs):
+        digest = build_digest(texts)
+        if compact:
+            digest = CompactDigest.from_model(digest)
+        start = time.perf_counter()
+        result = filter_fn(digest)
+        timings.append(time.perf_counter() - start)
+        kept = [item.title for item in result.items]
+    return statistics.median(timings) * 1000, kept
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark digest date filtering.")
+    parser.add_argument("--items", type=int, default=5000)
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument(
+        "--distinct-timestamps", action="store_true", help="Add a random time of day to every date."
+    )
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    texts = [random_date_text(rng, args.distinct_timestamps) for _ in range(args.items)]
+
+    def new_filter(digest):
+        return filter_digest_items(digest, days_lookback=30, now=NOW)
+
+    # Silence the per-item and summary log lines
+    import logging
+
+    logging.disable(logging.WARNING)
+
+    legacy_ms, _ = time_filter(texts, args.runs, legacy_filter, compact=False)
+    auto_ms, auto_kept = time_filter(texts, args.runs, new_filter)
+
+    min_distinct = dates.NUMPY_MIN_DISTINCT
+    dates.NUMPY_MIN_DISTINCT = 0
+    numpy_ms, numpy_kept = time_filter(texts, args.runs, new_filter)
+    dates.NUMPY_MIN_DISTINCT = float("inf")
+    python_ms, python_kept = time_filter(texts, args.runs, new_filter)
+    dates.NUMPY_MIN_DISTINCT = min_distinct
+
+    if not numpy_kept == python_kept == auto_kept:
+        print("MISMATCH: NumPy and pure-Python paths kept different items")
+        sys.exit(1)
+
+    has_numpy = dates._numpy() is not None
+    print(f"{args.items} items, {len(set(texts))} distinct date strings, {len(python_kept)} kept")
+    print(f"  legacy strptime filter : {legacy_ms:8.3f} ms (ISO dates only)")
+    print(f"  memoized, pure Python  : {python_ms:8.3f} ms")
+    print(f"  memoized, NumPy        : {numpy_ms:8.3f} ms" + ("" if has_numpy else " (NumPy not installed)"))
+    print(f"  default path selection : {auto_ms:8.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,235 @@
+"""End-to-end pipeline benchmark against local mock services.
+
+Each scenario runs the real runner (task, filtering, Notion block building,
+NotionWriter upload and the Chat post) in a fresh interpreter, with a fake
+Gemini client and the mock Notion/Chat servers from mock_services.py, and
+reports end-to-end latency, per-stage time (mean per task, from the metrics
+spans) and peak RSS. Nothing leaves the machine.
+
+Usage:
+    python benchmarks/e2e.py                       # default scenario matrix
+    python benchmarks/e2e.py --scenario items-500 --repeat 5
+    python benchmarks/e2e.py --items 200 --log-kb 4096 --tasks 8 --stream
+    python benchmarks/e2e.py --scenario tasks-50 --batch
+    python benchmarks/e2e.py --recorded digest.json --scenario tasks-10
+    python benchmarks/e2e.py --json results.json
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# name: (items per digest, KB of logs per task, number of tasks)
+SCENARIOS = {
+    "items-1": (1, 10, 1),
+    "items-50": (50, 10, 1),
+    "items-500": (500, 10, 1),
+    "logs-10kb": (10, 10, 1),
+    "logs-1mb": (10, 1024, 1),
+    "logs-10mb": (10, 10 * 1024, 1),
+    "tasks-1": (10, 10, 1),
+    "tasks-10": (10, 10, 10),
+    "tasks-50": (10, 10, 50),
+}
+
+
+def run_scenario(spec: dict) -> dict:
+    """Runs one scenario in this process and returns its measurements."""
+    sys.path.insert(0, REPO_ROOT)
+    import asyncio
+    import logging
+    import resource
+
+    from mock_services import FakeGenaiClient, MockChatServer, MockNotionServer, synthetic_digest
+
+    from auto_research_agent.src.clients import SharedClients
+    from auto_research_agent.src.gemini_batch import GeminiBatcher
+    from auto_research_agent.src.metrics import MetricsRecorder
+    from auto_research_agent.src.runner import run_tasks
+    from auto_research_agent.src.task_logging import TaskLogCapture
+    from auto_research_agent.tasks.garment_code_related import GarmentResearchTask
+
+    if spec.get("recorded"):
+        with open(spec["recorded"]) as f:
+            response_text = f.read()
+    else:
+        response_text = synthetic_digest(spec["items"])
+
+    fake_genai = FakeGenaiClient(
+        response_text,
+        latency=spec["gemini_latency"],
+        log_bytes=spec["log_kb"] * 1024,
+    )
+
+    class BenchClients(SharedClients):
+        @property
+        def genai(self):
+            return fake_genai
+
+    task_options = {"stream": spec["stream"]}
+    if spec.get("batch"):
+        task_options["batcher"] = GeminiBatcher(
+            fake_genai, collect_window=0.2, poll_interval=spec["gemini_latency"] or 0.1
+        )
+
+    recorder = MetricsRecorder(enabled=False)
+    capture = TaskLogCapture()
+    capture.setFormatter(logging.Formatter("%(asctime)s - %(name)s - %(levelname)s - %(message)s"))
+    root = logging.getLogger()
+    root.handlers[:] = [capture]
+    root.setLevel(logging.INFO)
+
+    baseline_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    with MockNotionServer(spec["notion_latency"]) as notion, MockChatServer(spec["chat_latency"]) as chat:
+        os.environ.update(
+            NOTION_API_KEY="bench-token",
+            NOTION_PAGE_ID="bench-parent",
+            NOTION_BASE_URL=notion.url,
+            GOOGLE_CHAT_WEBHOOK_URL=f"{chat.url}/v1/spaces/bench/messages",
+            # The mock webhook does not throttle, so posts are not paced
+            RESEARCH_CHAT_MIN_INTERVAL="0",
+        )
+        start = time.perf_counter()
+        results = asyncio.run(
+            run_tasks(
+                {f"bench_{i}": GarmentResearchTask for i in range(spec["tasks"])},
+                BenchClients(),
+                capture,
+                workers=spec["workers"],
+                task_options=task_options,
+                recorder=recorder,
+            )
+        )
+        wall = time.perf_counter() - start
+
+    def stage_seconds(*stages):
+        # Mean time per task spent in the given stages
+        total = sum(span.seconds for span in recorder.spans if span.stage in stages)
+        return total / len(results)
+
+    return {
+        "wall_s": wall,
+        "task_s": statistics.mean(r.seconds for r in results),
+        "gemini_s": stage_seconds("gemini_call", "gemini_stream"),
+        "validate_s": stage_seconds("json_validation"),
+        "filter_s": stage_seconds("filter_items"),
+        "blocks_s": stage_seconds("notion_blocks"),
+        "notion_s": stage_seconds("notion_upload"),
+        "chat_s": stage_seconds("chat_post"),
+        "failed": sum(not r.ok for r in results),
+        "items": sum(r.items for r in results),
+        "notion_requests": notion.requests,
+        "notion_blocks": notion.blocks_created,
+        "notion_mb_sent": notion.bytes_received / 1e6,
+        "chat_messages": chat.messages,
+        # ru_maxrss is in KiB on Linux
+        "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        "rss_growth_mb": (resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - baseline_rss) / 1024,
+    }
+
+
+def run_isolated(spec: dict) -> dict:
+    """Runs a scenario in a fresh interpreter so peak RSS is not shared between scenarios."""
+    result = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), "--run-one", json.dumps(spec)],
+        capture_output=True,
+        text=True,
+        cwd=REPO_ROOT,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"Scenario {spec['name']} failed:\n{result.stderr}")
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def summarize(runs: list[dict]) -> dict:
+    """Median of every numeric measurement across repeats."""
+    return {key: statistics.median(run[key] for run in runs) for key in runs[0]}
+
+
+def format_table(rows: list[tuple[str, dict]]) -> str:
+    columns = [
+        ("wall_s", "Wall s", ".2f"),
+        ("gemini_s", "Gemini s", ".2f"),
+        ("validate_s", "Validate s", ".3f"),
+        ("filter_s", "Filter s", ".3f"),
+        ("blocks_s", "Blocks s", ".3f"),
+        ("notion_s", "Upload s", ".2f"),
+        ("chat_s", "Chat s", ".2f"),
+        ("notion_requests", "Reqs", ".0f"),
+        ("notion_mb_sent", "MB sent", ".2f"),
+        ("peak_rss_mb", "Peak RSS MB", ".1f"),
+        ("failed", "Failed", ".0f"),
+    ]
+    name_width = max([len("Scenario")] + [len(name) for name, _ in rows])
+    header = f"{'Scenario':<{name_width}}" + "".join(f"  {title:>11}" for _, title, _ in columns)
+    lines = [header, "-" * len(header)]
+    for name, stats in rows:
+        lines.append(
+            f"{name:<{name_width}}" + "".join(f"  {stats[key]:>11{fmt}}" for key, _, fmt in columns)
+        )
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="End-to-end benchmark against local mock services.")
+    parser.add_argument("--scenario", action="append", choices=sorted(SCENARIOS), help="Scenario(s) to run (default: all)")
+    parser.add_argument("--items", type=int, help="Run a custom scenario with this many items per digest")
+    parser.add_argument("--log-kb", type=int, default=10, help="KB of logs per task in a custom scenario")
+    parser.add_argument("--tasks", type=int, default=1, help="Number of tasks in a custom scenario")
+    parser.add_argument("--recorded", metavar="PATH", help="Serve this recorded digest JSON instead of synthetic items")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--stream", action="store_true", help="Use streaming mode")
+    parser.add_argument("--batch", action="store_true", help="Use Batch API mode against the fake batch endpoint")
+    parser.add_argument("--gemini-latency", type=float, default=0.5, help="Fake Gemini latency in seconds")
+    parser.add_argument("--notion-latency", type=float, default=0.05, help="Mock Notion latency per request")
+    parser.add_argument("--chat-latency", type=float, default=0.05, help="Mock webhook latency per request")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per scenario; the median is reported")
+    parser.add_argument("--json", metavar="PATH", help="Also write the results as JSON")
+    parser.add_argument("--run-one", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run_one:
+        print(json.dumps(run_scenario(json.loads(args.run_one))))
+        return
+
+    if args.items is not None:
+        scenarios = {"custom": (args.items, args.log_kb, args.tasks)}
+    else:
+        scenarios = {name: SCENARIOS[name] for name in (args.scenario or SCENARIOS)}
+
+    rows = []
+    for name, (items, log_kb, tasks) in scenarios.items():
+        spec = {
+            "name": name,
+            "items": items,
+            "log_kb": log_kb,
+            "tasks": tasks,
+            "workers": args.workers,
+            "stream": args.stream,
+            "batch": args.batch,
+            "recorded": os.path.abspath(args.recorded) if args.recorded else None,
+            "gemini_latency": args.gemini_latency,
+            "notion_latency": args.notion_latency,
+            "chat_latency": args.chat_latency,
+        }
+        stats = summarize([run_isolated(spec) for _ in range(args.repeat)])
+        rows.append((name, stats))
+        print(f"{name}: {stats['wall_s']:.2f}s wall, {stats['peak_rss_mb']:.1f} MB peak RSS", file=sys.stderr)
+
+    print(format_table(rows))
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({name: stats for name, stats in rows}, f, indent=2)
+
+    if any(stats["failed"] for _, stats in rows):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
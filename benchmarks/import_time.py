@@ -0,0 +1,91 @@
+"""Import-time benchmark for the agent's entry point.
+
+Runs ``python -X importtime -c "import <module>"`` in fresh interpreters,
+reports the median cumulative import time and the heaviest imported modules,
+and exits with status 1 when the median exceeds the budget.
+
+Usage:
+    python benchmarks/import_time.py
+    python benchmarks/import_time.py --module auto_research_agent.main --budget-ms 50 --runs 7
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Median cumulative import time allowed per module, in milliseconds
+BUDGETS_MS = {
+    "auto_research_agent.main": 50.0,
+}
+
+
+def measure(module: str) -> dict[str, int]:
+    """Returns the cumulative import time (us) of the module and everything it imported."""
+    env = dict(os.environ, PYTHONPATH=REPO_ROOT)
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        env=env,
+        check=True,
+    )
+
+    entries = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative_us, raw_name = line[len("import time:"):].split("|")
+        name = raw_name.strip()
+        entries.append((len(raw_name) - len(raw_name.lstrip()), name, int(cumulative_us)))
+
+    # -X importtime prints children before their parent, indented one level deeper;
+    # walk back from the target to collect only its own import subtree
+    target = max(i for i, entry in enumerate(entries) if entry[1] == module)
+    depth = entries[target][0]
+    timings = {module: entries[target][2]}
+    for indent, name, cumulative_us in reversed(entries[:target]):
+        if indent <= depth:
+            break
+        timings[name] = cumulative_us
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure and enforce the import-time budget.")
+    parser.add_argument("--module", default="auto_research_agent.main")
+    parser.add_argument("--budget-ms", type=float, default=None)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=10)
+    args = parser.parse_args()
+
+    budget_ms = args.budget_ms or BUDGETS_MS.get(args.module)
+    runs = [measure(args.module) for _ in range(args.runs)]
+    totals_ms = [run[args.module] / 1000 for run in runs]
+    median_ms = statistics.median(totals_ms)
+
+    print(f"{args.module}: median {median_ms:.1f} ms over {args.runs} runs "
+          f"(min {min(totals_ms):.1f}, max {max(totals_ms):.1f})")
+
+    last = runs[-1]
+    heaviest = sorted(
+        ((name, us) for name, us in last.items() if name.split(".")[0] != args.module.split(".")[0]),
+        key=lambda entry: entry[1],
+        reverse=True,
+    )[: args.top]
+    print("Heaviest dependencies (cumulative, last run):")
+    for name, us in heaviest:
+        print(f"  {us / 1000:8.1f} ms  {name}")
+
+    if budget_ms is not None:
+        if median_ms > budget_ms:
+            print(f"FAIL: {median_ms:.1f} ms exceeds the {budget_ms:.1f} ms budget")
+            sys.exit(1)
+        print(f"OK: within the {budget_ms:.1f} ms budget")
+
+
+if __name__ == "__main__":
+    main()
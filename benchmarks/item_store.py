@@ -0,0 +1,140 @@
+"""Benchmark for the columnar ItemStore against pydantic ResearchItem models.
+
+Validates a synthetic digest of --items items from JSON, measures the memory
+held by the WeeklyResearchDigest model, converts it to a CompactDigest and
+measures that, then times a full read of every field and the Notion and Chat
+renderers over both representations.
+
+Usage:
+    python benchmarks/item_store.py
+    python benchmarks/item_store.py --items 50000 --runs 5
+"""
+
+import argparse
+import gc
+import json
+import os
+import statistics
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from auto_research_agent.src.item_store import CompactDigest  # noqa: E402
+from auto_research_agent.src.schemas import WeeklyResearchDigest  # noqa: E402
+
+DOMAINS = [
+    "Physics-Based Modeling",
+    "Collision Handling",
+    "AI & Data-Driven Methods",
+    "Material Realism",
+]
+
+
+def digest_json(n_items: int) -> str:
+    """Merged-digest JSON: distinct items, a few domains, some links and dates repeated across weeks."""
+    items = [
+        {
+            "title": f"Item {i}: Position-Based Cloth Solver Variant",
+            "source_link": f"https://arxiv.org/abs/2601.{i % (n_items // 2 or 1):05d}",
+            "publication_date": f"2025-{1 + i % 12:02d}-{1 + i % 28:02d}",
+            "primary_domain": DOMAINS[i % len(DOMAINS)],
+            "relevance_explanation": f"Introduces a faster constraint projection for thin shells ({i}).",
+            "key_innovation": f"A stable solver that halves iteration counts on dense meshes ({i}).",
+            "summary": f"A synthetic research item used to exercise the item store ({i}).",
+        }
+        for i in range(n_items)
+    ]
+    return json.dumps({"topic": "Bench", "report_date": "2025-10-17", "items": items})
+
+
+def retained_bytes(build) -> tuple[int, object]:
+    """Returns the bytes still allocated by build() once it has returned, and its result."""
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    result = build()
+    gc.collect()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return after - before, result
+
+
+def median_ms(fn, runs: int) -> float:
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings) * 1000
+
+
+def read_all(digest):
+    total = 0
+    for item in digest.items:
+        total += len(item.title) + len(item.source_link) + len(item.publication_date)
+        total += len(item.primary_domain) + len(item.summary)
+        total += len(item.relevance_explanation) + len(item.key_innovation)
+    return total
+
+
+def read_columns(digest):
+    store = digest.items
+    total = sum(map(len, store.column("primary_domain")))
+    for name in ("title", "source_link", "publication_date", "summary", "relevance_explanation", "key_innovation"):
+        total += sum(map(len, store.column(name)))
+    return total
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the compact item store.")
+    parser.add_argument("--items", type=int, default=20000)
+    parser.add_argument("--runs", type=int, default=10)
+    args = parser.parse_args()
+
+    text = digest_json(args.items)
+    # json.loads creates fresh strings on every call, unlike the string cache of
+    # model_validate_json, so both measurements include the item text
+    model_bytes, model = retained_bytes(lambda: WeeklyResearchDigest.model_validate(json.loads(text)))
+    text_bytes = sum(
+        sys.getsizeof(value)
+        for item in model.items
+        for value in (
+            item.title,
+            item.source_link,
+            item.publication_date,
+            item.relevance_explanation,
+            item.key_innovation,
+            item.summary,
+        )
+    )
+    # Validated once, converted, and the model dropped: what the pipeline keeps around
+    compact_bytes, compact = retained_bytes(
+        lambda: CompactDigest.from_model(WeeklyResearchDigest.model_validate(json.loads(text)))
+    )
+
+    if not read_all(model) == read_all(compact) == read_columns(compact):
+        print("MISMATCH: the store does not read back the validated items")
+        sys.exit(1)
+
+    from auto_research_agent.src.chat_utils import build_chat_message
+    from auto_research_agent.src.notion_utils import build_page_blocks
+
+    n = args.items
+    print(f"{n} items, {len(compact.items.links.values)} distinct links, "
+          f"{len(compact.items.dates.values)} distinct dates")
+    print(f"  memory, pydantic digest : {model_bytes / 2**20:8.2f} MB ({model_bytes / n:6.0f} B/item)")
+    print(f"  memory, CompactDigest   : {compact_bytes / 2**20:8.2f} MB ({compact_bytes / n:6.0f} B/item)")
+    # Repeated links and dates are counted per item here; the store keeps them once
+    print(f"  item text, undeduped    : {text_bytes / 2**20:8.2f} MB ({text_bytes / n:6.0f} B/item)")
+    print(f"  read every field        : {median_ms(lambda: read_all(model), args.runs):8.2f} ms (pydantic)")
+    print(f"                            {median_ms(lambda: read_all(compact), args.runs):8.2f} ms (store rows)")
+    print(f"                            {median_ms(lambda: read_columns(compact), args.runs):8.2f} ms (store columns)")
+    print(f"  Notion page blocks      : {median_ms(lambda: build_page_blocks(model), args.runs):8.2f} ms (pydantic)")
+    print(f"                            {median_ms(lambda: build_page_blocks(compact), args.runs):8.2f} ms (store columns)")
+    print(f"  Chat message            : {median_ms(lambda: build_chat_message(compact), args.runs):8.2f} ms (store columns)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+"""Benchmark for link verification against a local metadata server.
+
+Builds a digest of --items items linking to arXiv papers, GitHub repositories,
+DOIs and plain pages, served by MockMetadataServer. Some links are dead, some
+works were published outside the window, and some have a wrong date that the
+metadata corrects. The digest is verified three times: with an empty cache,
+with a cache that must be revalidated (ETag / Last-Modified, answered with
+304s), and with a fresh cache. Each pass reports its time, requests, 304s and
+peak concurrency. The kept items must match the expected ones; the script
+exits with status 1 if they do not.
+
+Usage:
+    python benchmarks/link_verify.py
+    python benchmarks/link_verify.py --items 400 --latency 0.02 --per-host 8
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from mock_services import MockMetadataServer  # noqa: E402
+
+from auto_research_agent.src.dates import DateFilter  # noqa: E402
+from auto_research_agent.src.item_store import CompactDigest, ItemRow, ItemStore  # noqa: E402
+
+NOW = datetime(2026, 1, 5)
+
+
+def day(days_ago: int) -> str:
+    return (NOW - timedelta(days=days_ago)).strftime("%Y-%m-%d")
+
+
+def build_fixture(n: int, base_url: str):
+    """Returns the server tables, the digest rows and the links expected to survive."""
+    arxiv, github, crossref, pages = {}, {}, {}, {}
+    rows, expected = [], {}
+    for i in range(n):
+        kind, case = i % 4, (i // 4) % 5
+        # case 0-1: fine, 2: dead, 3: published long ago, 4: wrong date
+        real = day(200) if case == 3 else day(3)
+        claimed = day(10) if case == 4 else real if case != 3 else day(5)
+        if kind == 0:
+            link = f"https://arxiv.org/abs/2601.{i:05d}v2"
+            if case != 2:
+                arxiv[f"2601.{i:05d}"] = real
+        elif kind == 1:
+            link = f"https://github.com/lab{i}/method{i}"
+            if case != 2:
+                github[f"lab{i}/method{i}"] = real
+        elif kind == 2:
+            doi = f"10.1145/{3700000 + i}"
+            link = f"https://doi.org/{doi}"
+            # Unknown DOIs would fall back to the real doi.org, so every DOI exists here
+            crossref[doi] = [int(part) for part in real.split("-")]
+            if case == 2:
+                claimed = real
+        else:
+            link = f"{base_url}/pages/project{i}"
+            pages[f"/pages/project{i}"] = 404 if case == 2 else (405 if i % 8 == 3 else 200)
+            # Plain pages carry no date, so the claimed one stands
+            real = claimed
+        rows.append(ItemRow(f"Work {i}", link, claimed, "Other", "", "", ""))
+        alive = not (case == 2 and kind != 2)
+        if alive and real >= day(30):
+            expected[link] = real
+    return (arxiv, github, crossref, pages), rows, expected
+
+
+async def verify(rows, cache_path: str, max_age: float, per_host: int):
+    import httpx
+
+    from auto_research_agent.src.link_verifier import LinkCheckCache, LinkVerifier
+
+    async with httpx.AsyncClient(limits=httpx.Limits(max_connections=20)) as http:
+        verifier = LinkVerifier(http, LinkCheckCache(cache_path, max_age=max_age), per_host=per_host)
+        digest = CompactDigest("Bench", day(0), ItemStore.from_items(rows))
+        start = time.perf_counter()
+        digest = await verifier.verify_digest(digest, DateFilter(30, now=NOW))
+        return digest, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark link verification against a local server.")
+    parser.add_argument("--items", type=int, default=200)
+    parser.add_argument("--latency", type=float, default=0.05, help="Server latency per request in seconds")
+    parser.add_argument("--per-host", type=int, default=4)
+    args = parser.parse_args()
+
+    with MockMetadataServer(latency=args.latency) as server, tempfile.TemporaryDirectory() as directory:
+        os.environ.update(server.api_env())
+        tables, rows, expected = build_fixture(args.items, server.url)
+        server.arxiv, server.github, server.crossref, server.pages = tables
+        cache_path = os.path.join(directory, "link_checks.json")
+
+        print(f"{len(rows)} items, {len(expected)} expected to survive, "
+              f"{args.latency * 1000:.0f} ms per request, {args.per_host} per host")
+        print(f"  {'pass':<12}  {'seconds':>7}  {'requests':>8}  {'304s':>5}  {'max in flight':>13}  {'kept':>5}  result")
+        mismatches = 0
+        for label, max_age in (("cold", 0), ("revalidate", 0), ("fresh", 3600)):
+            requests, not_modified = server.requests, server.not_modified
+            server.max_in_flight = 0
+            digest, seconds = asyncio.run(verify(rows, cache_path, max_age, args.per_host))
+            kept = dict(zip(digest.items.column("source_link"), digest.items.column("publication_date")))
+            result = "ok" if kept == expected else f"MISMATCH ({len(set(kept) ^ set(expected))} links differ)"
+            mismatches += kept != expected
+            print(f"  {label:<12}  {seconds:>7.3f}  {server.requests - requests:>8}  "
+                  f"{server.not_modified - not_modified:>5}  {server.max_in_flight:>13}  {len(kept):>5}  {result}")
+    if mismatches:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,445 @@
+"""Local stand-ins for Gemini, Notion and the Google Chat webhook.
+
+FakeGenaiClient mimics the parts of google.genai.Client the tasks use
+(models.generate_content, models.generate_content_stream,
+aio.models.generate_content and the aio.batches job endpoints) and returns
+recorded or synthetic digest JSON after a configurable latency. MockNotionServer and MockChatServer are small
+threaded HTTP servers implementing the Notion pages/blocks endpoints and a
+webhook; point the agent at them with NOTION_BASE_URL and
+GOOGLE_CHAT_WEBHOOK_URL. MockMetadataServer serves arXiv, GitHub and
+Crossref metadata plus plain pages for link verification (see its api_env()).
+"""
+
+import asyncio
+import json
+import logging
+import threading
+import time
+import uuid
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, unquote, urlsplit
+from types import SimpleNamespace
+
+logger = logging.getLogger("benchmarks.fake_genai")
+
+# Notion rejects requests with more than 100 children per parent
+MAX_CHILDREN = 100
+# Google Chat rejects message texts longer than this
+MAX_CHAT_CHARS = 4096
+
+
+def synthetic_digest(n_items: int, topic: str = "Benchmark Digest", today=None) -> str:
+    """Returns digest JSON with n_items distinct, recently published items."""
+    today = (today or datetime.now()).strftime("%Y-%m-%d")
+    items = [
+        {
+            "title": f"Synthetic Item {i}: Position-Based Cloth Solver Variant",
+            "source_link": f"https://arxiv.org/abs/2601.{i:05d}",
+            "publication_date": today,
+            "primary_domain": "Physics-Based Modeling",
+            "relevance_explanation": "Introduces a faster constraint projection for thin shells. " * 2,
+            "key_innovation": "A stable solver that halves iteration counts on dense meshes.",
+            "summary": "A synthetic research item used to exercise the publishing pipeline. " * 4,
+        }
+        for i in range(n_items)
+    ]
+    return json.dumps({"topic": topic, "report_date": today, "items": items})
+
+
+class FakeGenaiClient:
+    """Returns a fixed digest response after `latency` seconds.
+
+    log_bytes of filler log records are emitted per call, from inside the
+    calling task's context, to simulate verbose runs.
+    """
+
+    def __init__(
+        self,
+        response_text: str,
+        latency: float = 0.0,
+        log_bytes: int = 0,
+        stream_chunk_size: int = 512,
+        batch_polls: int = 2,
+    ):
+        self.response_text = response_text
+        self.latency = latency
+        self.log_bytes = log_bytes
+        self.stream_chunk_size = stream_chunk_size
+        self.calls = 0
+        self.models = SimpleNamespace(
+            generate_content=self._generate_content,
+            generate_content_stream=self._generate_content_stream,
+        )
+        self.batches = FakeBatches(self, polls_until_done=batch_polls)
+        self.aio = SimpleNamespace(
+            models=SimpleNamespace(generate_content=self._agenerate_content),
+            batches=self.batches,
+        )
+
+    def _response(self):
+        self.calls += 1
+        self._emit_logs()
+        usage = SimpleNamespace(
+            prompt_token_count=2000,
+            candidates_token_count=len(self.response_text) // 4,
+            thoughts_token_count=0,
+            tool_use_prompt_token_count=0,
+            cached_content_token_count=0,
+            total_token_count=2000 + len(self.response_text) // 4,
+        )
+        return SimpleNamespace(text=self.response_text, usage_metadata=usage)
+
+    def _emit_logs(self):
+        line = "x" * 200
+        for _ in range(self.log_bytes // 256):
+            logger.info(line)
+
+    def _generate_content(self, model, contents, config=None):
+        time.sleep(self.latency)
+        return self._response()
+
+    async def _agenerate_content(self, model, contents, config=None):
+        await asyncio.sleep(self.latency)
+        return self._response()
+
+    def _generate_content_stream(self, model, contents, config=None):
+        response = self._response()
+        text = response.text
+        step = self.stream_chunk_size
+        delay = self.latency / max(1, len(text) // step)
+        for i in range(0, len(text), step):
+            time.sleep(delay)
+            yield SimpleNamespace(text=text[i : i + step], usage_metadata=None)
+        yield SimpleNamespace(text="", usage_metadata=response.usage_metadata)
+
+    def close(self):
+        pass
+
+
+class FakeBatches:
+    """Batch API stand-in: a job reports RUNNING for polls_until_done status checks, then SUCCEEDED."""
+
+    def __init__(self, genai_client: FakeGenaiClient, polls_until_done: int = 2):
+        self.genai_client = genai_client
+        self.polls_until_done = polls_until_done
+        self.jobs = {}
+        self.requests = 0
+
+    async def create(self, model, src, config=None):
+        name = f"batches/{uuid.uuid4().hex[:12]}"
+        self.requests += len(src)
+        self.jobs[name] = {"model": model, "requests": len(src), "polls": 0}
+        return SimpleNamespace(name=name, state="JOB_STATE_PENDING", error=None, dest=None)
+
+    async def get(self, name, config=None):
+        job = self.jobs[name]
+        job["polls"] += 1
+        if job["polls"] < self.polls_until_done:
+            return SimpleNamespace(name=name, state="JOB_STATE_RUNNING", error=None, dest=None)
+
+        responses = [
+            SimpleNamespace(response=self.genai_client._response(), error=None, metadata=None)
+            for _ in range(job["requests"])
+        ]
+        return SimpleNamespace(
+            name=name,
+            state="JOB_STATE_SUCCEEDED",
+            error=None,
+            dest=SimpleNamespace(inlined_responses=responses),
+        )
+
+
+class _MockServer:
+    """Runs a ThreadingHTTPServer on a free local port in a background thread."""
+
+    handler_class = BaseHTTPRequestHandler
+
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency
+        self.requests = 0
+        self.bytes_received = 0
+        self.lock = threading.Lock()
+        handler = type("Handler", (self.handler_class,), {"service": self})
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+        self.httpd.daemon_threads = True
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    @property
+    def url(self) -> str:
+        host, port = self.httpd.server_address
+        return f"http://{host}:{port}"
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+class _JsonHandler(BaseHTTPRequestHandler):
+    service = None
+
+    def log_message(self, format, *args):
+        pass
+
+    def _read_json(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        body = self.rfile.read(length) if length else b""
+        with self.service.lock:
+            self.service.requests += 1
+            self.service.bytes_received += len(body)
+        time.sleep(self.service.latency)
+        return json.loads(body) if body else {}
+
+    def _reply(self, status: int, payload: dict):
+        data = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+
+class _NotionHandler(_JsonHandler):
+    def _path_parts(self):
+        return self.path.split("?", 1)[0].strip("/").split("/")
+
+    def do_POST(self):
+        body = self._read_json()
+        if self._path_parts() != ["v1", "pages"]:
+            return self._reply(404, {"object": "error", "status": 404, "code": "object_not_found", "message": self.path})
+        children = body.get("children", [])
+        if len(children) > MAX_CHILDREN:
+            return self._validation_error(len(children))
+        page_id = str(uuid.uuid4())
+        self.service.add_children(page_id, children)
+        self._reply(200, {"object": "page", "id": page_id})
+
+    def do_PATCH(self):
+        body = self._read_json()
+        parts = self._path_parts()
+        if len(parts) == 3 and parts[:2] == ["v1", "blocks"]:
+            if not self.service.update_block(parts[2]):
+                return self._reply(404, {"object": "error", "status": 404, "code": "object_not_found", "message": self.path})
+            return self._reply(200, {"object": "block", "id": parts[2]})
+        if len(parts) != 4 or parts[:2] != ["v1", "blocks"] or parts[3] != "children":
+            return self._reply(404, {"object": "error", "status": 404, "code": "object_not_found", "message": self.path})
+        if self.service.should_throttle():
+            status = self.service.error_status
+            code, message = ("rate_limited", "Rate limited") if status == 429 else ("internal_server_error", "Server error")
+            return self._reply(status, {"object": "error", "status": status, "code": code, "message": message})
+        children = body.get("children", [])
+        if len(children) > MAX_CHILDREN:
+            return self._validation_error(len(children))
+        created = self.service.add_children(parts[2], children, after=body.get("after"))
+        self._reply(200, {"object": "list", "results": created, "has_more": False, "next_cursor": None})
+
+    def do_GET(self):
+        self._read_json()
+        parts = self._path_parts()
+        if len(parts) != 4 or parts[:2] != ["v1", "blocks"] or parts[3] != "children":
+            return self._reply(404, {"object": "error", "status": 404, "code": "object_not_found", "message": self.path})
+        results = [{"object": "block", "id": block_id} for block_id in self.service.children.get(parts[2], [])]
+        self._reply(200, {"object": "list", "results": results[:MAX_CHILDREN], "has_more": False, "next_cursor": None})
+
+    def _validation_error(self, count):
+        self._reply(400, {
+            "object": "error",
+            "status": 400,
+            "code": "validation_error",
+            "message": f"body.children.length should be ≤ {MAX_CHILDREN}, instead was {count}.",
+        })
+
+
+class MockNotionServer(_MockServer):
+    """Implements pages.create, blocks.update and blocks.children.append/list.
+
+    Only block IDs are kept, never block content, so large uploads do not
+    inflate the benchmark's memory. throttle_every > 0 answers every Nth
+    append with a 429, or with error_status if given (e.g. 502).
+    """
+
+    handler_class = _NotionHandler
+
+    def __init__(self, latency: float = 0.0, throttle_every: int = 0, error_status: int = 429):
+        super().__init__(latency)
+        self.throttle_every = throttle_every
+        self.error_status = error_status
+        self.appends = 0
+        self.blocks_created = 0
+        self.blocks_updated = 0
+        self.children = {}
+        self.block_ids = set()
+
+    def should_throttle(self) -> bool:
+        with self.lock:
+            self.appends += 1
+            return self.throttle_every > 0 and self.appends % self.throttle_every == 0
+
+    def add_children(self, parent_id: str, children: list, after=None) -> list:
+        created = [{"object": "block", "id": str(uuid.uuid4())} for _ in children]
+        with self.lock:
+            siblings = self.children.setdefault(parent_id, [])
+            position = siblings.index(after) + 1 if after in siblings else len(siblings)
+            siblings[position:position] = [block["id"] for block in created]
+            self.block_ids.update(block["id"] for block in created)
+            self.blocks_created += len(created)
+        return created
+
+    def update_block(self, block_id: str) -> bool:
+        with self.lock:
+            if block_id not in self.block_ids:
+                return False
+            self.blocks_updated += 1
+            return True
+
+
+class _ChatHandler(_JsonHandler):
+    def do_POST(self):
+        body = self._read_json()
+        text = body.get("text", "")
+        space = self.path.split("?")[0]
+        if len(text) > MAX_CHAT_CHARS:
+            return self._reply(400, {"error": {"code": 400, "message": "Message text is too long."}})
+        if not self.service.accept(space, len(text)):
+            return self._reply(429, {"error": {"code": 429, "message": "Resource has been exhausted."}})
+        self._reply(200, {"name": f"spaces/bench/messages/{uuid.uuid4()}"})
+
+
+class MockChatServer(_MockServer):
+    """Accepts webhook posts on any path and counts messages per path (space).
+
+    Messages longer than Google Chat's limit get a 400. With min_interval > 0,
+    a post arriving sooner than that after the previous accepted post to the
+    same space gets a 429.
+    """
+
+    handler_class = _ChatHandler
+
+    def __init__(self, latency: float = 0.0, min_interval: float = 0.0):
+        super().__init__(latency)
+        self.min_interval = min_interval
+        self.messages = 0
+        self.characters = 0
+        self.throttled = 0
+        self.per_space = {}
+        self._last_post = {}
+
+    def accept(self, space: str, characters: int) -> bool:
+        with self.lock:
+            now = time.monotonic()
+            if now - self._last_post.get(space, float("-inf")) < self.min_interval:
+                self.throttled += 1
+                return False
+            self._last_post[space] = now
+            self.messages += 1
+            self.characters += characters
+            self.per_space[space] = self.per_space.get(space, 0) + 1
+            return True
+
+
+class _MetadataHandler(BaseHTTPRequestHandler):
+    service = None
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, status: int, body: bytes = b"", content_type="application/json", etag=None):
+        self.send_response(status)
+        if etag:
+            self.send_header("ETag", etag)
+            self.send_header("Last-Modified", "Mon, 05 Jan 2026 00:00:00 GMT")
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if self.command != "HEAD":
+            self.wfile.write(body)
+
+    def _json(self, payload, etag):
+        if self.headers.get("If-None-Match") == etag:
+            with self.service.lock:
+                self.service.not_modified += 1
+            return self._send(304, etag=etag)
+        self._send(200, json.dumps(payload).encode(), etag=etag)
+
+    def _arxiv(self, query):
+        ids = (parse_qs(query).get("id_list") or [""])[0].split(",")
+        entries = "".join(
+            f"<entry><id>http://arxiv.org/abs/{i}v1</id><published>{self.service.arxiv[i]}T17:00:00Z</published>"
+            f"<title>Paper {i}</title></entry>"
+            for i in ids
+            if i in self.service.arxiv
+        )
+        feed = f'<?xml version="1.0"?><feed xmlns="http://www.w3.org/2005/Atom">{entries}</feed>'
+        self._send(200, feed.encode(), content_type="application/atom+xml")
+
+    def _handle(self):
+        parts = urlsplit(self.path)
+        path = unquote(parts.path)
+        with self.service.lock:
+            self.service.requests += 1
+            self.service.in_flight += 1
+            self.service.max_in_flight = max(self.service.max_in_flight, self.service.in_flight)
+        try:
+            time.sleep(self.service.latency)
+            if path == "/arxiv/api/query":
+                return self._arxiv(parts.query)
+            if path.startswith("/github/repos/"):
+                created_at = self.service.github.get(path.removeprefix("/github/repos/"))
+                if created_at is None:
+                    return self._send(404, b'{"message": "Not Found"}')
+                return self._json({"created_at": f"{created_at}T09:00:00Z"}, etag=f'"gh-{created_at}"')
+            if path.startswith("/crossref/works/"):
+                date_parts = self.service.crossref.get(path.removeprefix("/crossref/works/"))
+                if date_parts is None:
+                    return self._send(404, b"Resource not found.", content_type="text/plain")
+                message = {"published": {"date-parts": [date_parts]}}
+                return self._json({"status": "ok", "message": message}, etag=f'"cr-{date_parts}"')
+            status = self.service.pages.get(path, 404)
+            if status == 405 and self.command == "GET":
+                status = 200
+            if status == 200 and self.headers.get("If-Modified-Since"):
+                with self.service.lock:
+                    self.service.not_modified += 1
+                return self._send(304, etag='"page"')
+            self._send(status, b"<html></html>", content_type="text/html", etag='"page"' if status == 200 else None)
+        finally:
+            with self.service.lock:
+                self.service.in_flight -= 1
+
+    do_GET = _handle
+    do_HEAD = _handle
+
+
+class MockMetadataServer(_MockServer):
+    """Serves the metadata APIs used by link verification, and plain pages.
+
+    arxiv maps IDs to publication dates, github maps "owner/repo" to creation
+    dates and crossref maps DOIs to date-parts lists; unknown entries are 404.
+    pages maps paths to the status their HEAD request gets; 405 pages answer
+    GET with 200. JSON responses carry an ETag and pages a Last-Modified, and
+    conditional requests for unchanged resources get a 304.
+    """
+
+    handler_class = _MetadataHandler
+
+    def __init__(self, arxiv=None, github=None, crossref=None, pages=None, latency: float = 0.0):
+        super().__init__(latency)
+        self.arxiv = arxiv or {}
+        self.github = github or {}
+        self.crossref = crossref or {}
+        self.pages = pages or {}
+        self.not_modified = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    def api_env(self) -> dict:
+        """Environment variables pointing link verification at this server."""
+        return {
+            "RESEARCH_ARXIV_API_URL": f"{self.url}/arxiv/api/query",
+            "RESEARCH_GITHUB_API_URL": f"{self.url}/github",
+            "RESEARCH_CROSSREF_API_URL": f"{self.url}/crossref",
+        }
@@ -0,0 +1,166 @@
+"""Benchmark for rendering and serializing Notion item blocks.
+
+Renders --items synthetic items into Notion blocks and serializes them as
+append payloads of 100 children, the way they are sent. Two approaches are
+compared: nested dicts per block serialized by json.dumps (the former
+approach, kept here as a reference), and the compiled BlockTemplates of
+notion_blocks.py, whose JSON fragments are joined in one pass. Templates are
+timed with an empty render cache and with a warm one (an item rendered
+again, as on reruns and incremental updates). Reports the median time and
+the memory held by the rendered blocks.
+
+Usage:
+    python benchmarks/notion_blocks.py
+    python benchmarks/notion_blocks.py --items 50000 --runs 3
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from auto_research_agent.src.item_store import ItemRow  # noqa: E402
+from auto_research_agent.src.notion_blocks import render_item, serialize_body  # noqa: E402
+from auto_research_agent.src.notion_writer import chunk_blocks  # noqa: E402
+
+# What httpx does with json= bodies
+_dumps = json.JSONEncoder(ensure_ascii=False, separators=(",", ":"), allow_nan=False).encode
+
+
+def dict_item_blocks(index: int, item: ItemRow) -> list:
+    """Reference: the nested dict literals built per item before templates."""
+    return [
+        {
+            "object": "block",
+            "type": "heading_2",
+            "heading_2": {
+                "rich_text": [
+                    {"type": "text", "text": {"content": f"{index}. "}},
+                    {"type": "text", "text": {"content": item.title, "link": {"url": item.source_link}}},
+                ]
+            },
+        },
+        {
+            "object": "block",
+            "type": "callout",
+            "callout": {
+                "rich_text": [{"type": "text", "text": {"content": f"Domain: {item.primary_domain}"}}],
+                "icon": {"emoji": "🏷️"},
+            },
+        },
+        {
+            "object": "block",
+            "type": "paragraph",
+            "paragraph": {
+                "rich_text": [
+                    {"type": "text", "text": {"content": "Relevance: "}, "annotations": {"bold": True}},
+                    {"type": "text", "text": {"content": item.relevance_explanation}},
+                ]
+            },
+        },
+        {
+            "object": "block",
+            "type": "paragraph",
+            "paragraph": {
+                "rich_text": [
+                    {"type": "text", "text": {"content": "Key Innovation: "}, "annotations": {"bold": True}},
+                    {"type": "text", "text": {"content": item.key_innovation}},
+                ]
+            },
+        },
+        {"object": "block", "type": "quote", "quote": {"rich_text": [{"type": "text", "text": {"content": item.summary}}]}},
+        {"object": "block", "type": "divider", "divider": {}},
+    ]
+
+
+def template_item_blocks(index: int, item: ItemRow):
+    return render_item(
+        index, item.title, item.source_link, item.primary_domain,
+        item.relevance_explanation, item.key_innovation, item.summary,
+    )
+
+
+def make_items(n: int) -> list[ItemRow]:
+    return [
+        ItemRow(
+            f"Item {i}: Différentiable Cloth Simulation with \"Learned\" Contact",
+            f"https://arxiv.org/abs/2601.{i:05d}",
+            "2026-01-05",
+            "Physics-Based Modeling",
+            "Introduces a faster constraint projection for thin shells. " * 2,
+            "A stable solver that halves iteration counts on dense meshes.",
+            "A synthetic research item used to exercise the Notion renderer. " * 4,
+        )
+        for i in range(n)
+    ]
+
+
+def dict_payloads(items):
+    blocks = [block for i, item in enumerate(items, 1) for block in dict_item_blocks(i, item)]
+    return [_dumps({"children": batch}) for batch in chunk_blocks(blocks)]
+
+
+def template_payloads(items):
+    blocks = [block for i, item in enumerate(items, 1) for block in template_item_blocks(i, item)]
+    return [serialize_body({}, batch) for batch in chunk_blocks(blocks)]
+
+
+def median_ms(fn, runs, before=None):
+    timings = []
+    for _ in range(runs):
+        if before:
+            before()
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings) * 1000
+
+
+def retained_mb(render, items):
+    tracemalloc.start()
+    blocks = [render(i, item) for i, item in enumerate(items, 1)]
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del blocks
+    return size / 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark Notion block rendering and serialization.")
+    parser.add_argument("--items", type=int, default=10_000)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    items = make_items(args.items)
+    # Both approaches must produce the same blocks
+    assert [json.loads(p) for p in template_payloads(items[:50])] == [json.loads(p) for p in dict_payloads(items[:50])]
+
+    print(f"{args.items} items, {args.items * 6} blocks, median of {args.runs} runs")
+    print(f"  {'':<24}  {'render ms':>9}  {'render+serialize ms':>19}  {'blocks MB':>9}")
+    rows = (
+        ("dicts + json.dumps", dict_item_blocks, dict_payloads),
+        ("templates, cold cache", template_item_blocks, template_payloads),
+    )
+    for label, render, payloads in rows:
+        render_ms = median_ms(lambda: [render(i, x) for i, x in enumerate(items, 1)], args.runs, render_item.cache_clear)
+        total_ms = median_ms(lambda: payloads(items), args.runs, render_item.cache_clear)
+        render_item.cache_clear()
+        print(f"  {label:<24}  {render_ms:>9.1f}  {total_ms:>19.1f}  {retained_mb(render, items):>9.1f}")
+
+    # Warm: items rendered before (a rerun or an update), limited by the render cache size
+    cached = items[: render_item.cache_info().maxsize]
+    template_payloads(cached)
+    scale = len(items) / len(cached)
+    render_ms = median_ms(lambda: [template_item_blocks(i, x) for i, x in enumerate(cached, 1)], args.runs) * scale
+    total_ms = median_ms(lambda: template_payloads(cached), args.runs) * scale
+    print(f"  {'templates, warm cache':<24}  {render_ms:>9.1f}  {total_ms:>19.1f}  {'-':>9}"
+          + (f"  ({len(cached)} items, scaled)" if scale != 1 else ""))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+"""Benchmark for the two-tier pipeline against the single-call pipeline.
+
+A fake Gemini client answers according to the requested response schema: full
+digests, candidate lists or item analyses. A --reject share of the items it
+returns is published outside the date window, so local filtering drops them.
+The latency of each response grows with its output tokens (--pro-tps and
+--flash-tps tokens per second, scaled down by --time-scale so a run takes
+seconds). Reports per model the output tokens, estimated cost and time, and
+the number of items that reach the digest.
+
+Usage:
+    python benchmarks/two_tier.py
+    python benchmarks/two_tier.py --reject 0.7 --time-scale 0.005
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import re
+import sys
+import time
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from auto_research_agent.src.metrics import MetricsRecorder, current_recorder  # noqa: E402
+from auto_research_agent.tasks.base import DEFAULT_HARVEST_MODEL, DEFAULT_MODEL  # noqa: E402
+from auto_research_agent.tasks.garment_code_related import GarmentResearchTask  # noqa: E402
+
+LONG_TEXT = (
+    "The method couples a projective dynamics solver with a learned collision prior, which keeps "
+    "layered garments free of interpenetration at interactive rates while preserving fine wrinkles. "
+)
+
+
+class SchemaAwareGenai:
+    """Fake genai client whose answer and latency depend on the response schema."""
+
+    def __init__(self, reject: float, tokens_per_second: dict, time_scale: float, seed: int = 3):
+        self.reject = reject
+        self.tokens_per_second = tokens_per_second
+        self.time_scale = time_scale
+        self.rng = random.Random(seed)
+        self.counter = 0
+        self.aio = SimpleNamespace(models=SimpleNamespace(generate_content=self._generate))
+
+    def _candidate(self):
+        self.counter += 1
+        days_ago = 200 if self.rng.random() < self.reject else self.rng.randint(0, 20)
+        return {
+            "title": f"Work {self.counter}: Layered Garment Simulation with Learned Collision Priors",
+            "source_link": f"https://arxiv.org/abs/2601.{self.counter:05d}",
+            "publication_date": (datetime.now() - timedelta(days=days_ago)).strftime("%Y-%m-%d"),
+            "primary_domain": "Collision Handling",
+        }
+
+    def _analysis(self):
+        return {"relevance_explanation": LONG_TEXT, "key_innovation": LONG_TEXT, "summary": LONG_TEXT * 2}
+
+    def _answer(self, schema_name: str, contents: str) -> str:
+        today = datetime.now().strftime("%Y-%m-%d")
+        if schema_name == "ItemAnalyses":
+            ids = [int(n) for n in re.findall(r"^(\d+)\. \*\*", contents, re.MULTILINE)]
+            return json.dumps({"analyses": [{"id": i, **self._analysis()} for i in ids]})
+        max_items = int(re.findall(r"\*\*(\d+) distinct", contents)[-1])
+        items = [self._candidate() for _ in range(max_items)]
+        if not schema_name.endswith("Candidates"):
+            items = [{**item, **self._analysis()} for item in items]
+        return json.dumps({"topic": "Bench", "report_date": today, "items": items})
+
+    async def _generate(self, model, contents, config=None):
+        text = self._answer(config.response_schema.__name__, contents)
+        output_tokens = len(text) // 4
+        await asyncio.sleep(output_tokens / self.tokens_per_second[model] * self.time_scale)
+        usage = SimpleNamespace(
+            prompt_token_count=len(contents) // 4,
+            candidates_token_count=output_tokens,
+            total_token_count=len(contents) // 4 + output_tokens,
+        )
+        return SimpleNamespace(text=text, usage_metadata=usage)
+
+
+async def run(two_tier: bool, args) -> tuple[MetricsRecorder, int, float]:
+    client = SchemaAwareGenai(
+        args.reject,
+        {DEFAULT_MODEL: args.pro_tps, DEFAULT_HARVEST_MODEL: args.flash_tps},
+        args.time_scale,
+    )
+    recorder = MetricsRecorder(enabled=False)
+    current_recorder.set(recorder)
+    task = GarmentResearchTask(client=client, two_tier=two_tier)
+    start = time.perf_counter()
+    digest = await task.arun()
+    return recorder, len(digest.items), (time.perf_counter() - start) / args.time_scale
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare the single-call and two-tier pipelines.")
+    parser.add_argument("--reject", type=float, default=0.5, help="Share of returned items outside the window")
+    parser.add_argument("--pro-tps", type=float, default=60.0, help="Output tokens per second of the main model")
+    parser.add_argument("--flash-tps", type=float, default=250.0, help="Output tokens per second of the fast model")
+    parser.add_argument("--time-scale", type=float, default=0.01)
+    args = parser.parse_args()
+
+    print(f"{args.reject:.0%} of returned items fall outside the date window")
+    print(f"{'Pipeline':<10}  {'Model':<22}  {'Calls':>5}  {'Out tokens':>10}  {'Cost $':>8}  {'Items':>5}  {'Sim. s':>7}")
+    for label, two_tier in (("single", False), ("two-tier", True)):
+        recorder, items, seconds = asyncio.run(run(two_tier, args))
+        per_model = {}
+        for span in recorder.spans:
+            if span.stage != "gemini_call":
+                continue
+            stats = per_model.setdefault(span.attrs["model"], [0, 0, 0.0])
+            stats[0] += 1
+            stats[1] += span.tokens.get("candidates", 0)
+            stats[2] += span.cost_usd or 0.0
+        for i, (model, (calls, tokens, cost)) in enumerate(sorted(per_model.items(), reverse=True)):
+            tail = f"  {items:>5}  {seconds:>7.1f}" if i == 0 else ""
+            print(f"{label if i == 0 else '':<10}  {model:<22}  {calls:>5}  {tokens:>10}  {cost:>8.4f}{tail}")
+
+
+if __name__ == "__main__":
+    main()
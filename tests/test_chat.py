@@ -0,0 +1,112 @@
+import asyncio
+import time
+
+import httpx
+import pytest
+from mock_services import MockChatServer
+
+from auto_research_agent.src.chat_utils import (
+    SpaceRateLimiter,
+    build_chat_message,
+    build_chat_messages,
+    publish_to_google_chat,
+)
+from auto_research_agent.src.item_store import CompactDigest, ItemRow, ItemStore
+from auto_research_agent.src.schemas import ResearchDomain
+
+
+def digest(count: int, innovation: str = "A new method.") -> CompactDigest:
+    rows = [
+        ItemRow(
+            f"Work {i}",
+            f"https://example.org/work/{i}",
+            "2026-01-01",
+            # Items built in code carry the enum, topic files plain strings
+            ResearchDomain.OTHER if i % 2 else "Cloth Simulation",
+            "Relevant.",
+            innovation,
+            "Summary.",
+        )
+        for i in range(1, count + 1)
+    ]
+    return CompactDigest("Garment Research", "2026-01-05", ItemStore.from_items(rows))
+
+
+def test_short_digest_is_one_message():
+    messages = build_chat_messages(digest(3))
+    assert messages == [build_chat_message(digest(3))]
+    text = messages[0]["text"]
+    assert text.startswith("*Garment Research - 2026-01-05*\n\n*1. Work 1*")
+    assert "`Domain: Other`" in text
+    assert "`Domain: Cloth Simulation`" in text
+
+
+def test_long_digest_is_split_on_item_boundaries():
+    messages = build_chat_messages(digest(40), max_chars=800)
+
+    assert len(messages) > 1
+    for k, message in enumerate(messages, 1):
+        assert len(message["text"]) <= 800
+        assert message["text"].startswith(f"*Garment Research - 2026-01-05* ({k}/{len(messages)})\n\n*")
+    bodies = "".join(message["text"].split("\n\n", 1)[1] for message in messages)
+    assert bodies == build_chat_message(digest(40))["text"].split("\n\n", 1)[1]
+
+
+def test_oversized_item_is_truncated():
+    messages = build_chat_messages(digest(2, innovation="x" * 2000), max_chars=500)
+
+    assert len(messages) == 2
+    assert all(len(message["text"]) <= 500 for message in messages)
+    assert all(message["text"].endswith("…\n\n") for message in messages)
+
+
+def test_max_chars_must_leave_room_for_items():
+    with pytest.raises(ValueError):
+        build_chat_messages(digest(1), max_chars=30)
+
+
+def publish(chat, spaces, deadline_seconds=None, max_chars=800, min_interval=0.0, digests=1):
+    urls = [f"{chat.url}/v1/spaces/{space}/messages?key=k&token=t" for space in spaces]
+
+    async def run():
+        limiter = SpaceRateLimiter(min_interval)
+        deadline = None if deadline_seconds is None else time.monotonic() + deadline_seconds
+        async with httpx.AsyncClient() as http:
+            return await asyncio.gather(
+                *(
+                    publish_to_google_chat(digest(40), http, urls, limiter, max_chars, deadline)
+                    for _ in range(digests)
+                )
+            )
+
+    return asyncio.run(run())
+
+
+def test_every_space_gets_every_message():
+    with MockChatServer() as chat:
+        [results] = publish(chat, ["A", "B"])
+
+    count = len(build_chat_messages(digest(40), max_chars=800))
+    assert [(r.space, r.sent, r.total) for r in results] == [("spaces/A", count, count), ("spaces/B", count, count)]
+    assert chat.messages == 2 * count
+
+
+def test_space_is_skipped_when_its_messages_do_not_fit_the_deadline():
+    with MockChatServer() as chat:
+        [results] = publish(chat, ["A"], deadline_seconds=1.0)
+
+    assert chat.messages == 0
+    assert results[0].sent == 0
+    assert not results[0].ok
+    assert results[0].error.startswith("skipped, ")
+    assert "key=k" not in results[0].error
+
+
+def test_posts_to_one_space_are_paced():
+    # Two digests and two webhooks of one space; the server rejects posts closer than 50 ms
+    with MockChatServer(min_interval=0.05) as chat:
+        results = publish(chat, ["A", "A"], max_chars=2000, min_interval=0.06, digests=2)
+
+    assert all(r.ok for digest_results in results for r in digest_results)
+    assert chat.throttled == 0
+    assert chat.per_space == {"/v1/spaces/A/messages": chat.messages}
@@ -0,0 +1,190 @@
+import asyncio
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+import pytest
+from mock_services import FakeGenaiClient, synthetic_digest
+
+from auto_research_agent.src.context_cache import REJECTED_RETRY_SECONDS, ContextCacheRegistry
+from auto_research_agent.tasks.garment_code_related import GarmentResearchTask
+
+MODEL = "gemini-test"
+LONG_PREFIX = "You are a meticulous research assistant. " * 200
+
+
+class ApiError(Exception):
+    def __init__(self, code: int):
+        super().__init__(f"{code} error")
+        self.code = code
+
+
+class Clock:
+    def __init__(self):
+        self.now = datetime(2026, 1, 5, tzinfo=timezone.utc).timestamp()
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class FakeCaches:
+    """The aio.caches API: handles with an expiry on the test clock; create can be made to fail."""
+
+    def __init__(self, clock: Clock, create_error: Exception | None = None):
+        self.clock = clock
+        self.create_error = create_error
+        self.created = []
+        self.updated = []
+
+    def _handle(self, name: str, ttl: str):
+        expires_at = self.clock() + int(ttl.removesuffix("s"))
+        return SimpleNamespace(name=name, expire_time=datetime.fromtimestamp(expires_at, timezone.utc))
+
+    async def create(self, model, config):
+        # Lets every concurrent caller reach the registry before the upload finishes
+        await asyncio.sleep(0.01)
+        if self.create_error is not None:
+            raise self.create_error
+        name = f"cachedContents/{len(self.created)}"
+        self.created.append((model, config))
+        return self._handle(name, config["ttl"])
+
+    async def update(self, name, config):
+        self.updated.append(name)
+        return self._handle(name, config["ttl"])
+
+
+def fake_client(caches: FakeCaches):
+    return SimpleNamespace(aio=SimpleNamespace(caches=caches))
+
+
+def acquire(registry, client, prefix=LONG_PREFIX):
+    return asyncio.run(registry.acquire(client, MODEL, prefix))
+
+
+def test_concurrent_acquires_upload_once():
+    clock = Clock()
+    caches = FakeCaches(clock)
+    registry = ContextCacheRegistry("", clock=clock)
+
+    async def acquire_many():
+        client = fake_client(caches)
+        return await asyncio.gather(*(registry.acquire(client, MODEL, LONG_PREFIX) for _ in range(8)))
+
+    names = asyncio.run(acquire_many())
+    assert names == ["cachedContents/0"] * 8
+    assert len(caches.created) == 1
+    assert registry.uploads == 1
+
+
+def test_handle_is_extended_within_refresh_margin():
+    clock = Clock()
+    caches = FakeCaches(clock)
+    client = fake_client(caches)
+    registry = ContextCacheRegistry("", ttl_seconds=3600, refresh_margin=600, clock=clock)
+    name = acquire(registry, client)
+
+    clock.now += 2000
+    assert acquire(registry, client) == name
+    assert caches.updated == []
+
+    # Less than refresh_margin left: the handle is extended, not uploaded again
+    clock.now += 1200
+    assert acquire(registry, client) == name
+    assert caches.updated == [name]
+    assert registry.refreshes == 1
+    assert len(caches.created) == 1
+
+    # Extended from the time it was used
+    clock.now += 3000
+    assert acquire(registry, client) == name
+    assert len(caches.created) == 1
+
+
+def test_expired_handle_is_uploaded_again():
+    clock = Clock()
+    caches = FakeCaches(clock)
+    client = fake_client(caches)
+    registry = ContextCacheRegistry("", ttl_seconds=3600, clock=clock)
+    first = acquire(registry, client)
+
+    clock.now += 3601
+    assert acquire(registry, client) != first
+    assert len(caches.created) == 2
+    assert caches.updated == []
+
+
+def test_rejected_prefix_is_remembered(tmp_path):
+    clock = Clock()
+    caches = FakeCaches(clock, create_error=ApiError(400))
+    client = fake_client(caches)
+    path = str(tmp_path / "context_caches.json")
+    registry = ContextCacheRegistry(path, clock=clock)
+    assert acquire(registry, client) is None
+
+    # Neither this run nor the next asks again
+    caches.create_error = None
+    assert acquire(registry, client) is None
+    assert acquire(ContextCacheRegistry(path, clock=clock), client) is None
+    assert caches.created == []
+
+    clock.now += REJECTED_RETRY_SECONDS + 1
+    assert acquire(ContextCacheRegistry(path, clock=clock), client) == "cachedContents/0"
+
+
+def test_other_create_errors_are_not_remembered():
+    clock = Clock()
+    caches = FakeCaches(clock, create_error=ApiError(503))
+    client = fake_client(caches)
+    registry = ContextCacheRegistry("", clock=clock)
+    assert acquire(registry, client) is None
+
+    caches.create_error = None
+    assert acquire(registry, client) == "cachedContents/0"
+
+
+def test_short_prefix_stays_inline():
+    clock = Clock()
+    caches = FakeCaches(clock)
+    registry = ContextCacheRegistry("", min_chars=4096, clock=clock)
+    assert acquire(registry, fake_client(caches), "Be brief. " * 100) is None
+    assert caches.created == []
+
+
+class LongPrefixTask(GarmentResearchTask):
+    def system_instruction(self) -> str:
+        return LONG_PREFIX
+
+
+class RefusingGenai(FakeGenaiClient):
+    """Refuses every request that names a cached content with the given status."""
+
+    def __init__(self, clock: Clock, status: int):
+        super().__init__(synthetic_digest(2))
+        self.status = status
+        self.configs = []
+        self.aio.caches = FakeCaches(clock)
+        self.aio.models.generate_content = self._generate
+
+    async def _generate(self, model, contents, config=None):
+        self.configs.append(config)
+        if config.cached_content:
+            raise ApiError(self.status)
+        return self._response()
+
+
+@pytest.mark.parametrize("status", [400, 403, 404])
+def test_refused_handle_is_invalidated_and_sent_inline(status):
+    clock = Clock()
+    client = RefusingGenai(clock, status)
+    registry = ContextCacheRegistry("", clock=clock)
+    task = LongPrefixTask(client=client, context_cache=registry)
+
+    generated = asyncio.run(task._agenerate("query", task.system_instruction()))
+    assert generated.text == client.response_text
+
+    cached_call, inline_call = client.configs
+    assert cached_call.cached_content == "cachedContents/0"
+    assert cached_call.system_instruction is None
+    assert inline_call.cached_content is None
+    assert inline_call.system_instruction == LONG_PREFIX
+    assert registry.entries == {}
@@ -0,0 +1,100 @@
+from datetime import date, datetime, timedelta
+
+import pytest
+
+from auto_research_agent.src import dates
+from auto_research_agent.src.dates import DateFilter, DatePolicy, ParsedDate, normalize_date, parse_date
+
+NOW = datetime(2026, 1, 5)
+
+
+def day(days_ago: int) -> str:
+    return (NOW - timedelta(days=days_ago)).strftime("%Y-%m-%d")
+
+
+@pytest.mark.parametrize(
+    "text, expected",
+    [
+        ("2025-10-03", ParsedDate(date(2025, 10, 3), date(2025, 10, 3), "day")),
+        ("2025-10-03T12:00:00Z", ParsedDate(date(2025, 10, 3), date(2025, 10, 3), "day")),
+        ("Oct 3, 2025", ParsedDate(date(2025, 10, 3), date(2025, 10, 3), "day")),
+        ("3 October 2025", ParsedDate(date(2025, 10, 3), date(2025, 10, 3), "day")),
+        ("2024-02", ParsedDate(date(2024, 2, 1), date(2024, 2, 29), "month")),
+        ("December 2025", ParsedDate(date(2025, 12, 1), date(2025, 12, 31), "month")),
+        ("2025", ParsedDate(date(2025, 1, 1), date(2025, 12, 31), "year")),
+        ("2025-13-01", None),
+        ("recently", None),
+    ],
+)
+def test_parse_date(text, expected):
+    assert parse_date(text) == expected
+
+
+def test_normalize_date():
+    assert normalize_date(" Oct 3, 2025 ") == "2025-10-03"
+    assert normalize_date("Dec 2025") == "2025-12"
+    assert normalize_date("recently") == "recently"
+
+
+def test_lookback_window_and_grace_days():
+    date_filter = DateFilter(30, now=NOW)
+    assert date_filter.keep(day(30))
+    assert not date_filter.keep(day(31))
+    assert date_filter.keep(day(-10))
+    assert date_filter.keep("recently") is None
+
+    assert DateFilter(30, DatePolicy(grace_days=2), now=NOW).keep(day(32))
+
+
+def test_partial_dates_compare_the_end_or_the_start_of_the_period():
+    # The cutoff is 2025-12-06: December 2025 ends inside the window but starts before it
+    assert DateFilter(30, now=NOW).keep("2025-12")
+    assert not DateFilter(30, DatePolicy(partial="start"), now=NOW).keep("2025-12")
+    assert DateFilter(30, DatePolicy(partial="start"), now=NOW).keep("2026-01")
+
+
+def test_max_future_days():
+    date_filter = DateFilter(30, DatePolicy(max_future_days=7), now=NOW)
+    assert date_filter.keep(day(-7))
+    assert not date_filter.keep(day(-8))
+    # A partial date is only too far ahead if it starts after the limit
+    assert date_filter.keep("2026")
+
+
+@pytest.mark.parametrize("unparseable, kept", [("keep", True), ("drop", False)])
+def test_unparseable_dates_follow_the_policy(unparseable, kept):
+    date_filter = DateFilter(30, DatePolicy(unparseable=unparseable), now=NOW)
+    keep, normalized = date_filter.evaluate([day(1), "recently", day(40), "recently"])
+    assert keep == [True, kept, False, kept]
+    assert normalized == [day(1), None, day(40), None]
+
+
+def test_policy_from_dict_validates_values():
+    assert DatePolicy.from_dict({"partial": "start", "grace_days": 3}) == DatePolicy(partial="start", grace_days=3)
+    with pytest.raises(ValueError):
+        DatePolicy.from_dict({"unparseable": "maybe"})
+    with pytest.raises(ValueError):
+        DatePolicy.from_dict({"partial": "middle"})
+
+
+@pytest.mark.parametrize(
+    "policy",
+    [
+        DatePolicy(),
+        DatePolicy(unparseable="drop", partial="start", grace_days=3, max_future_days=7),
+    ],
+)
+# An invalid ISO date makes the NumPy path parse the whole batch one by one
+@pytest.mark.parametrize("invalid", [[], ["2025-13-01"]])
+def test_numpy_path_matches_python_path(monkeypatch, policy, invalid):
+    pytest.importorskip("numpy")
+    texts = [day(offset) for offset in range(-20, 600)]
+    texts += [f"{day(offset)}T08:30:00Z" for offset in range(0, 60, 7)]
+    texts += ["2025-12", "2025-11", "2026", "Dec 1, 2025", "recently", ""] + invalid
+    texts += texts[:50]
+    date_filter = DateFilter(30, policy, now=NOW)
+
+    assert len(set(texts)) >= dates.NUMPY_MIN_DISTINCT
+    vectorized = date_filter.evaluate(texts)
+    monkeypatch.setattr(dates, "NUMPY_MIN_DISTINCT", len(texts) + 1)
+    assert vectorized == date_filter.evaluate(texts)
@@ -0,0 +1,112 @@
+import asyncio
+import time
+
+import pytest
+from mock_services import FakeGenaiClient
+
+from auto_research_agent.src.gemini_caller import LatencyHistory, ResilientCaller
+
+MODEL = "gemini-test"
+FALLBACK = "gemini-test-lite"
+
+
+class ApiError(Exception):
+    def __init__(self, code: int):
+        super().__init__(f"{code} error")
+        self.code = code
+
+
+class ScriptedGenaiClient(FakeGenaiClient):
+    """Answers each call as scripted: a latency in seconds, or an exception to raise."""
+
+    def __init__(self, *script):
+        super().__init__("{}")
+        self.script = list(script)
+        self.called_models = []
+
+    async def _agenerate_content(self, model, contents, config=None):
+        self.called_models.append(model)
+        outcome = self.script.pop(0) if self.script else 0.0
+        if isinstance(outcome, Exception):
+            raise outcome
+        await asyncio.sleep(outcome)
+        return self._response()
+
+
+def call(client, caller):
+    async def request(model):
+        return await client.aio.models.generate_content(model=model, contents="query")
+
+    return asyncio.run(caller.call(request, MODEL))
+
+
+def history_of(seconds: float, samples: int = 5) -> LatencyHistory:
+    history = LatencyHistory()
+    for _ in range(samples):
+        history.record(MODEL, seconds)
+    return history
+
+
+def test_retryable_errors_are_retried():
+    client = ScriptedGenaiClient(ApiError(503), ApiError(429), 0.0)
+    response, report = call(client, ResilientCaller(base_delay=0.01))
+
+    assert response.text == "{}"
+    assert report.attempts == 3
+    assert report.model == MODEL
+
+
+def test_client_errors_are_not_retried():
+    client = ScriptedGenaiClient(ApiError(400), 0.0)
+    with pytest.raises(ApiError):
+        call(client, ResilientCaller(base_delay=0.01))
+    assert client.called_models == [MODEL]
+
+
+def test_retries_stop_at_the_deadline():
+    client = ScriptedGenaiClient(*[ApiError(503)] * 10)
+    start = time.monotonic()
+    with pytest.raises(ApiError):
+        call(client, ResilientCaller(deadline=0.5, max_retries=10, base_delay=0.2, max_delay=0.2))
+    assert time.monotonic() - start < 1.0
+    assert len(client.called_models) < 10
+
+
+def test_slow_request_is_hedged():
+    # The first request hangs; the hedge goes out after the 1s minimum delay and answers at once
+    client = ScriptedGenaiClient(30.0, 0.0)
+    start = time.monotonic()
+    response, report = call(client, ResilientCaller(history_of(0.1), hedge=True))
+
+    assert time.monotonic() - start < 5
+    assert report.hedged
+    assert report.attempts == 1
+    assert client.called_models == [MODEL, MODEL]
+
+
+def test_fast_request_is_not_hedged():
+    client = ScriptedGenaiClient(0.0)
+    _, report = call(client, ResilientCaller(history_of(0.1), hedge=True))
+
+    assert not report.hedged
+    assert client.called_models == [MODEL]
+
+
+def test_fallback_model_near_the_deadline():
+    # The primary model only gets until fallback_margin before the deadline
+    client = ScriptedGenaiClient(30.0, 0.0)
+    caller = ResilientCaller(deadline=10.0, base_delay=0.01, fallback_model=FALLBACK, fallback_margin=9.8)
+    _, report = call(client, caller)
+
+    assert report.model == FALLBACK
+    assert report.attempts == 2
+    assert client.called_models == [MODEL, FALLBACK]
+
+
+def test_fallback_model_when_primary_is_too_slow():
+    client = ScriptedGenaiClient(0.0)
+    caller = ResilientCaller(history_of(60.0), deadline=30.0, fallback_model=FALLBACK, fallback_margin=5.0)
+    _, report = call(client, caller)
+
+    assert report.model == FALLBACK
+    assert client.called_models == [FALLBACK]
@@ -0,0 +1,105 @@
+import asyncio
+from datetime import datetime, timedelta
+
+import httpx
+import pytest
+from mock_services import MockMetadataServer
+
+from auto_research_agent.src.dates import DateFilter
+from auto_research_agent.src.item_store import CompactDigest, ItemRow, ItemStore
+from auto_research_agent.src.link_verifier import LinkCheckCache, LinkVerifier
+
+NOW = datetime(2026, 1, 5)
+
+
+def day(days_ago: int) -> str:
+    return (NOW - timedelta(days=days_ago)).strftime("%Y-%m-%d")
+
+
+@pytest.fixture
+def server(monkeypatch):
+    with MockMetadataServer() as server:
+        for name, value in server.api_env().items():
+            monkeypatch.setenv(name, value)
+        monkeypatch.delenv("GITHUB_TOKEN", raising=False)
+        server.arxiv = {"2601.00001": day(3), "2601.00003": day(200), "2601.00004": day(3)}
+        server.github = {"lab/alive": day(4)}
+        server.crossref = {"10.1145/3700001": [2025, 12]}
+        server.pages = {"/pages/ok": 200, "/pages/gone": 404, "/pages/no-head": 405, "/pages/broken": 503}
+        yield server
+
+
+def verify(links: dict, cache=None, strict=False) -> dict:
+    """Verifies items with the given links and claimed dates; returns the kept links and their dates."""
+    rows = [ItemRow(f"Work {i}", link, date, "Other", "", "", "") for i, (link, date) in enumerate(links.items())]
+
+    async def run():
+        async with httpx.AsyncClient() as http:
+            verifier = LinkVerifier(http, cache, strict=strict)
+            digest = CompactDigest("Test", day(0), ItemStore.from_items(rows))
+            return await verifier.verify_digest(digest, DateFilter(30, now=NOW))
+
+    digest = asyncio.run(run())
+    return dict(zip(digest.items.column("source_link"), digest.items.column("publication_date")))
+
+
+def test_dead_links_are_dropped(server):
+    links = {
+        "https://arxiv.org/abs/2601.00001v2": day(3),
+        "https://arxiv.org/abs/2601.00002": day(3),
+        "https://github.com/lab/alive": day(4),
+        "https://github.com/lab/gone": day(4),
+        f"{server.url}/pages/ok": day(5),
+        f"{server.url}/pages/gone": day(5),
+        f"{server.url}/pages/no-head": day(5),
+    }
+    assert verify(links) == {
+        "https://arxiv.org/abs/2601.00001v2": day(3),
+        "https://github.com/lab/alive": day(4),
+        f"{server.url}/pages/ok": day(5),
+        f"{server.url}/pages/no-head": day(5),
+    }
+
+
+def test_dates_come_from_metadata(server):
+    links = {
+        # Published long ago, although the item claims otherwise
+        "https://arxiv.org/abs/2601.00003": day(5),
+        "https://arxiv.org/abs/2601.00004": day(10),
+        "https://github.com/lab/alive": day(20),
+        # Crossref only knows the month, which the claimed date matches
+        "https://doi.org/10.1145/3700001": "2025-12-20",
+    }
+    assert verify(links) == {
+        "https://arxiv.org/abs/2601.00004": day(3),
+        "https://github.com/lab/alive": day(4),
+        "https://doi.org/10.1145/3700001": "2025-12-20",
+    }
+
+
+def test_unverifiable_links_are_kept_unless_strict(server):
+    links = {f"{server.url}/pages/broken": day(5), f"{server.url}/pages/ok": day(5)}
+    assert verify(links) == links
+    assert verify(links, strict=True) == {f"{server.url}/pages/ok": day(5)}
+
+
+def test_stale_entries_are_revalidated(server, tmp_path):
+    links = {
+        "https://github.com/lab/alive": day(4),
+        "https://doi.org/10.1145/3700001": "2025-12-20",
+        f"{server.url}/pages/ok": day(5),
+    }
+    path = str(tmp_path / "link_checks.json")
+    cold = verify(links, LinkCheckCache(path, max_age=0))
+    assert server.not_modified == 0
+
+    # A cache past max_age asks again with its validators and reuses the checks on 304
+    requests = server.requests
+    assert verify(links, LinkCheckCache(path, max_age=0)) == cold
+    assert server.requests - requests == 3
+    assert server.not_modified == 3
+
+    # A fresh cache answers without any request
+    requests = server.requests
+    assert verify(links, LinkCheckCache(path, max_age=3600)) == cold
+    assert server.requests == requests
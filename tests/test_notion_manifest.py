@@ -0,0 +1,113 @@
+import asyncio
+
+import pytest
+from mock_services import MockNotionServer
+
+from auto_research_agent.src.item_store import CompactDigest, ItemRow, ItemStore
+from auto_research_agent.src.notion_manifest import NotionManifest, block_hash, item_fingerprint
+from auto_research_agent.src.notion_utils import build_item_blocks, publish_to_notion
+
+REPORT_DATE = "2026-01-05"
+
+
+def item(i: int, summary: str = "Summary.") -> ItemRow:
+    return ItemRow(f"Work {i}", f"https://example.org/work/{i}", "2026-01-01", "Other", "Relevant.", "New.", summary)
+
+
+def digest(rows, topic: str = "Garment Research") -> CompactDigest:
+    return CompactDigest(topic, REPORT_DATE, ItemStore.from_items(rows))
+
+
+@pytest.fixture
+def server(monkeypatch):
+    with MockNotionServer() as server:
+        monkeypatch.setenv("NOTION_API_KEY", "test-token")
+        monkeypatch.setenv("NOTION_PAGE_ID", "parent")
+        monkeypatch.setenv("NOTION_BASE_URL", server.url)
+        yield server
+
+
+def publish(digest_data, manifest) -> str:
+    return asyncio.run(publish_to_notion(digest_data, logs="log line", manifest=manifest, page_key="garment"))
+
+
+def test_manifest_round_trip(tmp_path):
+    path = tmp_path / "manifest.json"
+    manifest = NotionManifest(str(path))
+    manifest.set("garment", REPORT_DATE, {"page_id": "page"})
+    manifest.save()
+
+    reloaded = NotionManifest(str(path))
+    assert reloaded.get("garment", REPORT_DATE) == {"page_id": "page"}
+    assert reloaded.get("garment", "2026-01-12") is None
+    reloaded.remove("garment", REPORT_DATE)
+    assert reloaded.get("garment", REPORT_DATE) is None
+
+
+def test_unreadable_manifest_is_ignored(tmp_path):
+    path = tmp_path / "manifest.json"
+    path.write_text("{not json")
+    assert NotionManifest(str(path)).pages == {}
+
+
+def test_fingerprint_ignores_link_noise():
+    assert item_fingerprint("https://example.org/work/1?utm_source=x", "A") == item_fingerprint(
+        "http://example.org/work/1/", "B"
+    )
+    assert item_fingerprint("", "Some Title") != item_fingerprint("", "Other Title")
+
+
+def test_first_run_records_every_item_block(server, tmp_path):
+    manifest = NotionManifest(str(tmp_path / "manifest.json"))
+    page_id = publish(digest([item(1), item(2)]), manifest)
+
+    entry = NotionManifest(manifest.path).get("garment", REPORT_DATE)
+    assert entry["page_id"] == page_id
+    assert entry["next_index"] == 3
+    recorded = entry["items"][item_fingerprint(item(2).source_link, item(2).title)]
+    assert recorded["index"] == 2
+    assert [h for _, h in recorded["blocks"]] == [block_hash(b) for b in build_item_blocks(2, item(2))]
+    assert entry["anchor"] == recorded["blocks"][-1][0]
+
+
+def test_rerun_updates_only_the_difference(server, tmp_path):
+    manifest = NotionManifest(str(tmp_path / "manifest.json"))
+    page_id = publish(digest([item(1), item(2)]), manifest)
+    page_blocks = list(server.children[page_id])
+    position = page_blocks.index(manifest.get("garment", REPORT_DATE)["anchor"]) + 1
+
+    # Item 1 is unchanged, item 2 has a new summary, item 3 is new; the topic is reworded
+    rerun = digest([item(1), item(2, "A better summary."), item(3)], topic="Garment Research Digest")
+    assert publish(rerun, manifest) == page_id
+
+    changed = sum(
+        block_hash(old) != block_hash(new)
+        for old, new in zip(build_item_blocks(2, item(2)), build_item_blocks(2, item(2, "A better summary.")))
+    )
+    assert changed == server.blocks_updated == 1
+
+    # Item 3's blocks are inserted right after the last item, before the log toggle
+    added = len(server.children[page_id]) - len(page_blocks)
+    new_ids = server.children[page_id][position : position + added]
+    assert added == len(build_item_blocks(3, item(3)))
+    assert server.children[page_id] == page_blocks[:position] + new_ids + page_blocks[position:]
+    entry = manifest.get("garment", REPORT_DATE)
+    assert entry["next_index"] == 4
+    assert entry["anchor"] == new_ids[-1]
+    assert [i for i, _ in entry["items"][item_fingerprint(item(3).source_link, item(3).title)]["blocks"]] == new_ids
+
+    # A third identical run has nothing to send
+    requests = server.requests
+    assert publish(rerun, manifest) == page_id
+    assert server.requests == requests
+    assert server.blocks_updated == 1
+
+
+def test_deleted_page_is_created_again(server, tmp_path):
+    manifest = NotionManifest(str(tmp_path / "manifest.json"))
+    page_id = publish(digest([item(1)]), manifest)
+    server.block_ids.clear()
+
+    new_page_id = publish(digest([item(1, "Changed.")]), manifest)
+    assert new_page_id != page_id
+    assert manifest.get("garment", REPORT_DATE)["page_id"] == new_page_id
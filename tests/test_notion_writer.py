@@ -0,0 +1,90 @@
+import asyncio
+
+import pytest
+from mock_services import MockNotionServer
+from notion_client.errors import HTTPResponseError
+
+from auto_research_agent.src.clients import create_notion_client
+from auto_research_agent.src.notion_writer import NotionWriter
+
+
+def paragraph(text: str) -> dict:
+    return {
+        "object": "block",
+        "type": "paragraph",
+        "paragraph": {"rich_text": [{"type": "text", "text": {"content": text}}]},
+    }
+
+
+def write(server, blocks, log_blocks=None, **options):
+    """Writes one page to the mock server; returns the writer and the page ID."""
+
+    async def run():
+        async with create_notion_client("test-token") as client:
+            writer = NotionWriter(client, base_delay=0.01, **options)
+            page_id = await writer.write_page(
+                "parent", "Digest", blocks, log_title="Logs", log_blocks=log_blocks, track_blocks=True
+            )
+            return writer, page_id
+
+    return asyncio.run(run())
+
+
+@pytest.fixture
+def notion(monkeypatch):
+    def start(**options):
+        server = MockNotionServer(**options).__enter__()
+        servers.append(server)
+        monkeypatch.setenv("NOTION_BASE_URL", server.url)
+        return server
+
+    servers = []
+    yield start
+    for server in servers:
+        server.__exit__(None, None, None)
+
+
+def test_blocks_are_appended_in_order_and_batches(notion):
+    server = notion()
+    blocks = [paragraph(f"Item {i}") for i in range(250)]
+    log_blocks = [paragraph(f"Log {i}") for i in range(150)]
+    writer, page_id = write(server, blocks, log_blocks)
+
+    # The toggle holding the logs stays after the content
+    page_children = server.children[page_id]
+    toggle_id = page_children[-1]
+    assert writer.block_ids == page_children[:-1]
+    assert len(writer.block_ids) == 250
+    assert len(server.children[toggle_id]) == 150
+
+    # 10 blocks with the page, then 240 content and 150 log blocks in batches of at most 100
+    batches = sorted((r.parent, r.index, r.blocks) for r in writer.reports if r.blocks)
+    assert batches == [
+        ("content", 1, 100),
+        ("content", 2, 100),
+        ("content", 3, 40),
+        ("logs", 1, 100),
+        ("logs", 2, 50),
+        ("page", 0, 11),
+    ]
+    assert all(r.ok for r in writer.reports)
+
+
+def test_rate_limited_appends_are_resent(notion):
+    server = notion(throttle_every=2)
+    writer, page_id = write(server, [paragraph(f"Item {i}") for i in range(310)])
+
+    assert writer.block_ids == server.children[page_id]
+    assert len(writer.block_ids) == 310
+    assert server.appends > 3
+
+
+def test_failed_appends_are_not_resent(notion):
+    # A 502 may come after Notion applied the append, so resending could duplicate blocks
+    server = notion(throttle_every=2, error_status=502)
+    with pytest.raises(HTTPResponseError) as error:
+        write(server, [paragraph(f"Item {i}") for i in range(310)])
+
+    assert error.value.status == 502
+    assert server.appends == 2
+    assert server.blocks_created == 110